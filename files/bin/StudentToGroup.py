@@ -4,10 +4,524 @@ Group Hash Generator for Linux Tutorial
 Generates group assignments and progress codes for LMS integration
 """
 
-import random
 import hashlib
 import csv
-from typing import List, Dict
+import gzip
+import io
+import itertools
+import os
+import time
+from typing import List, Dict, Iterable, Iterator, TextIO, Tuple
+from group_hash import (DEFAULT_ASSIGNMENT_KEY, DEFAULT_GROUP_MODE, GROUP_MODES, assign_groups, code_table,
+                        iter_groups, moved_students, normalize_student_id, student_group)
+
+# Header names (lowercase) that identify the student column in LMS exports, best first
+ROSTER_ID_COLUMNS = ('email', 'e-mail', 'email address', 'sis login id', 'login id',
+                     'sis user id', 'student id', 'user id', 'username', 'id')
+
+
+def open_roster(filename: str) -> TextIO:
+    """Open a roster as text, transparently decompressing gzip"""
+    with open(filename, 'rb') as probe:
+        compressed = probe.read(2) == b'\x1f\x8b'
+    if compressed:
+        return gzip.open(filename, 'rt', encoding='utf-8-sig', newline='')
+    return open(filename, 'r', encoding='utf-8-sig', newline='')
+
+
+def sniff_dialect(first_line: str):
+    """CSV dialect of an export, detected from its first line"""
+    try:
+        return csv.Sniffer().sniff(first_line, delimiters=',;\t')
+    except csv.Error:
+        return csv.excel
+
+
+def find_id_column(header: List[str]):
+    """Index of the student ID column in an LMS export header, or None"""
+    names = [name.strip().lower() for name in header]
+    return next((names.index(name) for name in ROSTER_ID_COLUMNS if name in names), None)
+
+
+def csv_roster_values(first_line: str, file: TextIO) -> Iterator[str]:
+    """Values of the student ID column of a CSV export, auto-detecting delimiter and column"""
+    dialect = sniff_dialect(first_line)
+    header = next(csv.reader([first_line], dialect))
+    rows = csv.reader(file, dialect)
+    
+    column = find_id_column(header)
+    if column is None:
+        # No recognizable header: use the first column holding an email, and keep
+        # the first line as data if that is where the email was found
+        column = next((i for i, value in enumerate(header) if '@' in value), None)
+        if column is not None:
+            rows = itertools.chain([header], rows)
+        else:
+            first_row = next(rows, [])
+            column = next((i for i, value in enumerate(first_row) if '@' in value), 0)
+            rows = itertools.chain([first_row], rows)
+    
+    for row in rows:
+        if column < len(row):
+            yield row[column]
+
+
+def iter_roster(filename: str, as_written: bool = False) -> Iterator:
+    """
+    Stream normalized, de-duplicated student IDs from a roster file.
+
+    Accepts a plain list (one ID per line, '#' comments allowed), an LMS CSV
+    export (delimiter and ID column detected from the header) or a gzip of
+    either. Only the set of IDs seen so far is kept in memory. The file is
+    opened immediately, so a missing file raises here rather than mid-stream.
+    With as_written, yields (student, ID as written in the roster) pairs.
+    """
+    file = open_roster(filename)
+    
+    def students():
+        seen = set()
+        with file:
+            # Skip blank lines and comments first, so a comment never decides the format
+            first_line = file.readline()
+            while first_line and (not first_line.strip() or first_line.lstrip().startswith('#')):
+                first_line = file.readline()
+            if any(delimiter in first_line for delimiter in ',;\t'):
+                values = csv_roster_values(first_line, file)
+            elif find_id_column([first_line]) is not None:
+                values = file  # Single-column export: drop its 'Email' header
+            else:
+                values = itertools.chain([first_line], file)
+            for value in values:
+                student = normalize_student_id(value)
+                if student and not student.startswith('#') and student not in seen:
+                    seen.add(student)
+                    yield (student, value.strip()) if as_written else student
+    
+    return students()
+
+
+# Gradebook columns that never hold submitted codes
+GRADEBOOK_INFO_COLUMNS = ROSTER_ID_COLUMNS + ('student', 'name', 'section', 'integration id')
+# Match outcomes, best first
+CODE_STATUSES = ('VALID', 'WRONG GROUP', 'WRONG ASSIGNMENT', 'INVALID')
+
+
+def is_code_like(value: str) -> bool:
+    return len(value) == 5 and value.isalnum() and value.isascii()
+
+
+def answer_key_filename(student: str) -> str:
+    """Per-student answer key file name (email sanitized for the filesystem)"""
+    safe_filename = student.replace('@', '_at_').replace('.', '_')
+    return f"{safe_filename}_answer_key.csv"
+
+
+def render_individual_answer_key(title: str, student: str, group_name: str, group_num: int,
+                                 assignment_key: str, checkpoints: List[int], codes: List[str],
+                                 max_exercises: int) -> str:
+    """CSV text of one student's answer key"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    # Header with student info
+    writer.writerow([title])
+    writer.writerow(['Student ID', student])
+    writer.writerow(['Assigned Group', group_name])
+    writer.writerow(['Group Number', group_num])
+    writer.writerow(['Assignment Key', assignment_key])
+    writer.writerow([])  # Empty row
+    
+    # Progress codes header
+    writer.writerow(['Exercise Count', 'Progress Code', 'Code Type'])
+    
+    for checkpoint, code in zip(checkpoints, codes):
+        code_type = "FINAL COMPLETION" if checkpoint == max_exercises else "CHECKPOINT"
+        writer.writerow([checkpoint, code, code_type])
+    return buffer.getvalue()
+
+
+class ThroughputReport:
+    """Count files and bytes written, printing progress with files/s and MB/s"""
+    
+    def __init__(self, total: int, every: int = 1000):
+        self.total = total
+        self.every = every
+        self.files = 0
+        self.bytes = 0
+        self.last_report = 0
+        self.start = time.perf_counter()
+    
+    def rates(self) -> Tuple[float, float, float]:
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return elapsed, self.files / elapsed, self.bytes / elapsed / 1e6
+    
+    def add(self, files: int, nbytes: int) -> None:
+        self.files += files
+        self.bytes += nbytes
+        if self.files - self.last_report >= self.every:
+            self.last_report = self.files
+            _, files_per_second, mb_per_second = self.rates()
+            print(f"\r   {self.files}/{self.total} files  {files_per_second:,.0f} files/s  {mb_per_second:.2f} MB/s",
+                  end='', flush=True)
+    
+    def finish(self) -> None:
+        elapsed, files_per_second, mb_per_second = self.rates()
+        if self.last_report:
+            print()
+        print(f"⏱️ Wrote {self.files} files ({self.bytes / 1e6:.2f} MB) in {elapsed:.2f}s: "
+              f"{files_per_second:,.0f} files/s, {mb_per_second:.2f} MB/s")
+
+
+def write_files(files: List[Tuple[str, str]]) -> Tuple[int, int]:
+    """Write (path, text) pairs and return (files, bytes); also run in pool workers"""
+    total_bytes = 0
+    for path, text in files:
+        data = text.encode('utf-8')
+        with open(path, 'wb') as file:
+            file.write(data)
+        total_bytes += len(data)
+    return len(files), total_bytes
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """Split an iterable into lists of at most `size` items"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz')
+
+
+def write_answer_key_files(files: Iterable[Tuple[str, str]], output: str, total: int, workers: int = 1) -> None:
+    """
+    Write (filename, text) answer keys to `output`.
+
+    An output ending in .zip/.tar/.tar.gz/.tgz is written as one archive
+    (members under a folder named after it), which avoids per-file metadata
+    costs on slow filesystems. Otherwise files go into the `output` directory,
+    written by `workers` processes when workers > 1.
+    """
+    report = ThroughputReport(total)
+    folder = os.path.basename(output)
+    for suffix in ARCHIVE_SUFFIXES:
+        if folder.endswith(suffix):
+            folder = folder[:-len(suffix)]
+            break
+    
+    if output.endswith('.zip'):
+        import zipfile
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, text in files:
+                data = text.encode('utf-8')
+                archive.writestr(f"{folder}/{name}", data)
+                report.add(1, len(data))
+    elif output.endswith(ARCHIVE_SUFFIXES):
+        import tarfile
+        mode = 'w' if output.endswith('.tar') else 'w:gz'
+        mtime = time.time()
+        with tarfile.open(output, mode) as archive:
+            for name, text in files:
+                data = text.encode('utf-8')
+                info = tarfile.TarInfo(f"{folder}/{name}")
+                info.size = len(data)
+                info.mtime = mtime
+                archive.addfile(info, io.BytesIO(data))
+                report.add(1, len(data))
+    else:
+        if not os.path.exists(output):
+            os.makedirs(output)
+            print(f"📁 Created directory: {output}")
+        paths = ((os.path.join(output, name), text) for name, text in files)
+        if workers > 1:
+            from collections import deque
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # At most two chunks per worker in flight, so the key generator is
+                # consumed as files are written rather than queued up front
+                in_flight = deque()
+                for chunk in chunked(paths, 256):
+                    if len(in_flight) >= 2 * workers:
+                        report.add(*in_flight.popleft().result())
+                    in_flight.append(pool.submit(write_files, chunk))
+                while in_flight:
+                    report.add(*in_flight.popleft().result())
+        else:
+            for chunk in chunked(paths, 256):
+                report.add(*write_files(chunk))
+    report.finish()
+
+
+def bundle_filename(assignment_key: str) -> str:
+    """
+    Zip name for an assignment's keys. Keys that are not already filename-safe
+    get a short hash of the raw key, so 'Lab 1' and 'Lab_1' get different zips.
+    """
+    import re
+    safe_key = re.sub(r'[^A-Za-z0-9_.-]', '_', assignment_key)
+    if safe_key != assignment_key:
+        safe_key += '_' + hashlib.sha256(assignment_key.encode('utf-8')).hexdigest()[:8]
+    return f"{safe_key}_answer_keys.zip"
+
+
+def build_assignment_bundle(assignment_key: str, student_file: str, max_exercises: int,
+                            output_dir: str, num_groups: int,
+                            group_mode: str = DEFAULT_GROUP_MODE) -> Tuple[str, str, int, int, float]:
+    """
+    Write one assignment's group key, master key and individual keys into a single zip.
+
+    Runs in a worker process; returns (assignment key, path, students, bytes, seconds).
+    """
+    import zipfile
+    start = time.perf_counter()
+    generator = GroupHashGenerator()
+    generator.set_grouping(num_groups, group_mode)
+    checkpoints = generator.get_checkpoints(max_exercises)
+    table = code_table(assignment_key)
+    
+    path = os.path.join(output_dir, bundle_filename(assignment_key))
+    def member(name):
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        return io.TextIOWrapper(archive.open(info, 'w'), encoding='utf-8', newline='')
+    
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        with member('answer_key.csv') as csvfile:
+            generator.write_answer_key(csvfile, assignment_key, max_exercises)
+        with member('master_answer_key.csv') as csvfile:
+            students = generator.write_master_answer_key(csvfile, iter_roster(student_file), assignment_key, max_exercises)
+        # Second pass over the roster: only one zip member can be open for writing at a time
+        for student, group_num in iter_groups(iter_roster(student_file), assignment_key, num_groups, group_mode):
+            text = render_individual_answer_key('Student Answer Key', student, generator.group_names[group_num - 1],
+                                                group_num, assignment_key, checkpoints,
+                                                table.row(group_num, checkpoints), max_exercises)
+            archive.writestr(f"individual_keys/{answer_key_filename(student)}", text)
+    return assignment_key, path, students, os.path.getsize(path), time.perf_counter() - start
+
+
+class KeyManifest:
+    """
+    Input digests of the answer keys in an output directory.
+
+    Each file's digest covers everything it is rendered from (student,
+    group, assignment key, max exercises), so a rerun only rewrites files
+    whose inputs changed and deletes files of dropped students. The group
+    count is deliberately left out: after regrouping, only students who
+    moved to a different group get a new file. The size and mtime of each
+    file as written are stored too, so a key edited or truncated on disk
+    since the last run is rewritten rather than trusted.
+    """
+    
+    FILENAME = '.answer_keys_manifest.json'
+    VERSION = 3  # Bump when the file format changes to force a full rewrite
+    
+    def __init__(self, output_dir: str, grouping: str = ''):
+        import json
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, self.FILENAME)
+        self.grouping = grouping
+        self.previous_grouping = grouping
+        self.previous = {}
+        self.current = {}
+        try:
+            with open(self.path, 'r') as file:
+                data = json.load(file)
+            if data.get('version') == self.VERSION:
+                self.previous = data['files']
+                self.previous_grouping = data.get('grouping', grouping)
+        except (OSError, ValueError, KeyError):
+            pass
+    
+    @staticmethod
+    def digest(*inputs) -> str:
+        return hashlib.blake2b('\0'.join(map(str, inputs)).encode('utf-8'), digest_size=16).hexdigest()
+    
+    def unchanged(self, name: str, digest: str) -> bool:
+        """Record a file's inputs; True if the file on disk is still the one written for them"""
+        previous = self.previous.get(name)
+        if previous and previous[0] == digest:
+            try:
+                stat = os.stat(os.path.join(self.output_dir, name))
+            except OSError:
+                stat = None
+            if stat is not None and [stat.st_size, stat.st_mtime_ns] == previous[1:]:
+                self.current[name] = previous
+                return True
+        self.current[name] = [digest]  # Size and mtime are added once the file is written
+        return False
+    
+    def remove_dropped(self) -> int:
+        """Delete files from the previous run that are no longer produced"""
+        removed = 0
+        for name in self.previous.keys() - self.current.keys():
+            try:
+                os.remove(os.path.join(self.output_dir, name))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+    
+    def save(self) -> None:
+        import json
+        for name, entry in list(self.current.items()):
+            if len(entry) == 1:
+                try:
+                    stat = os.stat(os.path.join(self.output_dir, name))
+                except OSError:
+                    del self.current[name]  # Not written: never trust it on the next run
+                    continue
+                entry += [stat.st_size, stat.st_mtime_ns]
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump({'version': self.VERSION, 'grouping': self.grouping, 'files': self.current},
+                      file, separators=(',', ':'))
+        os.replace(temp_path, self.path)
+
+
+class AnswerKeyStore:
+    """
+    SQLite database of students, their groups per assignment and the progress codes.
+
+    One file replaces the scattered answer key CSVs for lookups: the expected
+    code for a student at a checkpoint, or which assignment/group/checkpoint a
+    submitted code belongs to, is an indexed query.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS students (
+            student_id INTEGER PRIMARY KEY,
+            student TEXT NOT NULL UNIQUE,   -- normalized ID/email
+            email TEXT NOT NULL             -- as written in the roster
+        );
+        CREATE TABLE IF NOT EXISTS assignments (
+            assignment_id INTEGER PRIMARY KEY,
+            assignment_key TEXT NOT NULL UNIQUE,
+            max_exercises INTEGER NOT NULL,
+            num_groups INTEGER NOT NULL,
+            group_mode TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS memberships (
+            assignment_id INTEGER NOT NULL REFERENCES assignments,
+            student_id INTEGER NOT NULL REFERENCES students,
+            group_num INTEGER NOT NULL,
+            PRIMARY KEY (assignment_id, student_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS codes (
+            assignment_id INTEGER NOT NULL REFERENCES assignments,
+            group_num INTEGER NOT NULL,
+            checkpoint INTEGER NOT NULL,
+            code TEXT NOT NULL,
+            PRIMARY KEY (assignment_id, group_num, checkpoint)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS memberships_student ON memberships (student_id);
+        CREATE INDEX IF NOT EXISTS memberships_group ON memberships (assignment_id, group_num);
+        CREATE INDEX IF NOT EXISTS codes_code ON codes (code);
+    """
+    
+    def __init__(self, path: str):
+        import sqlite3
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(self.SCHEMA)
+    
+    def close(self) -> None:
+        self.connection.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def save_assignments(self, generator: 'GroupHashGenerator', student_file: str,
+                         assignment_keys: List[str], max_exercises: int) -> Tuple[int, int]:
+        """
+        Store a roster's groups and codes for several assignments in one transaction.
+
+        The roster file is streamed once into a temporary table; students, and
+        each assignment's memberships, are then bulk inserted from it.
+        Re-saving an assignment replaces its previous groups and codes, and
+        students no longer on the roster are deleted with all their memberships,
+        so lookups never answer for dropped students.
+        Returns (students in the roster, students removed).
+        """
+        checkpoints = generator.get_checkpoints(max_exercises)
+        connection = self.connection
+        
+        with connection:
+            connection.execute("CREATE TEMP TABLE IF NOT EXISTS roster (student TEXT PRIMARY KEY, email TEXT NOT NULL)")
+            connection.execute("DELETE FROM temp.roster")
+            connection.executemany("INSERT OR IGNORE INTO temp.roster (student, email) VALUES (?, ?)",
+                                   iter_roster(student_file, as_written=True))
+            roster_size, = connection.execute("SELECT COUNT(*) FROM temp.roster").fetchone()
+            
+            dropped = "SELECT student_id FROM students WHERE student NOT IN (SELECT student FROM temp.roster)"
+            connection.execute(f"DELETE FROM memberships WHERE student_id IN ({dropped})")
+            removed = connection.execute(f"DELETE FROM students WHERE student_id IN ({dropped})").rowcount
+            connection.execute("INSERT INTO students (student, email) SELECT student, email FROM temp.roster "
+                               "WHERE true ON CONFLICT (student) DO UPDATE SET email = excluded.email")
+            
+            for assignment_key in assignment_keys:
+                connection.execute(
+                    "INSERT OR IGNORE INTO assignments (assignment_key, max_exercises, num_groups, group_mode) "
+                    "VALUES (?, 0, 0, '')", (assignment_key,))
+                assignment_id, = connection.execute(
+                    "SELECT assignment_id FROM assignments WHERE assignment_key = ?", (assignment_key,)).fetchone()
+                connection.execute(
+                    "UPDATE assignments SET max_exercises = ?, num_groups = ?, group_mode = ? WHERE assignment_id = ?",
+                    (max_exercises, generator.num_groups, generator.group_mode, assignment_id))
+                connection.execute("DELETE FROM memberships WHERE assignment_id = ?", (assignment_id,))
+                connection.execute("DELETE FROM codes WHERE assignment_id = ?", (assignment_id,))
+                
+                # Read the roster back from the temporary table, not the file
+                students = (student for student, in connection.execute("SELECT student FROM temp.roster"))
+                connection.executemany(
+                    "INSERT OR REPLACE INTO memberships (assignment_id, student_id, group_num) "
+                    "SELECT ?, student_id, ? FROM students WHERE student = ?",
+                    ((assignment_id, group_num, student)
+                     for student, group_num in iter_groups(students, assignment_key,
+                                                           generator.num_groups, generator.group_mode)))
+                table = code_table(assignment_key)
+                connection.executemany(
+                    "INSERT INTO codes (assignment_id, group_num, checkpoint, code) VALUES (?, ?, ?, ?)",
+                    ((assignment_id, group_num, checkpoint, code)
+                     for group_num in range(1, generator.num_groups + 1)
+                     for checkpoint, code in zip(checkpoints, table.row(group_num, checkpoints))))
+            connection.execute("DELETE FROM temp.roster")
+        return roster_size, removed
+    
+    STUDENT_CODES = (
+        "SELECT m.group_num, c.checkpoint, c.code FROM students s "
+        "JOIN memberships m ON m.student_id = s.student_id "
+        "JOIN assignments a ON a.assignment_id = m.assignment_id "
+        "JOIN codes c ON c.assignment_id = m.assignment_id AND c.group_num = m.group_num "
+        "WHERE s.student = ? AND a.assignment_key = ?")
+    
+    def student_codes(self, student: str, assignment_key: str) -> List[Tuple[int, int, str]]:
+        """(group, checkpoint, code) rows a student should submit for an assignment"""
+        return self.connection.execute(self.STUDENT_CODES + " ORDER BY c.checkpoint",
+                                       (normalize_student_id(student), assignment_key)).fetchall()
+    
+    def expected_code(self, student: str, assignment_key: str, checkpoint: int) -> str:
+        """The code a student should have at a checkpoint of an assignment ('' if unknown)"""
+        row = self.connection.execute(self.STUDENT_CODES + " AND c.checkpoint = ?",
+                                      (normalize_student_id(student), assignment_key, checkpoint)).fetchone()
+        return row[2] if row else ''
+    
+    def find_code(self, code: str) -> List[Tuple[str, int, int]]:
+        """Every (assignment key, group, checkpoint) a submitted code is valid for"""
+        return self.connection.execute(
+            "SELECT a.assignment_key, c.group_num, c.checkpoint FROM codes c "
+            "JOIN assignments a ON a.assignment_id = c.assignment_id WHERE c.code = ?",
+            (code.strip().upper(),)).fetchall()
+
 
 class GroupHashGenerator:
     """
@@ -19,31 +533,46 @@ class GroupHashGenerator:
     
     def __init__(self):
         self.num_groups = 5
+        self.group_mode = DEFAULT_GROUP_MODE  # Must match TUTORIAL_GROUP_MODE in the students' VMs
         self.progress_checkpoint = 5  # Same as in tutorial.py
         self.group_names = ['Group A', 'Group B', 'Group C', 'Group D', 'Group E']
         self.assignment_key = None  # Will be set when generating codes
 
+    def set_grouping(self, num_groups: int, group_mode: str = DEFAULT_GROUP_MODE) -> None:
+        """Set the group count (2-26) and how hashes map to groups ('modulo' or 'jump')"""
+        if not 2 <= num_groups <= 26:
+            raise ValueError("Number of groups must be between 2 and 26")
+        if group_mode not in GROUP_MODES:
+            raise ValueError(f"Group mode must be one of: {', '.join(GROUP_MODES)}")
+        self.num_groups = num_groups
+        self.group_mode = group_mode
+        self.group_names = [f'Group {chr(65 + i)}' for i in range(num_groups)]
+
     def set_assignment_key(self, assignment_key: str) -> None:
         """Set the assignment key for generating unique code sets"""
         self.assignment_key = assignment_key
         print(f"🔑 Assignment key set to: '{assignment_key}'")
 
-    def get_student_group(self, student_id: str) -> int:
-        """Assign student to one of 5 groups based on their student ID"""
-        # Use hash of student ID to consistently assign to groups 1-5
-        group_hash = hash(student_id) % self.num_groups
-        return group_hash + 1  # Groups 1-5 instead of 0-4
+    def get_student_group(self, student_id: str, assignment_key: str = None) -> int:
+        """Assign student to one of num_groups groups based on their student ID and the assignment key"""
+        # Keyed, stable hash: the tutorial computes the same group inside the student's VM
+        key = assignment_key or self.assignment_key or DEFAULT_ASSIGNMENT_KEY
+        return student_group(student_id, key, self.num_groups, self.group_mode)
     
-    def get_student_group_letter(self, student_id: str) -> str:
+    def get_student_group_letter(self, student_id: str, assignment_key: str = None) -> str:
         """Get the group letter (A-E) for a student"""
-        group_num = self.get_student_group(student_id)
+        group_num = self.get_student_group(student_id, assignment_key)
         return self.group_names[group_num - 1]
+
+    def assign_student_groups(self, students: List[str], assignment_key: str = None) -> Dict[str, int]:
+        """Group numbers for a whole roster in one pass"""
+        key = assignment_key or self.assignment_key or DEFAULT_ASSIGNMENT_KEY
+        return assign_groups(students, key, self.num_groups, self.group_mode)
     
     def read_student_list(self, filename: str) -> List[str]:
-        """Read student list from file (one email per line)"""
+        """Read a whole student list (plain, LMS CSV export or gzip) into memory"""
         try:
-            with open(filename, 'r') as file:
-                students = [line.strip() for line in file if line.strip()]
+            students = list(iter_roster(filename))
             print(f"✅ Read {len(students)} students from {filename}")
             return students
         except FileNotFoundError:
@@ -54,41 +583,54 @@ class GroupHashGenerator:
             return []
     
     def generate_student_groups_csv(self, student_file: str, output_file: str = "student_groups.csv") -> None:
-        """Generate CSV file showing which students are in which groups"""
-        students = self.read_student_list(student_file)
+        """Generate CSV file showing which students are in which groups (streams the roster)"""
+        import tempfile
         
-        if not students:
+        try:
+            students = iter_roster(student_file)
+        except OSError as e:
+            print(f"❌ Error reading file: {e}")
             return
         
-        # Organize students by group
-        groups = {group_name: [] for group_name in self.group_names}
-        
-        for student in students:
-            group_name = self.get_student_group_letter(student)
-            groups[group_name].append(student)
-        
-        # Find the maximum number of students in any group (for CSV columns)
-        max_students = max(len(group_students) for group_students in groups.values())
-        
-        # Write CSV file
-        with open(output_file, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            
-            # Write header row
-            header = []
-            for group_name in self.group_names:
-                header.extend([group_name, ''])  # Group name followed by empty column
-            writer.writerow(header)
-            
-            # Write student rows
-            for i in range(max_students):
-                row = []
-                for group_name in self.group_names:
-                    if i < len(groups[group_name]):
-                        row.extend([groups[group_name][i], ''])  # Student email followed by empty column
-                    else:
-                        row.extend(['', ''])  # Empty cells if no more students in this group
-                writer.writerow(row)
+        # Spool each group's column to a temporary file so the roster is never held in memory
+        counts = {group_name: 0 for group_name in self.group_names}
+        with tempfile.TemporaryDirectory() as spool_dir:
+            spools = {group_name: open(os.path.join(spool_dir, f"group_{i}.txt"), 'w+', encoding='utf-8')
+                      for i, group_name in enumerate(self.group_names)}
+            try:
+                for student, group_num in iter_groups(students, self.assignment_key, self.num_groups, self.group_mode):
+                    group_name = self.group_names[group_num - 1]
+                    spools[group_name].write(student + '\n')
+                    counts[group_name] += 1
+                
+                total = sum(counts.values())
+                print(f"✅ Read {total} students from {student_file}")
+                if not total:
+                    return
+                
+                # Write CSV file
+                with open(output_file, 'w', newline='') as csvfile:
+                    writer = csv.writer(csvfile)
+                    
+                    # Write header row
+                    header = []
+                    for group_name in self.group_names:
+                        header.extend([group_name, ''])  # Group name followed by empty column
+                    writer.writerow(header)
+                    
+                    # Write student rows, reading the group columns side by side
+                    columns = []
+                    for group_name in self.group_names:
+                        spools[group_name].seek(0)
+                        columns.append(line.rstrip('\n') for line in spools[group_name])
+                    for members in itertools.zip_longest(*columns, fillvalue=''):
+                        row = []
+                        for student in members:
+                            row.extend([student, ''])  # Student email (or empty cell) followed by empty column
+                        writer.writerow(row)
+            finally:
+                for spool in spools.values():
+                    spool.close()
         
         print(f"📁 Student groups CSV generated: {output_file}")
         
@@ -96,29 +638,18 @@ class GroupHashGenerator:
         print("\n📊 GROUP DISTRIBUTION:")
         print("-" * 40)
         for group_name in self.group_names:
-            count = len(groups[group_name])
+            count = counts[group_name]
             print(f"{group_name}: {count} students")
-        print(f"Total: {len(students)} students")
+        print(f"Total: {total} students")
+        print(f"🔑 Assignment key used: '{self.assignment_key or DEFAULT_ASSIGNMENT_KEY}'")
     
     def generate_progress_code(self, group_number: int, exercise_count: int, assignment_key: str = None) -> str:
         """Generate a 5-character progress code for a specific group with assignment key"""
         # Use provided assignment key or the instance variable
-        key = assignment_key or self.assignment_key or "DEFAULT"
-        
-        # Create a seed based on assignment key, group number and exercise count
-        seed_string = f"ASSIGNMENT-{key}-GROUP{group_number}-{exercise_count}"
-        
-        # Convert string to numeric seed
-        seed_value = hash(seed_string) % (2**32)
-        
-        # Seed the random number generator
-        random.seed(seed_value)
+        key = assignment_key or self.assignment_key or DEFAULT_ASSIGNMENT_KEY
         
-        # Generate 5-character alphanumeric code
-        characters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
-        progress_code = ''.join(random.choices(characters, k=5))
-        
-        return progress_code
+        # Codes are computed once per (group, exercise count) and shared with the tutorial
+        return code_table(key).code(group_number, exercise_count)
     
     def generate_answer_key_csv(self, max_exercises: int = 20, filename: str = "answer_key.csv", assignment_key: str = None) -> None:
         """Generate CSV file with answer keys for all groups"""
@@ -129,38 +660,34 @@ class GroupHashGenerator:
         # Get the current assignment key
         current_key = self.assignment_key or "DEFAULT"
         
-        checkpoints = list(range(self.progress_checkpoint, max_exercises + 1, self.progress_checkpoint))
-        if max_exercises not in checkpoints:
-            checkpoints.append(max_exercises)
-        
         with open(filename, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            
-            # Header with assignment info
-            writer.writerow(['Answer Key'])
-            writer.writerow(['Assignment Key', current_key])
-            writer.writerow(['Max Exercises', max_exercises])
-            writer.writerow([])  # Empty row
-            
-            # Progress codes header
-            header = ['Group'] + [f'Checkpoint_{cp}' for cp in checkpoints]
-            writer.writerow(header)
-            
-            # Data rows
-            for i, group_name in enumerate(self.group_names, 1):
-                row = [group_name]
-                for checkpoint in checkpoints:
-                    code = self.generate_progress_code(i, checkpoint, current_key)
-                    row.append(code)
-                writer.writerow(row)
+            self.write_answer_key(csvfile, current_key, max_exercises)
         
         print(f"📁 Answer key CSV generated: {filename}")
         print(f"🔑 Assignment key used: '{current_key}'")
     
-    def generate_individual_answer_keys(self, student_file: str, max_exercises: int = 20, output_dir: str = "individual_keys", assignment_key: str = None) -> None:
-        """Generate individual answer key files for each student"""
-        import os
+    def write_answer_key(self, csvfile: TextIO, assignment_key: str, max_exercises: int) -> None:
+        """Write the per-group answer key CSV to an open text file"""
+        checkpoints = self.get_checkpoints(max_exercises)
+        writer = csv.writer(csvfile)
+        
+        # Header with assignment info
+        writer.writerow(['Answer Key'])
+        writer.writerow(['Assignment Key', assignment_key])
+        writer.writerow(['Max Exercises', max_exercises])
+        writer.writerow([])  # Empty row
         
+        # Progress codes header
+        header = ['Group'] + [f'Checkpoint_{cp}' for cp in checkpoints]
+        writer.writerow(header)
+        
+        # Data rows
+        table = code_table(assignment_key)
+        for i, group_name in enumerate(self.group_names, 1):
+            writer.writerow([group_name] + table.row(i, checkpoints))
+    
+    def generate_individual_answer_keys(self, student_file: str, max_exercises: int = 20, output_dir: str = "individual_keys", assignment_key: str = None, workers: int = 1) -> None:
+        """Generate individual answer key files for each student (in a directory or one .zip/.tar archive)"""
         # Set assignment key if provided
         if assignment_key:
             self.set_assignment_key(assignment_key)
@@ -173,49 +700,57 @@ class GroupHashGenerator:
         if not students:
             return
         
-        # Create output directory if it doesn't exist
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-            print(f"📁 Created directory: {output_dir}")
-        
-        checkpoints = list(range(self.progress_checkpoint, max_exercises + 1, self.progress_checkpoint))
-        if max_exercises not in checkpoints:
-            checkpoints.append(max_exercises)
-        
         print(f"📝 Generating individual answer keys for {len(students)} students...")
         print(f"🔑 Using assignment key: '{current_key}'")
         
-        for student in students:
-            group_num = self.get_student_group(student)
-            group_letter = self.get_student_group_letter(student)
-            
-            # Create filename (sanitize email for filename)
-            safe_filename = student.replace('@', '_at_').replace('.', '_')
-            filename = os.path.join(output_dir, f"{safe_filename}_answer_key.csv")
-            
-            with open(filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Header with student info
-                writer.writerow(['Student Answer Key'])
-                writer.writerow(['Student ID', student])
-                writer.writerow(['Assigned Group', group_letter])
-                writer.writerow(['Group Number', group_num])
-                writer.writerow(['Assignment Key', current_key])
-                writer.writerow([])  # Empty row
-                
-                # Progress codes header
-                writer.writerow(['Exercise Count', 'Progress Code', 'Code Type'])
-                
-                # Generate codes for each checkpoint
-                for checkpoint in checkpoints:
-                    code = self.generate_progress_code(group_num, checkpoint, current_key)
-                    code_type = "FINAL COMPLETION" if checkpoint == max_exercises else "CHECKPOINT"
-                    writer.writerow([checkpoint, code, code_type])
-        
-        print(f"✅ Generated {len(students)} individual answer key files in '{output_dir}' directory")
+        student_groups = self.assign_student_groups(students, current_key)
+        assignments = ((student, self.group_names[group_num - 1], group_num) for student, group_num in student_groups.items())
+        self.write_individual_keys('Student Answer Key', assignments, len(student_groups),
+                                   current_key, max_exercises, output_dir, workers)
         print(f"📊 Files are named: [student_email]_answer_key.csv")
 
+    def write_individual_keys(self, title: str, assignments: Iterable[Tuple[str, str, int]], total: int,
+                              assignment_key: str, max_exercises: int, output: str, workers: int = 1) -> None:
+        """
+        Write one answer key per (student, group name, group number).
+
+        Directory output is incremental: files whose inputs are unchanged since
+        the last run are skipped and files of dropped students are deleted.
+        Archives are always written in full.
+        """
+        checkpoints = self.get_checkpoints(max_exercises)
+        # Only num_groups x checkpoints distinct codes, whatever the roster size
+        table = code_table(assignment_key)
+        grouping = f"{self.num_groups} groups ({self.group_mode})"
+        manifest = None if output.endswith(ARCHIVE_SUFFIXES) else KeyManifest(output, grouping)
+        if manifest is not None and manifest.previous_grouping != grouping:
+            print(f"🔀 Grouping changed from {manifest.previous_grouping} to {grouping}: "
+                  f"rewriting keys only for students who moved")
+        
+        unchanged = 0
+        def changed_files():
+            nonlocal unchanged
+            for student, group_name, group_num in assignments:
+                name = answer_key_filename(student)
+                if manifest is not None:
+                    digest = manifest.digest(title, student, group_name, group_num, assignment_key,
+                                             max_exercises, self.progress_checkpoint)
+                    if manifest.unchanged(name, digest):
+                        unchanged += 1
+                        continue
+                yield name, render_individual_answer_key(title, student, group_name, group_num, assignment_key,
+                                                         checkpoints, table.row(group_num, checkpoints), max_exercises)
+        
+        write_answer_key_files(changed_files(), output, total, workers)
+        
+        if manifest is None:
+            print(f"✅ Generated {total} individual answer key files in '{output}'")
+            return
+        removed = manifest.remove_dropped()
+        manifest.save()
+        print(f"✅ {total} individual answer keys in '{output}': "
+              f"{total - unchanged} written, {unchanged} unchanged, {removed} removed for dropped students")
+
     def generate_master_student_answer_key(self, student_file: str, max_exercises: int = 20, filename: str = "master_answer_key.csv", assignment_key: str = None) -> None:
         """Generate a single CSV with all students and their answer keys"""
         # Set assignment key if provided
@@ -225,46 +760,232 @@ class GroupHashGenerator:
         # Get the current assignment key
         current_key = self.assignment_key or "DEFAULT"
         
-        students = self.read_student_list(student_file)
+        try:
+            students = iter_roster(student_file)
+        except OSError as e:
+            print(f"❌ Error reading file: {e}")
+            return
         
-        if not students:
+        with open(filename, 'w', newline='') as csvfile:
+            total = self.write_master_answer_key(csvfile, students, current_key, max_exercises)
+    
+        if not total:
+            print(f"❌ No students found in {student_file}")
+        print(f"📁 Master answer key generated: {filename}")
+        print(f"✅ Contains individual codes for {total} students")
+        print(f"🔑 Assignment key used: '{current_key}'")
+
+    def write_master_answer_key(self, csvfile: TextIO, students: Iterable[str], assignment_key: str, max_exercises: int) -> int:
+        """Stream the all-students answer key CSV to an open text file; returns the student count"""
+        checkpoints = self.get_checkpoints(max_exercises)
+        writer = csv.writer(csvfile)
+        
+        # Header with assignment info
+        writer.writerow(['Master Answer Key'])
+        writer.writerow(['Assignment Key', assignment_key])
+        writer.writerow(['Max Exercises', max_exercises])
+        writer.writerow([])  # Empty row
+        
+        # Main header row
+        header = ['Student ID', 'Group'] + [f'Checkpoint_{cp}' for cp in checkpoints]
+        writer.writerow(header)
+        
+        # Codes depend only on the group, so build each group's row once
+        table = code_table(assignment_key)
+        group_codes = {i: table.row(i, checkpoints) for i in range(1, self.num_groups + 1)}
+        
+        # Data rows for each student, streamed straight from the roster
+        total = 0
+        for student, group_num in iter_groups(students, assignment_key, self.num_groups, self.group_mode):
+            group_letter = self.group_names[group_num - 1]
+            writer.writerow([student, group_letter] + group_codes[group_num])
+            total += 1
+        return total
+    
+    def generate_semester_keys(self, student_file: str, assignment_keys: List[str], max_exercises: int = 20,
+                               output_dir: str = "semester_keys", workers: int = None) -> None:
+        """Generate every answer key artifact for many assignments in parallel, one archive per assignment"""
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        
+        try:
+            open_roster(student_file).close()
+        except OSError as e:
+            print(f"❌ Error reading file: {e}")
+            return
+        assignment_keys = list(dict.fromkeys(key for key in assignment_keys if key))
+        if not assignment_keys:
+            print("❌ No assignment keys given!")
+            return
+        # Two workers must never write the same zip (case-insensitive filesystems included)
+        bundles = {}
+        for key in assignment_keys:
+            bundles.setdefault(bundle_filename(key).casefold(), []).append(key)
+        clashes = [keys for keys in bundles.values() if len(keys) > 1]
+        if clashes:
+            print("❌ These assignment keys would share an archive name: "
+                  + "; ".join(", ".join(repr(key) for key in keys) for keys in clashes))
+            return
+        
+        os.makedirs(output_dir, exist_ok=True)
+        workers = min(workers or os.cpu_count() or 1, len(assignment_keys))
+        print(f"📝 Generating keys for {len(assignment_keys)} assignments with {workers} worker processes...")
+        
+        start = time.perf_counter()
+        total_files = total_bytes = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(build_assignment_bundle, key, student_file, max_exercises, output_dir,
+                                   self.num_groups, self.group_mode)
+                       for key in assignment_keys]
+            for done, future in enumerate(as_completed(futures), 1):
+                key, path, students, nbytes, seconds = future.result()
+                total_files += students + 2
+                total_bytes += nbytes
+                print(f"  [{done}/{len(assignment_keys)}] {key}: {students} students -> {path} ({seconds:.2f}s)")
+        
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        print(f"✅ Generated answer keys for {len(assignment_keys)} assignments in '{output_dir}'")
+        print(f"⏱️ {elapsed:.2f}s total: {len(assignment_keys) / elapsed:.2f} assignments/s, "
+              f"{total_files / elapsed:,.0f} files/s, {total_bytes / elapsed / 1e6:.2f} MB/s (compressed)")
+    
+    def generate_key_database(self, student_file: str, assignment_keys: List[str], max_exercises: int = 20,
+                              database: str = "answer_keys.db") -> None:
+        """Store students, groups and codes for many assignments in one SQLite database"""
+        assignment_keys = list(dict.fromkeys(key for key in assignment_keys if key))
+        if not assignment_keys:
+            print("❌ No assignment keys given!")
+            return
+        try:
+            open_roster(student_file).close()
+        except OSError as e:
+            print(f"❌ Error reading file: {e}")
             return
         
+        start = time.perf_counter()
+        with AnswerKeyStore(database) as store:
+            students, removed = store.save_assignments(self, student_file, assignment_keys, max_exercises)
+        print(f"🗄️ Saved {students} students x {len(assignment_keys)} assignments to '{database}' "
+              f"in {time.perf_counter() - start:.2f}s")
+        if removed:
+            print(f"🧹 Removed {removed} students no longer on the roster")
+    
+    def lookup_student_codes(self, database: str, student: str, assignment_key: str, checkpoint: int = None) -> None:
+        """Print the codes a student should have for an assignment, from a key database"""
+        if not os.path.exists(database):
+            print(f"❌ Error: Database '{database}' not found!")
+            return
+        with AnswerKeyStore(database) as store:
+            if checkpoint is not None:
+                code = store.expected_code(student, assignment_key, checkpoint)
+                rows = [(None, checkpoint, code)] if code else []
+            else:
+                rows = store.student_codes(student, assignment_key)
+        if not rows:
+            print(f"❌ No codes for '{student}' in assignment '{assignment_key}'")
+            return
+        print(f"🔑 {student} / {assignment_key}:")
+        for group_num, row_checkpoint, code in rows:
+            group = f" (Group {chr(64 + group_num)})" if group_num else ""
+            print(f"  After {row_checkpoint} exercises: {code}{group}")
+    
+    def get_checkpoints(self, max_exercises: int) -> List[int]:
+        """Exercise counts at which progress codes are issued"""
         checkpoints = list(range(self.progress_checkpoint, max_exercises + 1, self.progress_checkpoint))
         if max_exercises not in checkpoints:
             checkpoints.append(max_exercises)
+        return checkpoints
+    
+    def build_code_index(self, assignment_keys: List[str], max_exercises: int = 20) -> Dict[str, List[Tuple[str, int, int]]]:
+        """Map every valid progress code to its (assignment key, group, checkpoint) entries"""
+        checkpoints = self.get_checkpoints(max_exercises)
+        index = {}
+        for assignment_key in assignment_keys:
+            table = code_table(assignment_key)
+            for group_num in range(1, self.num_groups + 1):
+                for checkpoint, code in zip(checkpoints, table.row(group_num, checkpoints)):
+                    # Different entries can share a code, so keep them all
+                    index.setdefault(code, []).append((assignment_key, group_num, checkpoint))
+        return index
+    
+    def grade_code(self, index: Dict[str, List[Tuple[str, int, int]]], student: str, code: str, column_assignment: str = None) -> list:
+        """[status, assignment key, group, checkpoint, expected group] for one submitted code"""
+        best = None
+        for assignment_key, group_num, checkpoint in index.get(code, ()):
+            expected_group = self.get_student_group(student, assignment_key)
+            if column_assignment and assignment_key != column_assignment:
+                status = 'WRONG ASSIGNMENT'
+            else:
+                status = 'VALID' if group_num == expected_group else 'WRONG GROUP'
+            graded = [status, assignment_key, group_num, checkpoint, expected_group]
+            if best is None or CODE_STATUSES.index(status) < CODE_STATUSES.index(best[0]):
+                best = graded
+        return best or ['INVALID', '', '', '', '']
+    
+    def validate_gradebook(self, gradebook_file: str, assignment_keys: List[str], max_exercises: int = 20, output_file: str = "graded_codes.csv") -> None:
+        """Check every submitted code in an LMS gradebook export and write a graded CSV in one pass"""
+        start = time.perf_counter()
+        index = self.build_code_index(assignment_keys, max_exercises)
+        index_seconds = time.perf_counter() - start
         
-        with open(filename, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            
-            # Header with assignment info
-            writer.writerow(['Master Answer Key'])
-            writer.writerow(['Assignment Key', current_key])
-            writer.writerow(['Max Exercises', max_exercises])
-            writer.writerow([])  # Empty row
+        try:
+            gradebook = open_roster(gradebook_file)
+        except OSError as e:
+            print(f"❌ Error reading file: {e}")
+            return
+        
+        counts = {status: 0 for status in CODE_STATUSES}
+        # The header is checked before the output is opened, so a bad gradebook
+        # never truncates the results of an earlier run
+        with gradebook:
+            first_line = gradebook.readline()
+            dialect = sniff_dialect(first_line)
+            header = next(csv.reader([first_line], dialect), [])
+            id_column = find_id_column(header)
+            if id_column is None:
+                print("❌ Could not find a student ID/email column in the gradebook header")
+                return
             
-            # Main header row
-            header = ['Student ID', 'Group'] + [f'Checkpoint_{cp}' for cp in checkpoints]
-            writer.writerow(header)
+            # Columns named after an assignment key or "code" hold submissions; otherwise try all others
+            names = [name.strip().lower() for name in header]
+            code_columns = [i for i, name in enumerate(names)
+                            if 'code' in name or any(key.lower() in name for key in assignment_keys)]
+            if not code_columns:
+                code_columns = [i for i, name in enumerate(names) if name not in GRADEBOOK_INFO_COLUMNS]
+            # Assignment each column is named after (longest match, so "Lab10" beats "Lab1")
+            column_assignments = {}
+            for i in code_columns:
+                matches = [key for key in assignment_keys if key.lower() in names[i]]
+                column_assignments[i] = max(matches, key=len) if matches else None
             
-            # Data rows for each student
-            for student in students:
-                group_num = self.get_student_group(student)
-                group_letter = self.get_student_group_letter(student)
-                
-                row = [student, group_letter]
-                
-                # Add progress codes for this student
-                for checkpoint in checkpoints:
-                    code = self.generate_progress_code(group_num, checkpoint, current_key)
-                    row.append(code)
-                
-                writer.writerow(row)
+            with open(output_file, 'w', newline='') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(['Student ID', 'Column', 'Submitted Code', 'Status',
+                                 'Assignment Key', 'Group', 'Checkpoint', 'Expected Group'])
+                for row in csv.reader(gradebook, dialect):
+                    if id_column >= len(row) or not row[id_column].strip():
+                        continue  # e.g. Canvas' "Points Possible" row
+                    student = normalize_student_id(row[id_column])
+                    for column in code_columns:
+                        if column >= len(row):
+                            continue
+                        code = row[column].strip().upper()
+                        if not is_code_like(code):
+                            continue
+                        graded = self.grade_code(index, student, code, column_assignments[column])
+                        counts[graded[0]] += 1
+                        writer.writerow([student, header[column], code] + graded)
+        
+        elapsed = time.perf_counter() - start
+        total = sum(counts.values())
+        print(f"📁 Graded codes written: {output_file}")
+        print(f"🔑 Assignment keys checked: {', '.join(assignment_keys)}")
+        print("\n📊 SUBMISSION SUMMARY:")
+        print("-" * 40)
+        for status in CODE_STATUSES:
+            print(f"{status}: {counts[status]}")
+        print(f"Total: {total} submitted codes")
+        print(f"⏱️ Index of {len(index)} codes built in {index_seconds * 1000:.1f} ms; "
+              f"validated in {elapsed * 1000:.1f} ms total")
     
-        print(f"📁 Master answer key generated: {filename}")
-        print(f"✅ Contains individual codes for {len(students)} students")
-        print(f"🔑 Assignment key used: '{current_key}'")
-
     def load_student_groups_from_csv(self, filename: str) -> Dict[str, List[str]]:
         """Load student groups from an existing CSV file"""
         try:
@@ -279,6 +1000,13 @@ class GroupHashGenerator:
                 for i, col_name in enumerate(header):
                     if col_name in self.group_names:
                         group_columns[col_name] = i
+                unknown = [col_name for col_name in header
+                           if col_name.startswith('Group ') and col_name not in self.group_names]
+                if unknown:
+                    print(f"❌ {filename} has groups outside the current {self.num_groups}-group setup: "
+                          f"{', '.join(unknown)}")
+                    print("💡 Change the number of groups to match the CSV, then load it again")
+                    return {}
             
                 # Read student data
                 for row in reader:
@@ -308,11 +1036,18 @@ class GroupHashGenerator:
             print(f"❌ Error reading CSV file: {e}")
             return {}
 
-    def generate_answer_keys_from_loaded_groups(self, groups: Dict[str, List[str]], max_exercises: int = 20, assignment_key: str = "DEFAULT") -> None:
+    def generate_answer_keys_from_loaded_groups(self, groups: Dict[str, List[str]], max_exercises: int = 20, assignment_key: str = "DEFAULT", output_dir: str = None, workers: int = 1) -> None:
         """Generate answer keys based on pre-loaded student groups"""
         if not groups or not any(groups.values()):
             print("❌ No student groups loaded!")
             return
+        unknown = [group_name for group_name, students in groups.items()
+                   if students and group_name not in self.group_names]
+        if unknown:
+            # Their students would get no answer key while still counted in the total
+            print(f"❌ Loaded groups outside the current {self.num_groups}-group setup: {', '.join(unknown)}")
+            print("💡 Change the number of groups to match the loaded groups first")
+            return
     
         checkpoints = list(range(self.progress_checkpoint, max_exercises + 1, self.progress_checkpoint))
         if max_exercises not in checkpoints:
@@ -334,57 +1069,21 @@ class GroupHashGenerator:
             writer.writerow(header)
             
             # Data rows
+            table = code_table(assignment_key)
             for i, group_name in enumerate(self.group_names, 1):
-                if groups[group_name]:  # Only include groups that have students
-                    row = [group_name]
-                    for checkpoint in checkpoints:
-                        code = self.generate_progress_code(i, checkpoint, assignment_key)
-                        row.append(code)
-                    writer.writerow(row)
+                if groups.get(group_name):  # Only include groups that have students
+                    writer.writerow([group_name] + table.row(i, checkpoints))
     
         print(f"📁 Group answer key generated: {group_filename}")
     
         # Generate individual student answer keys
-        output_dir = f"loaded_individual_keys_{assignment_key}"
-        import os
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-            print(f"📁 Created directory: {output_dir}")
-    
-        total_students = 0
-        for group_name, students in groups.items():
-            if not students:
-                continue
-            
-            group_num = self.group_names.index(group_name) + 1
-            
-            for student in students:
-                total_students += 1
-                # Create filename (sanitize email for filename)
-                safe_filename = student.replace('@', '_at_').replace('.', '_')
-                filename = os.path.join(output_dir, f"{safe_filename}_answer_key.csv")
-                
-                with open(filename, 'w', newline='') as csvfile:
-                    writer = csv.writer(csvfile)
-                    
-                    # Header with student info
-                    writer.writerow(['Student Answer Key (From Loaded Groups)'])
-                    writer.writerow(['Student ID', student])
-                    writer.writerow(['Assigned Group', group_name])
-                    writer.writerow(['Group Number', group_num])
-                    writer.writerow(['Assignment Key', assignment_key])
-                    writer.writerow([])  # Empty row
-                    
-                    # Progress codes header
-                    writer.writerow(['Exercise Count', 'Progress Code', 'Code Type'])
-                    
-                    # Generate codes for each checkpoint
-                    for checkpoint in checkpoints:
-                        code = self.generate_progress_code(group_num, checkpoint, assignment_key)
-                        code_type = "FINAL COMPLETION" if checkpoint == max_exercises else "CHECKPOINT"
-                        writer.writerow([checkpoint, code, code_type])
-    
-        print(f"✅ Generated {total_students} individual answer key files in '{output_dir}' directory")
+        output_dir = output_dir or f"loaded_individual_keys_{assignment_key}"
+        total_students = sum(len(students) for students in groups.values())
+        assignments = ((student, group_name, group_num)
+                       for group_num, group_name in enumerate(self.group_names, 1)
+                       for student in groups.get(group_name, []))
+        self.write_individual_keys('Student Answer Key (From Loaded Groups)', assignments, total_students,
+                                   assignment_key, max_exercises, output_dir, workers)
         print(f"🔑 Assignment key used: '{assignment_key}'")
 
     def interactive_mode(self):
@@ -396,6 +1095,7 @@ class GroupHashGenerator:
     
         while True:
             print(f"\nCurrent Assignment Key: {self.assignment_key or 'Not Set'}")
+            print(f"Grouping: {self.num_groups} groups ({self.group_mode} hashing)")
             if loaded_groups:
                 total_loaded = sum(len(students) for students in loaded_groups.values())
                 print(f"Loaded Groups: {total_loaded} students in memory")
@@ -410,9 +1110,14 @@ class GroupHashGenerator:
             print("7. Generate answer keys from loaded groups")
             print("8. Test single student ID")
             print("9. Create sample student file")
-            print("10. Exit")
+            print("10. Validate submitted codes from a gradebook export")
+            print("11. Generate keys for many assignments at once (parallel batch)")
+            print("12. Change number of groups / grouping mode")
+            print("13. Save answer keys to a SQLite database")
+            print("14. Look up a student's codes in a SQLite database")
+            print("15. Exit")
         
-            choice = input("\nEnter your choice (1-10): ").strip()
+            choice = input("\nEnter your choice (1-15): ").strip()
         
             if choice == '1':
                 assignment_key = input("Enter assignment key (e.g., 'Assignment1', 'Midterm', 'Fall2024'): ").strip()
@@ -447,11 +1152,12 @@ class GroupHashGenerator:
                 input_file = input("Student list filename: ").strip()
                 max_ex = input("Maximum exercises (default 20): ").strip()
                 max_ex = int(max_ex) if max_ex else 20
-                output_dir = input("Output directory (default: individual_keys): ").strip()
+                output_dir = input("Output directory or .zip/.tar.gz archive (default: individual_keys): ").strip()
                 output_dir = output_dir if output_dir else "individual_keys"
+                workers = self.ask_workers(output_dir)
                 assignment_key = input("Assignment key (Enter to use current): ").strip()
                 assignment_key = assignment_key if assignment_key else None
-                self.generate_individual_answer_keys(input_file, max_ex, output_dir, assignment_key)
+                self.generate_individual_answer_keys(input_file, max_ex, output_dir, assignment_key, workers)
         
             elif choice == '6':
                 input_file = input("Student list filename: ").strip()
@@ -475,7 +1181,11 @@ class GroupHashGenerator:
                     max_ex = input("Maximum exercises (default 20): ").strip()
                     max_ex = int(max_ex) if max_ex else 20
                 
-                    self.generate_answer_keys_from_loaded_groups(loaded_groups, max_ex, assignment_key)
+                    output_dir = input(f"Output directory or .zip/.tar.gz archive (default: loaded_individual_keys_{assignment_key}): ").strip()
+                    output_dir = output_dir if output_dir else None
+                    workers = self.ask_workers(output_dir or "")
+                
+                    self.generate_answer_keys_from_loaded_groups(loaded_groups, max_ex, assignment_key, output_dir, workers)
         
             elif choice == '8':
                 student_id = input("Enter student ID/email: ").strip()
@@ -496,11 +1206,91 @@ class GroupHashGenerator:
                 self.create_sample_student_file()
         
             elif choice == '10':
+                gradebook_file = input("Gradebook CSV export filename: ").strip()
+                keys = input("Assignment keys, comma separated (Enter to use current): ").strip()
+                assignment_keys = [key.strip() for key in keys.split(',') if key.strip()] or [self.assignment_key or "DEFAULT"]
+                max_ex = input("Maximum exercises (default 20): ").strip()
+                max_ex = int(max_ex) if max_ex else 20
+                output_file = input("Graded CSV filename (default graded_codes.csv): ").strip()
+                output_file = output_file if output_file else "graded_codes.csv"
+                self.validate_gradebook(gradebook_file, assignment_keys, max_ex, output_file)
+        
+            elif choice == '11':
+                input_file = input("Student list filename: ").strip()
+                keys = input("Assignment keys, comma separated: ").strip()
+                assignment_keys = [key.strip() for key in keys.split(',') if key.strip()]
+                max_ex = input("Maximum exercises (default 20): ").strip()
+                max_ex = int(max_ex) if max_ex else 20
+                output_dir = input("Output directory (default: semester_keys): ").strip()
+                output_dir = output_dir if output_dir else "semester_keys"
+                self.generate_semester_keys(input_file, assignment_keys, max_ex, output_dir)
+        
+            elif choice == '12':
+                num_groups = input(f"Number of groups, 2-26 (default {self.num_groups}): ").strip()
+                num_groups = int(num_groups) if num_groups.isdigit() else self.num_groups
+                group_mode = input(f"Grouping mode, modulo or jump (default {self.group_mode}): ").strip()
+                group_mode = group_mode if group_mode else self.group_mode
+                roster = input("Student list to report moved students (Enter to skip): ").strip()
+                self.change_grouping(num_groups, group_mode, roster or None)
+                if loaded_groups:
+                    print("⚠️  Loaded groups use the old grouping; regenerate the groups CSV (option 2) and reload it.")
+        
+            elif choice == '13':
+                input_file = input("Student list filename: ").strip()
+                keys = input("Assignment keys, comma separated (Enter to use current): ").strip()
+                assignment_keys = [key.strip() for key in keys.split(',') if key.strip()] or [self.assignment_key or "DEFAULT"]
+                max_ex = input("Maximum exercises (default 20): ").strip()
+                max_ex = int(max_ex) if max_ex else 20
+                database = input("Database filename (default answer_keys.db): ").strip()
+                self.generate_key_database(input_file, assignment_keys, max_ex, database or "answer_keys.db")
+        
+            elif choice == '14':
+                database = input("Database filename (default answer_keys.db): ").strip() or "answer_keys.db"
+                student_id = input("Student ID/email: ").strip()
+                assignment_key = input("Assignment key (Enter to use current): ").strip() or self.assignment_key or "DEFAULT"
+                checkpoint = input("Checkpoint (Enter for all): ").strip()
+                self.lookup_student_codes(database, student_id, assignment_key,
+                                          int(checkpoint) if checkpoint.isdigit() else None)
+        
+            elif choice == '15':
                 print("Goodbye!")
                 break
         
             else:
-                print("Invalid choice. Please enter 1-10.")
+                print("Invalid choice. Please enter 1-15.")
+    
+    def change_grouping(self, num_groups: int, group_mode: str, student_file: str = None) -> None:
+        """Switch group count/mode and report how many students of a roster change group"""
+        old_num_groups, old_mode = self.num_groups, self.group_mode
+        try:
+            self.set_grouping(num_groups, group_mode)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        print(f"✅ Grouping: {self.num_groups} groups ({self.group_mode} hashing)")
+        if not student_file:
+            return
+        
+        key = self.assignment_key or DEFAULT_ASSIGNMENT_KEY
+        students = self.read_student_list(student_file)
+        if not students:
+            return
+        before = assign_groups(students, key, old_num_groups, old_mode)
+        after = self.assign_student_groups(students, key)
+        moved = moved_students(before, after)
+        sizes = [0] * self.num_groups
+        for group_num in after.values():
+            sizes[group_num - 1] += 1
+        print(f"🔀 {len(moved)} of {len(after)} students change group "
+              f"({len(moved) / max(len(after), 1):.1%}) for assignment key '{key}'")
+        print(f"📊 Group sizes: {', '.join(f'{name[-1]}={size}' for name, size in zip(self.group_names, sizes))}")
+    
+    def ask_workers(self, output: str) -> int:
+        """Ask how many processes should write a directory of answer keys"""
+        if output.endswith(ARCHIVE_SUFFIXES):
+            return 1  # Archives are written sequentially by one process
+        workers = input("Worker processes for writing files (default 1): ").strip()
+        return int(workers) if workers.isdigit() and int(workers) > 0 else 1
     
     def create_sample_student_file(self):
         """Create a sample student file for testing"""
@@ -525,8 +1315,83 @@ class GroupHashGenerator:
         print(f"📁 Sample student file created: {filename}")
         print("You can use this file to test the group assignment functionality.")
 
+def read_assignment_keys(filename: str) -> List[str]:
+    """Assignment keys from a file, one per line ('#' comments allowed)"""
+    with open(filename, 'r') as file:
+        return [line.strip() for line in file if line.strip() and not line.startswith('#')]
+
+
+def run_command_line(argv: List[str]) -> None:
+    """Non-interactive commands, for scripted runs over many assignments"""
+    import argparse
+    parser = argparse.ArgumentParser(prog="StudentToGroup.py",
+                                     description="Group Hash Generator for Linux Tutorial (no arguments: interactive mode)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    batch = commands.add_parser('batch', help="generate every answer key for many assignments in parallel")
+    batch.add_argument('roster', help="student list, LMS CSV export or .gz of either")
+    batch.add_argument('keys', nargs='*', help="assignment keys")
+    batch.add_argument('--keys-file', help="file with one assignment key per line")
+    batch.add_argument('--max-exercises', type=int, default=20)
+    batch.add_argument('--output-dir', default="semester_keys")
+    batch.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    batch.add_argument('--groups', type=int, default=5, help="number of groups (default: 5)")
+    batch.add_argument('--group-mode', choices=GROUP_MODES, default=DEFAULT_GROUP_MODE,
+                       help="hash-to-group mapping; jump moves fewest students when --groups changes")
+    
+    validate = commands.add_parser('validate', help="grade submitted codes from a gradebook export")
+    validate.add_argument('gradebook', help="LMS gradebook CSV export")
+    validate.add_argument('keys', nargs='+', help="assignment keys")
+    validate.add_argument('--max-exercises', type=int, default=20)
+    validate.add_argument('--output', default="graded_codes.csv")
+    validate.add_argument('--groups', type=int, default=5, help="number of groups (default: 5)")
+    validate.add_argument('--group-mode', choices=GROUP_MODES, default=DEFAULT_GROUP_MODE)
+    
+    store = commands.add_parser('store', help="save groups and codes for many assignments to a SQLite database")
+    store.add_argument('roster', help="student list, LMS CSV export or .gz of either")
+    store.add_argument('keys', nargs='*', help="assignment keys")
+    store.add_argument('--keys-file', help="file with one assignment key per line")
+    store.add_argument('--max-exercises', type=int, default=20)
+    store.add_argument('--database', default="answer_keys.db")
+    store.add_argument('--groups', type=int, default=5, help="number of groups (default: 5)")
+    store.add_argument('--group-mode', choices=GROUP_MODES, default=DEFAULT_GROUP_MODE)
+    
+    lookup = commands.add_parser('lookup', help="show a student's codes from a SQLite database")
+    lookup.add_argument('student', help="student ID/email")
+    lookup.add_argument('key', help="assignment key")
+    lookup.add_argument('--checkpoint', type=int, help="only this exercise count")
+    lookup.add_argument('--database', default="answer_keys.db")
+    
+    args = parser.parse_args(argv)
+    generator = GroupHashGenerator()
+    if args.command == 'lookup':
+        generator.lookup_student_codes(args.database, args.student, args.key, args.checkpoint)
+        return
+    try:
+        generator.set_grouping(args.groups, args.group_mode)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.command == 'batch':
+        keys = list(args.keys)
+        if args.keys_file:
+            keys.extend(read_assignment_keys(args.keys_file))
+        generator.generate_semester_keys(args.roster, keys, args.max_exercises, args.output_dir, args.workers)
+    elif args.command == 'store':
+        keys = list(args.keys)
+        if args.keys_file:
+            keys.extend(read_assignment_keys(args.keys_file))
+        generator.generate_key_database(args.roster, keys, args.max_exercises, args.database)
+    elif args.command == 'validate':
+        generator.validate_gradebook(args.gradebook, args.keys, args.max_exercises, args.output)
+
+
 def main():
     """Main entry point"""
+    import sys
+    if len(sys.argv) > 1:
+        run_command_line(sys.argv[1:])
+        return
+    
     generator = GroupHashGenerator()
     
     print("Group Hash Generator for Linux Tutorial")
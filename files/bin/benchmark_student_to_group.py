@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the StudentToGroup answer-key pipeline
+Times each stage on synthetic rosters and prints the results as JSON,
+so runs from different releases can be compared.
+
+    python benchmark_student_to_group.py                       # 1k, 10k, 100k students
+    python benchmark_student_to_group.py --sizes 1000 1000000 --output bench.json
+
+Each size runs in its own Python process, so its peak memory is not
+inflated by the sizes benchmarked before it.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from group_hash import ProgressCodeTable
+from StudentToGroup import GroupHashGenerator
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+ASSIGNMENT_KEY = "BENCH"
+FORMAT_VERSION = 2  # Bump when the JSON layout changes (2: peak_rss_mb is per size)
+
+
+def create_synthetic_roster(filename: str, num_students: int) -> None:
+    """Roster of unique, realistic-looking emails (like create_sample_student_file, at scale)"""
+    first_names = ["john", "jane", "alice", "bob", "carol", "david", "emma", "frank", "grace", "henry"]
+    last_names = ["doe", "smith", "johnson", "wilson", "brown", "jones", "davis", "miller", "garcia", "rodriguez"]
+    with open(filename, 'w') as file:
+        for i in range(num_students):
+            first = first_names[i % len(first_names)]
+            last = last_names[i // len(first_names) % len(last_names)]
+            file.write(f"{first}.{last}{i}@university.edu\n")
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB (0 where unavailable)"""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def timed(stage: Callable[[], object], items: int) -> Dict[str, float]:
+    """Run one stage with its console output suppressed; seconds and items/s"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        stage()
+        elapsed = time.perf_counter() - start
+    return {'seconds': round(elapsed, 6), 'per_second': round(items / max(elapsed, 1e-9), 1)}
+
+
+def directory_bytes(path: str) -> int:
+    """Total size of the answer key files in a directory (the hidden manifest excluded)"""
+    with os.scandir(path) as entries:
+        return sum(entry.stat().st_size for entry in entries if entry.is_file() and not entry.name.startswith('.'))
+
+
+def benchmark_size(num_students: int, work_dir: str, max_exercises: int,
+                   max_individual: int, workers: int) -> Dict[str, object]:
+    """Time every pipeline stage for one roster size"""
+    roster = os.path.join(work_dir, f"roster_{num_students}.txt")
+    groups_csv = os.path.join(work_dir, f"groups_{num_students}.csv")
+    master_csv = os.path.join(work_dir, f"master_{num_students}.csv")
+    keys_dir = os.path.join(work_dir, f"keys_{num_students}")
+    generator = GroupHashGenerator()
+    generator.assignment_key = ASSIGNMENT_KEY
+    checkpoints = generator.get_checkpoints(max_exercises)
+
+    stages = {}
+    stages['create_roster'] = timed(lambda: create_synthetic_roster(roster, num_students), num_students)
+    students = []
+    stages['read_roster'] = timed(lambda: students.extend(generator.read_student_list(roster)), num_students)
+    assignments = {}
+    stages['assign_groups'] = timed(
+        lambda: assignments.update(generator.assign_student_groups(students, ASSIGNMENT_KEY)), num_students)
+
+    # Fresh table: measures the real code derivation, not the shared cache
+    def progress_codes():
+        table = ProgressCodeTable(ASSIGNMENT_KEY)
+        for group_num in assignments.values():
+            table.row(group_num, checkpoints)
+    stages['progress_codes'] = timed(progress_codes, num_students)
+
+    stages['groups_csv'] = timed(lambda: generator.generate_student_groups_csv(roster, groups_csv), num_students)
+    loaded = {}
+    stages['load_groups_csv'] = timed(
+        lambda: loaded.update(generator.load_student_groups_from_csv(groups_csv)), num_students)
+    stages['master_csv'] = timed(
+        lambda: generator.generate_master_student_answer_key(roster, max_exercises, master_csv, ASSIGNMENT_KEY),
+        num_students)
+
+    result = {'students': num_students, 'stages': stages,
+              'bytes': {'groups_csv': os.path.getsize(groups_csv), 'master_csv': os.path.getsize(master_csv)}}
+    if num_students <= max_individual:
+        stages['individual_files'] = timed(
+            lambda: generator.generate_individual_answer_keys(roster, max_exercises, keys_dir,
+                                                              ASSIGNMENT_KEY, workers), num_students)
+        result['bytes']['individual_files'] = directory_bytes(keys_dir)
+        # Second run hits the manifest: every file is unchanged
+        stages['individual_files_rerun'] = timed(
+            lambda: generator.generate_individual_answer_keys(roster, max_exercises, keys_dir,
+                                                              ASSIGNMENT_KEY, workers), num_students)
+    else:
+        result['skipped'] = ['individual_files', 'individual_files_rerun']
+
+    loaded_total = sum(len(group) for group in loaded.values())
+    if loaded_total != num_students or len(assignments) != num_students:
+        raise RuntimeError(f"Pipeline lost students: {len(assignments)} grouped, {loaded_total} reloaded "
+                           f"of {num_students}")
+    result['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    return result
+
+
+def benchmark_size_in_subprocess(num_students: int, work_dir: str, max_exercises: int,
+                                 max_individual: int, workers: int) -> Dict[str, object]:
+    """Run benchmark_size in a fresh interpreter, so peak_rss_mb covers this size alone"""
+    command = [sys.executable, os.path.abspath(__file__), '--measure-size', str(num_students),
+               '--work-dir', work_dir, '--max-exercises', str(max_exercises),
+               '--max-individual', str(max_individual), '--workers', str(workers)]
+    completed = subprocess.run(command, stdout=subprocess.PIPE, check=True)
+    return json.loads(completed.stdout)
+
+
+def run_benchmarks(sizes: List[int], max_exercises: int = 20, max_individual: int = 100_000,
+                   workers: int = 1, work_dir: str = None) -> Dict[str, object]:
+    """Benchmark every roster size in a scratch directory that is removed afterwards"""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="student_to_group_bench_", dir=work_dir) as scratch:
+        for num_students in sizes:
+            print(f"⏱️ Benchmarking {num_students:,} students...", file=sys.stderr)
+            results.append(benchmark_size_in_subprocess(num_students, scratch, max_exercises,
+                                                        max_individual, workers))
+    return {
+        'format_version': FORMAT_VERSION,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'max_exercises': max_exercises,
+        'workers': workers,
+        'results': results,
+    }
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the StudentToGroup answer-key pipeline")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="roster sizes to benchmark (default: 1000 10000 100000)")
+    parser.add_argument('--max-exercises', type=int, default=20)
+    parser.add_argument('--max-individual', type=int, default=100_000,
+                        help="skip per-student files above this roster size (default: 100000)")
+    parser.add_argument('--workers', type=int, default=1, help="processes writing per-student files")
+    parser.add_argument('--work-dir', help="where to put the scratch directory (default: system temp)")
+    parser.add_argument('--output', help="write JSON here instead of stdout")
+    parser.add_argument('--measure-size', type=int, help=argparse.SUPPRESS)  # Child process of run_benchmarks
+    args = parser.parse_args()
+
+    if args.measure_size:
+        result = benchmark_size(args.measure_size, args.work_dir, args.max_exercises, args.max_individual, args.workers)
+        print(json.dumps(result))
+        return
+
+    report = run_benchmarks(args.sizes, args.max_exercises, args.max_individual, args.workers, args.work_dir)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + '\n')
+        print(f"📁 Benchmark results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Stable student-to-group assignment shared by tutorial.py and StudentToGroup.py
+
+Python's built-in hash() is salted per process, so the group a student sees
+in the tutorial VM and the group in the instructor's answer key would not
+agree. These helpers use BLAKE2b keyed with the assignment key instead: the
+same student ID and assignment key give the same group on every machine.
+
+Two ways of turning the hash into a group are available:
+  modulo - hash % num_groups (the original scheme)
+  jump   - jump consistent hash; changing the group count from N to N+1
+           moves only ~1/(N+1) of the students and keeps groups balanced
+"""
+
+import functools
+import hashlib
+import random
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_ASSIGNMENT_KEY = "DEFAULT"
+DEFAULT_NUM_GROUPS = 5
+GROUP_MODES = ('modulo', 'jump')
+DEFAULT_GROUP_MODE = 'modulo'
+PROGRESS_CODE_CHARACTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+PROGRESS_CODE_LENGTH = 5
+
+
+def normalize_student_id(student_id: str) -> str:
+    """Student IDs/emails are matched case-insensitively, ignoring surrounding whitespace"""
+    return student_id.strip().lower()
+
+
+def keyed_hasher(assignment_key: Optional[str] = None):
+    """BLAKE2b hasher keyed on the assignment key; .copy() it for each message"""
+    key = (assignment_key or DEFAULT_ASSIGNMENT_KEY).encode('utf-8')
+    if len(key) > hashlib.blake2b.MAX_KEY_SIZE:
+        key = hashlib.blake2b(key).digest()
+    return hashlib.blake2b(key=key, digest_size=8)
+
+
+def stable_hash(text: str, assignment_key: Optional[str] = None) -> int:
+    """64-bit keyed hash of text, identical across processes and machines"""
+    hasher = keyed_hasher(assignment_key)
+    hasher.update(text.encode('utf-8'))
+    return int.from_bytes(hasher.digest(), 'big')
+
+
+def jump_hash(key: int, num_buckets: int) -> int:
+    """Jump consistent hash (Lamping & Veach): bucket 0..num_buckets-1 for a 64-bit key"""
+    bucket, jump = -1, 0
+    while jump < num_buckets:
+        bucket = jump
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        jump = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def group_from_hash(value: int, num_groups: int, mode: str = DEFAULT_GROUP_MODE) -> int:
+    """Map a 64-bit student hash to a group number (1..num_groups)"""
+    if mode == 'jump':
+        return jump_hash(value, num_groups) + 1
+    if mode == 'modulo':
+        return value % num_groups + 1
+    raise ValueError(f"Unknown group mode '{mode}' (expected one of: {', '.join(GROUP_MODES)})")
+
+
+def student_group(student_id: str, assignment_key: Optional[str] = None,
+                  num_groups: int = DEFAULT_NUM_GROUPS, mode: str = DEFAULT_GROUP_MODE) -> int:
+    """Group number (1..num_groups) for a student under an assignment key"""
+    return group_from_hash(stable_hash(normalize_student_id(student_id), assignment_key), num_groups, mode)
+
+
+def iter_groups(student_ids: Iterable[str], assignment_key: Optional[str] = None,
+                num_groups: int = DEFAULT_NUM_GROUPS, mode: str = DEFAULT_GROUP_MODE) -> Iterator[Tuple[str, int]]:
+    """
+    Stream (student_id, group number) pairs for a roster in one pass.
+
+    Gives the same result as student_group() for each ID, but keys the
+    hasher once and copies it per student instead of re-keying every time.
+    """
+    base = keyed_hasher(assignment_key)
+    for student_id in student_ids:
+        hasher = base.copy()
+        hasher.update(normalize_student_id(student_id).encode('utf-8'))
+        yield student_id, group_from_hash(int.from_bytes(hasher.digest(), 'big'), num_groups, mode)
+
+
+def assign_groups(student_ids: Iterable[str], assignment_key: Optional[str] = None,
+                  num_groups: int = DEFAULT_NUM_GROUPS, mode: str = DEFAULT_GROUP_MODE) -> Dict[str, int]:
+    """Group a whole roster in one pass: {student_id: group number}"""
+    return dict(iter_groups(student_ids, assignment_key, num_groups, mode))
+
+
+def moved_students(before: Dict[str, int], after: Dict[str, int]) -> List[str]:
+    """Students whose group differs between two assignments of the same roster"""
+    return [student for student, group in after.items() if before.get(student, group) != group]
+
+
+class ProgressCodeTable:
+    """
+    Progress codes for one assignment key, computed once per (group, exercise count).
+
+    Every student in a group shares the same codes, so answer keys only need
+    num_groups x checkpoints distinct codes however large the roster is.
+    Each code comes from a private random.Random; the global RNG is never reseeded.
+    """
+
+    def __init__(self, assignment_key: Optional[str] = None):
+        self.assignment_key = assignment_key or DEFAULT_ASSIGNMENT_KEY
+        self.codes: Dict[Tuple[int, int], str] = {}
+
+    def code(self, group_number: int, exercise_count: int) -> str:
+        """5-character progress code for a group after exercise_count exercises"""
+        entry = (group_number, exercise_count)
+        code = self.codes.get(entry)
+        if code is None:
+            seed_string = f"ASSIGNMENT-{self.assignment_key}-GROUP{group_number}-{exercise_count}"
+            rng = random.Random(stable_hash(seed_string, self.assignment_key) % (2**32))
+            code = ''.join(rng.choices(PROGRESS_CODE_CHARACTERS, k=PROGRESS_CODE_LENGTH))
+            self.codes[entry] = code
+        return code
+
+    def row(self, group_number: int, checkpoints: Iterable[int]) -> List[str]:
+        """Codes for a group at each checkpoint"""
+        return [self.code(group_number, checkpoint) for checkpoint in checkpoints]
+
+
+@functools.lru_cache(maxsize=32)
+def code_table(assignment_key: Optional[str] = None) -> ProgressCodeTable:
+    """Shared code table for an assignment key (least recently used keys are evicted)"""
+    return ProgressCodeTable(assignment_key)
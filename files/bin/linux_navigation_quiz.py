@@ -6,31 +6,44 @@ Interactive quiz with live shell and auto-generated file structure
 
 import os
 import sys
+import shutil
 import subprocess
 import hashlib
 import random
 import json
 import datetime
 import time
+import queue
+import signal
 import threading
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 from typing import Dict, List, Any, Tuple
 
+from question_bank import QUESTION_BANK
+from quiz_index import QuizIndex
+from spawn_counter import report_spawns
+
+
 class LinuxNavigationQuiz:
     """
     Interactive Linux navigation quiz with dual-window interface
     """
     
+    SHELL_TIMEOUT = 10  # Seconds before a shell command is killed
+    SHELL_POLL_MS = 50  # How often the Tk loop drains command output
+    
     def __init__(self):
         self.student_id = None
         self.assignment_key = None
         self.quiz_data = {}
         self.questions = []
+        self.num_questions = 8  # Drawn per student from QUESTION_BANK
         self.current_question = 0
         self.answers = {}
         self.score = 0
         self.quiz_directory = "QuizEnvironment"
+        self.index = None  # QuizIndex of the tree, built on first use
         
         # GUI components
         self.root = None
@@ -43,9 +56,12 @@ class LinuxNavigationQuiz:
         self.shell_entry = None
         self.progress_label = None
         
-        # Shell process
+        # Shell process (run on a worker thread; output comes back through shell_queue)
         self.shell_process = None
         self.shell_running = False
+        self.shell_queue = queue.Queue()
+        self.shell_cancel = threading.Event()  # Set by Cancel; seen by the worker even before Popen returns
+        self.cancel_button = None
         
     def setup_student_session(self):
         """Setup student information and assignment key"""
@@ -75,7 +91,7 @@ class LinuxNavigationQuiz:
         
         # Clean up any existing quiz directory
         if os.path.exists(self.quiz_directory):
-            subprocess.run(f'rm -rf "{self.quiz_directory}"', shell=True, cwd=os.getcwd())
+            shutil.rmtree(self.quiz_directory)
         
         # Create main quiz directory
         os.makedirs(self.quiz_directory, exist_ok=True)
@@ -118,7 +134,7 @@ class LinuxNavigationQuiz:
         for base_name, directory, base_content in file_templates:
             # Modify filename slightly based on student
             name_modifier = random.randint(1, 99)
-            if '.' in base_name:
+            if '.' in base_name[1:]:  # Dotfiles keep their leading dot so they stay hidden
                 name, ext = base_name.rsplit('.', 1)
                 filename = f"{name}{name_modifier}.{ext}"
             else:
@@ -173,95 +189,25 @@ class LinuxNavigationQuiz:
                 'size': len(content.encode())
             }
             
+        self.index = None  # A new tree: index it from scratch
         print(f"✅ Generated file structure in {self.quiz_directory}/")
         print(f"📁 {len(directories)} directories, {len(self.quiz_data['files']) + len(specific_files)} files")
         
-    def generate_questions(self):
-        """Generate quiz questions based on the created file structure"""
-        self.questions = []
-        
-        # Question 1: Find a specific file
-        target_file = random.choice(self.quiz_data['files'])
-        self.questions.append({
-            'question': f"What is the full path (relative to QuizEnvironment/) of the file named '{target_file['name']}'?",
-            'answer': os.path.relpath(target_file['path'], self.quiz_directory).replace('\\', '/'),
-            'type': 'path',
-            'hint': f"Look in the {target_file['directory']} directory"
-        })
-        
-        # Question 2: Count files in a directory
-        target_dir = random.choice(['documents', 'projects', 'config'])
-        dir_files = [f for f in self.quiz_data['files'] if f['directory'].startswith(target_dir)]
-        self.questions.append({
-            'question': f"How many files (not including subdirectories) are in the '{target_dir}' directory? (Include hidden files)",
-            'answer': str(len(dir_files)),
-            'type': 'count',
-            'hint': f"Use 'ls -la' to see hidden files too"
-        })
-        
-        # Question 3: File size
-        size_file = list(self.quiz_data['specific_content'].values())[2]  # size_test.log
-        self.questions.append({
-            'question': f"What is the size in bytes of the file 'size_test.log' in backup/daily/?",
-            'answer': str(size_file['size']),
-            'type': 'size',
-            'hint': "Use 'ls -l' to see file sizes in bytes"
-        })
-        
-        # Question 4: Hidden files
-        hidden_count = len([f for f in self.quiz_data['files'] if f['is_hidden']])
-        self.questions.append({
-            'question': f"How many hidden files (starting with .) are in the entire QuizEnvironment directory tree?",
-            'answer': str(hidden_count + 1),  # +1 for .profile in root
-            'type': 'count',
-            'hint': "Use 'find' command with appropriate options to search recursively"
-        })
-        
-        # Question 5: File content
-        secret_file = list(self.quiz_data['specific_content'].values())[0]  # secret_code.txt
-        secret_content = secret_file['content'].strip()
-        self.questions.append({
-            'question': f"What is the content of the file 'secret_code.txt' in the temp directory?",
-            'answer': secret_content,
-            'type': 'content',
-            'hint': "Use 'cat' command to view file contents"
-        })
-        
-        # Question 6: File extension count
-        txt_files = [f for f in self.quiz_data['files'] if f['name'].endswith('.txt')]
-        self.questions.append({
-            'question': f"How many .txt files are in the entire directory structure?",
-            'answer': str(len(txt_files) + 1),  # +1 for secret_code.txt
-            'type': 'count',
-            'hint': "Use 'find' command to search for files with .txt extension"
-        })
-        
-        # Question 7: Largest file
-        all_files = list(self.quiz_data['files']) + list(self.quiz_data['specific_content'].values())
-        largest_file = max(all_files, key=lambda x: x.get('size', 0))
-        largest_name = largest_file.get('name', os.path.basename(largest_file.get('path', '')))
-        self.questions.append({
-            'question': f"What is the name of the largest file in the directory structure?",
-            'answer': largest_name,
-            'type': 'filename',
-            'hint': "Use 'find' with 'ls -la' or 'du' commands to compare file sizes"
-        })
-        
-        # Question 8: Directory with most files
-        dir_counts = {}
-        for file_info in self.quiz_data['files']:
-            dir_name = file_info['directory'].split('/')[0]  # Get top-level directory
-            dir_counts[dir_name] = dir_counts.get(dir_name, 0) + 1
-            
-        most_files_dir = max(dir_counts.items(), key=lambda x: x[1])[0]
-        self.questions.append({
-            'question': f"Which top-level directory contains the most files? (documents, projects, backup, config, or temp)",
-            'answer': most_files_dir,
-            'type': 'directory',
-            'hint': "Count files in each main directory"
-        })
+    def quiz_index(self):
+        """Index of the quiz tree on disk, refreshed incrementally when it already exists"""
+        self.index = self.index.refresh() if self.index else QuizIndex(self.quiz_directory)
+        return self.index
         
-        print(f"✅ Generated {len(self.questions)} questions")
+    def generate_questions(self):
+        """Draw this student's questions from the question bank"""
+        # One index of the tree answers every question; the bank computes only what the draw needs
+        self.questions = QUESTION_BANK.draw(self.quiz_index(), f"{self.student_id}:{self.assignment_key}",
+                                            self.num_questions)
+        print(f"✅ Drew {len(self.questions)} questions from a bank of {len(QUESTION_BANK.generators)} question types")
+        if len(self.questions) < self.num_questions:
+            print(f"⚠️ Only {len(self.questions)} distinct questions can be asked about this quiz tree "
+                  f"(asked for {self.num_questions})")
+            self.num_questions = len(self.questions)
         
     def create_gui(self):
         """Create the dual-window GUI interface"""
@@ -338,6 +284,12 @@ class LinuxNavigationQuiz:
         ttk.Button(control_frame, text="Clear Shell", command=self.clear_shell).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(control_frame, text="Show Hint", command=self.show_hint).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(control_frame, text="Reset to Quiz Directory", command=self.reset_directory).pack(side=tk.LEFT)
+        self.cancel_button = ttk.Button(control_frame, text="Cancel Command", command=self.cancel_shell_command,
+                                        state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT)
+        
+        # Do not leave a running command behind when the window is closed
+        self.root.protocol("WM_DELETE_WINDOW", self.close_window)
         
         # Bind Enter key for answer submission
         self.answer_entry.bind("<Return>", lambda e: self.submit_answer())
@@ -362,41 +314,120 @@ class LinuxNavigationQuiz:
         os.chdir(quiz_path)
         
     def execute_shell_command(self, event=None):
-        """Execute shell command and display result"""
+        """Start a shell command on a worker thread; the GUI stays responsive while it runs"""
         command = self.shell_entry.get().strip()
         if not command:
             return
+        if self.shell_running:
+            self.shell_text.insert(tk.END, "\n⏳ A command is still running. Wait or press 'Cancel Command'.\n")
+            self.shell_text.see(tk.END)
+            return
             
         self.shell_entry.delete(0, tk.END)
         
         # Add command to shell display
         self.shell_text.insert(tk.END, f"{command}\n")
+        self.shell_text.see(tk.END)
+        
+        self.shell_running = True
+        self.shell_cancel.clear()
+        self.cancel_button.config(state=tk.NORMAL)
+        worker = threading.Thread(target=self.run_shell_worker, args=(command, os.getcwd()),
+                                  name="quiz-shell", daemon=True)
+        worker.start()
+        self.root.after(self.SHELL_POLL_MS, self.poll_shell_queue)
         
+    def run_shell_worker(self, command, cwd):
+        """Worker thread: run the command and stream its output lines into shell_queue"""
         try:
-            # Execute command
-            result = subprocess.run(
+            # Own session, so cancelling kills the whole pipeline, not just the shell
+            process = subprocess.Popen(
                 command,
                 shell=True,
-                capture_output=True,
+                cwd=cwd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 text=True,
-                timeout=10,
-                cwd=os.getcwd()
+                errors='replace',
+                start_new_session=True
             )
-            
-            # Display output
-            if result.stdout:
-                self.shell_text.insert(tk.END, result.stdout)
-            if result.stderr:
-                self.shell_text.insert(tk.END, f"Error: {result.stderr}")
-                
-        except subprocess.TimeoutExpired:
-            self.shell_text.insert(tk.END, "Command timed out\n")
         except Exception as e:
-            self.shell_text.insert(tk.END, f"Error: {str(e)}\n")
-            
-        # Add new prompt
-        self.shell_text.insert(tk.END, f"\n$ ")
-        self.shell_text.see(tk.END)
+            self.shell_queue.put(('output', f"Error: {str(e)}\n"))
+            self.shell_queue.put(('done', None))
+            return
+        
+        self.shell_process = process
+        if self.shell_cancel.is_set():
+            self.kill_shell_process(process, "^C Command cancelled")
+        timer = threading.Timer(self.SHELL_TIMEOUT, self.kill_shell_process, args=(process, "Command timed out"))
+        timer.daemon = True
+        timer.start()
+        try:
+            for line in process.stdout:
+                self.shell_queue.put(('output', line))
+            process.wait()
+        finally:
+            timer.cancel()
+            process.stdout.close()
+            self.shell_queue.put(('done', process.returncode))
+        
+    def kill_shell_process(self, process, reason):
+        """Kill a running command and everything it started (safe from any thread)"""
+        if process.poll() is not None:
+            return
+        self.shell_queue.put(('output', f"\n{reason}\n"))
+        try:
+            if hasattr(os, 'killpg'):
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+        
+    def cancel_shell_command(self):
+        """Cancel button: stop the running command"""
+        if not self.shell_running:
+            return
+        self.shell_cancel.set()
+        process = self.shell_process
+        if process is not None:
+            self.kill_shell_process(process, "^C Command cancelled")
+        
+    def poll_shell_queue(self):
+        """Tk loop: move queued command output into the shell pane, then check again later"""
+        chunks = []
+        finished = False
+        # Time-boxed per tick so a flood of output cannot starve the event loop
+        deadline = time.perf_counter() + self.SHELL_POLL_MS / 2000
+        try:
+            while time.perf_counter() < deadline:
+                kind, value = self.shell_queue.get_nowait()
+                if kind == 'output':
+                    chunks.append(value)
+                else:
+                    finished = True
+                    break
+        except queue.Empty:
+            pass
+        
+        if chunks:
+            self.shell_text.insert(tk.END, ''.join(chunks))
+        if finished:
+            self.shell_running = False
+            self.shell_process = None
+            self.cancel_button.config(state=tk.DISABLED)
+            # Add new prompt
+            self.shell_text.insert(tk.END, f"\n$ ")
+        if chunks or finished:
+            self.shell_text.see(tk.END)
+        if not finished:
+            self.root.after(self.SHELL_POLL_MS, self.poll_shell_queue)
+        
+    def close_window(self):
+        """Window closed: kill any running command, then end the GUI"""
+        self.cancel_shell_command()
+        self.root.destroy()
         
     def clear_shell(self):
         """Clear the shell output"""
@@ -521,6 +552,7 @@ Please submit this code to your instructor for grading.
         # Create and run GUI
         self.create_gui()
         self.root.mainloop()
+        report_spawns()
 
 if __name__ == "__main__":
     quiz = LinuxNavigationQuiz()
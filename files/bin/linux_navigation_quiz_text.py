@@ -6,135 +6,66 @@ Interactive quiz for web browser environments without GUI
 
 import os
 import sys
+import shutil
 import subprocess
 import hashlib
+import glob
+import json
 import random
+import threading
 import time
 import datetime
 
-class Colors:
-    """ANSI color codes for background changes without clearing screen"""
-    # Background modes without clearing screen
-    WHITE_MODE = '\033[47m\033[30m'    # White background, black text
-    BLACK_MODE = '\033[40m\033[32m'    # Black background, green text
-    RESET = '\033[0m'
-    
-    # Simple status colors (no background change)
-    SUCCESS = '\033[32m'     # Green text
-    ERROR = '\033[31m'       # Red text  
-    WARNING = '\033[33m'     # Yellow text
-    YELLOW = '\033[33m'      # Yellow text (same as WARNING)
-    PROGRESS = '\033[36m'    # Cyan text for progress messages
+from question_bank import QUESTION_BANK
+from quiz_index import QuizIndex
+from spawn_counter import report_spawns
+from term_render import (RENDERER, Colors, clear_screen, clear_screen_completely, enter_shell_mode,
+                         exit_shell_mode, print_black_bg, print_white_bg)
 
-def clear_screen():
-    """Set white background mode without clearing screen"""
-    # Get terminal width and fill the current line with white background
-    try:
-        import shutil
-        width = shutil.get_terminal_size().columns
-        print(f'{Colors.WHITE_MODE}{" " * width}', end='\r')
-    except:
-        print(Colors.WHITE_MODE, end='')
 
-def clear_screen_completely():
-    """Clear screen completely and set white background mode"""
-    print('\033[2J\033[H', end='')  # Clear screen and home cursor
-    print(Colors.WHITE_MODE, end='')
-    # Fill initial screen with white background
-    try:
-        import shutil
-        width = shutil.get_terminal_size().columns
-        height = shutil.get_terminal_size().lines
-        for _ in range(height):
-            print(f'{" " * width}')
-        print('\033[H', end='')  # Return to top
-    except:
-        pass
+class FileRecord:
+    """One planned file of a large quiz tree; __slots__ keeps hundreds of thousands of them small"""
 
-def enter_shell_mode():
-    """Switch to black background shell mode without clearing screen"""
-    print(Colors.BLACK_MODE, end='')
+    __slots__ = ('path', 'size', 'sparse')
 
-def exit_shell_mode():
-    """Return to white background mode without clearing screen"""
-    print(Colors.WHITE_MODE, end='')
+    def __init__(self, path, size, sparse):
+        self.path = path
+        self.size = size
+        self.sparse = sparse  # Created with truncate: real byte size, no bytes written
 
-def print_white_bg(text="", end='\n'):
-    """Print text with white background that extends across full line"""
-    try:
-        import shutil
-        width = shutil.get_terminal_size().columns
-        
-        # Always ensure we're in white mode first
-        print(Colors.WHITE_MODE, end='')
-        
-        if text:
-            # Calculate actual display length (excluding ANSI codes)
-            import re
-            # Remove ANSI escape sequences for length calculation
-            display_text = re.sub(r'\x1b\[[0-9;]*m', '', text)
-            text_len = len(display_text)
-            
-            if text_len < width:
-                spaces_needed = width - text_len
-                # Print text with white background, then fill rest with spaces
-                print(f'{Colors.WHITE_MODE}{text}{" " * spaces_needed}', end=end)
-            else:
-                # Text is longer than width, just print with white background
-                print(f'{Colors.WHITE_MODE}{text}', end=end)
-        else:
-            # Just print a full line of spaces for empty lines
-            print(f'{Colors.WHITE_MODE}{" " * width}', end=end)
-            
-        # Ensure we end with white mode for next line
-        if end == '\n':
-            print(Colors.WHITE_MODE, end='')
-            
-    except:
-        # Fallback if terminal size detection fails
-        print(f'{Colors.WHITE_MODE}{text}', end=end)
 
-def print_black_bg(text="", end='\n'):
-    """Print text with black background that extends across full line"""
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (0 where unavailable)"""
     try:
-        import shutil
-        width = shutil.get_terminal_size().columns
-        
-        # Always ensure we're in black mode first
-        print(Colors.BLACK_MODE, end='')
-        
-        if text:
-            # Calculate actual display length (excluding ANSI codes)
-            import re
-            # Remove ANSI escape sequences for length calculation
-            display_text = re.sub(r'\x1b\[[0-9;]*m', '', text)
-            text_len = len(display_text)
-            
-            if text_len < width:
-                spaces_needed = width - text_len
-                # Print text with black background, then fill rest with spaces
-                print(f'{Colors.BLACK_MODE}{text}{" " * spaces_needed}', end=end)
-            else:
-                # Text is longer than width, just print with black background
-                print(f'{Colors.BLACK_MODE}{text}', end=end)
-        else:
-            # Just print a full line of spaces for empty lines
-            print(f'{Colors.BLACK_MODE}{" " * width}', end=end)
-            
-        # Reset to default after printing
-        if end == '\n':
-            print(Colors.RESET, end='')
-            
-    except:
-        # Fallback if terminal size detection fails
-        print(f'{Colors.BLACK_MODE}{text}{Colors.RESET}', end=end)
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
 
 class LinuxNavigationQuizTextOnly:
     """
     Text-only Linux navigation quiz for web browser environments
     """
     
-    def __init__(self):
+    STRUCTURE_VERSION = 2  # Bump when the generated tree changes so old trees are rebuilt
+    
+    # Large trees (scale > 0) go under data/ so the classic questions keep their directories
+    BULK_ROOT = "data"
+    BULK_WORDS = ["archive", "logs", "reports", "cache", "builds", "media", "users", "src",
+                  "releases", "assets", "exports", "metrics", "tmp", "docs", "vendor", "backups"]
+    BULK_EXTENSIONS = [".txt", ".log", ".csv", ".conf", ".py", ".md", ".dat", ".json"]
+    BULK_FILES_PER_DIRECTORY = 60
+    BULK_MAX_DEPTH = 10
+    BULK_SPARSE_MAX_BYTES = 256 << 20     # Largest sparse file
+    BULK_SPARSE_TOTAL_BYTES = 4 << 30     # Apparent size of all sparse files together
+    
+    def __init__(self, scale=0, num_questions=8):
+        self.scale = scale  # Extra files in a deep, wide tree under data/ (0: classic tree only)
+        self.num_questions = num_questions
+        self.bulk_files = []  # FileRecord per extra file
         self.student_id = None
         self.assignment_key = None
         self.quiz_data = {}
@@ -143,6 +74,8 @@ class LinuxNavigationQuizTextOnly:
         self.answers = {}
         self.score = 0
         self.quiz_directory = "QuizEnvironment"
+        self.cleanup_threads = []  # Background deletes of replaced quiz trees
+        self.index = None  # QuizIndex of the tree, built on first use
         
     def print_header(self, title, width=60):
         """Print a formatted header with white background"""
@@ -159,17 +92,18 @@ class LinuxNavigationQuizTextOnly:
     def setup_student_session(self):
         """Setup student information and assignment key"""
         # White background already set by main(), no need to clear again
-        self.print_header("🧭 Linux Navigation Quiz", 60)
-        print_white_bg("Welcome to the interactive Linux file navigation assessment!")
-        print_white_bg("You will navigate a custom file structure using real Linux commands.")
-        print_white_bg()
-        print_white_bg("Instructions:")
-        print_white_bg("• Answer 8 questions about file locations and properties")
-        print_white_bg("• Use shell commands to explore the generated file structure")
-        print_white_bg("• Type your answers exactly as requested")
-        print_white_bg("• Get immediate feedback on each answer")
-        
-        self.print_section("👤 Student Information Setup")
+        with RENDERER.screen():
+            self.print_header("🧭 Linux Navigation Quiz", 60)
+            print_white_bg("Welcome to the interactive Linux file navigation assessment!")
+            print_white_bg("You will navigate a custom file structure using real Linux commands.")
+            print_white_bg()
+            print_white_bg("Instructions:")
+            print_white_bg(f"• Answer {self.num_questions} questions about file locations and properties")
+            print_white_bg("• Use shell commands to explore the generated file structure")
+            print_white_bg("• Type your answers exactly as requested")
+            print_white_bg("• Get immediate feedback on each answer")
+        
+            self.print_section("👤 Student Information Setup")
         
         while not self.student_id:
             self.student_id = input(f"{Colors.WHITE_MODE}Enter your student ID or email: ").strip()
@@ -198,23 +132,40 @@ class LinuxNavigationQuizTextOnly:
         
         print_white_bg("Creating file structure based on your student ID...")
         
-        # Clean up any existing quiz directory
-        if os.path.exists(self.quiz_directory):
-            subprocess.run(f'rm -rf "{self.quiz_directory}"', shell=True, cwd=os.getcwd())
-        
-        # Create main quiz directory
-        os.makedirs(self.quiz_directory, exist_ok=True)
-        
+        start = time.perf_counter()
+        # Planning consumes the seeded RNG exactly as before, even when the tree is reused
+        directories, contents = self.plan_file_structure()
+        # The large tree has its own RNG so the classic questions do not depend on the scale
+        directories = directories + self.plan_bulk_tree(random.Random(seed))
+        digest = self.structure_digest(directories)
+        
+        if self.read_manifest_digest() == digest and self.quiz_tree_intact(directories):
+            with RENDERER.screen():
+                print_white_bg(f"✅ Reusing your existing quiz environment in '{self.quiz_directory}/'")
+            return
+        
+        self.build_quiz_tree(directories, contents)
+        self.write_manifest_digest(digest)
+        elapsed = time.perf_counter() - start
+            
+        with RENDERER.screen():
+            print_white_bg(f"✅ Generated {len(self.quiz_data['files'])} files")
+            print_white_bg(f"✅ Generated {len(self.quiz_data['hidden_files'])} hidden files")
+            if self.bulk_files:
+                sparse = sum(1 for record in self.bulk_files if record.sparse)
+                print_white_bg(f"✅ Generated {len(self.bulk_files):,} files under {self.BULK_ROOT}/ ({sparse} sparse)")
+            print_white_bg(f"✅ Generated {len(directories):,} directories")
+            print_white_bg(f"⏱️ Built in {elapsed:.2f}s, peak memory {peak_rss_mb():.0f} MB")
+            print_white_bg(f"✅ Quiz environment ready in '{self.quiz_directory}/' directory")
+    
+    def plan_file_structure(self):
+        """Decide every directory, file and content for this student; fills quiz_data, writes nothing"""
         # Generate directory structure
         directories = [
             "documents", "projects", "backup", "config", "temp",
             "documents/reports", "documents/drafts", "projects/web",
             "projects/mobile", "backup/weekly", "backup/daily"
         ]
-        
-        for directory in directories:
-            dir_path = os.path.join(self.quiz_directory, directory)
-            os.makedirs(dir_path, exist_ok=True)
             
         # Generate files with specific attributes
         self.quiz_data = {
@@ -224,6 +175,7 @@ class LinuxNavigationQuizTextOnly:
             'large_files': [],
             'specific_content': {}
         }
+        contents = {}  # relative path -> file content
         
         # Generate regular files
         file_templates = [
@@ -246,7 +198,7 @@ class LinuxNavigationQuizTextOnly:
         
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        # Create regular files
+        # Plan regular files
         for template_path, file_type, content_template in file_templates:
             if "{}" in template_path:
                 number = random.randint(10, 99)
@@ -255,8 +207,6 @@ class LinuxNavigationQuizTextOnly:
             else:
                 file_path = template_path
                 file_key = file_type
-                
-            full_path = os.path.join(self.quiz_directory, file_path)
             
             # Generate content
             content = content_template.format(
@@ -264,10 +214,7 @@ class LinuxNavigationQuizTextOnly:
                 assignment_key=self.assignment_key,
                 timestamp=timestamp
             )
-            
-            # Write file
-            with open(full_path, 'w') as f:
-                f.write(content)
+            contents[file_path] = content
                 
             # Store file info
             file_info = {
@@ -279,13 +226,10 @@ class LinuxNavigationQuizTextOnly:
             }
             self.quiz_data['files'].append(file_info)
             
-        # Create hidden files
+        # Plan hidden files
         for hidden_path, content_template in hidden_templates:
-            full_path = os.path.join(self.quiz_directory, hidden_path)
             content = content_template.format(student_id=self.student_id)
-            
-            with open(full_path, 'w') as f:
-                f.write(content)
+            contents[hidden_path] = content
                 
             file_info = {
                 'path': hidden_path,
@@ -294,113 +238,192 @@ class LinuxNavigationQuizTextOnly:
                 'type': 'hidden'
             }
             self.quiz_data['hidden_files'].append(file_info)
-            
-        print_white_bg(f"✅ Generated {len(self.quiz_data['files'])} files")
-        print_white_bg(f"✅ Generated {len(self.quiz_data['hidden_files'])} hidden files")
-        print_white_bg(f"✅ Generated {len(directories)} directories")
-        print_white_bg(f"✅ Quiz environment ready in '{self.quiz_directory}/' directory")
+        return directories, contents
+    
+    def plan_bulk_tree(self, rng):
+        """
+        Plan self.scale extra files in a random tree under data/; returns its directories.
+
+        Each new directory hangs off a random existing one (up to BULK_MAX_DEPTH
+        deep), giving a mix of deep chains and wide levels. About 1% of the files
+        are large and created sparse, which makes du vs ls -l and sort -n
+        exercises meaningful without writing gigabytes. Their apparent sizes
+        add up to at most BULK_SPARSE_TOTAL_BYTES (tools that copy or archive
+        the tree see that much), and none are planned if the filesystem would
+        allocate the holes.
+        """
+        self.bulk_files = []
+        if self.scale <= 0:
+            return []
+        sparse_budget = self.BULK_SPARSE_TOTAL_BYTES if self.filesystem_supports_holes() else 0
+        directories, depths = [self.BULK_ROOT], [1]
+        for number in range(1, -(-self.scale // self.BULK_FILES_PER_DIRECTORY)):
+            parent = rng.randrange(len(directories))
+            if depths[parent] >= self.BULK_MAX_DEPTH:
+                parent = 0
+            directories.append(f"{directories[parent]}/{rng.choice(self.BULK_WORDS)}{number}")
+            depths.append(depths[parent] + 1)
+        
+        for number in range(self.scale):
+            directory = directories[rng.randrange(len(directories))]
+            name = f"{rng.choice(self.BULK_WORDS)}_{number}{rng.choice(self.BULK_EXTENSIONS)}"
+            if rng.random() < 0.02:
+                name = '.' + name
+            sparse = rng.random() < 0.01
+            size = rng.randint(1 << 20, self.BULK_SPARSE_MAX_BYTES) if sparse else rng.randint(16, 2048)
+            if sparse and size > sparse_budget:
+                sparse, size = False, rng.randint(16, 2048)  # Budget spent: a small file instead
+            if sparse:
+                sparse_budget -= size
+            self.bulk_files.append(FileRecord(f"{directory}/{name}", size, sparse))
+        return directories
+    
+    def filesystem_supports_holes(self):
+        """Whether files next to the quiz tree can be sparse: a truncated file must not get blocks"""
+        probe_path = self.quiz_sibling(f"probe-{os.getpid()}-{time.time_ns()}")
+        try:
+            with open(probe_path, 'wb') as f:
+                f.truncate(1 << 20)
+                f.flush()
+                os.fsync(f.fileno())
+                blocks = os.fstat(f.fileno()).st_blocks
+            return blocks * 512 < (1 << 20)
+        except (OSError, AttributeError):
+            return False  # No st_blocks on this platform, or the probe could not be written
+        finally:
+            try:
+                os.remove(probe_path)
+            except OSError:
+                pass
+    
+    def bulk_file_content(self, record):
+        """Deterministic text of exactly record.size bytes (grep-able: path and student)"""
+        line = f"# {record.path} ({self.student_id})\n"
+        return (line * (record.size // len(line) + 1))[:record.size]
+    
+    def quiz_sibling(self, suffix):
+        """Hidden path next to the quiz directory, e.g. .QuizEnvironment.manifest.json"""
+        parent, name = os.path.split(os.path.abspath(self.quiz_directory))
+        return os.path.join(parent, f".{name}.{suffix}")
+    
+    def structure_digest(self, directories):
+        """Hash of everything that shapes the tree; file timestamps are left out on purpose"""
+        hasher = hashlib.sha256(f"{self.STRUCTURE_VERSION}\0{self.student_id}\0{self.assignment_key}".encode())
+        for directory in directories:
+            hasher.update(f"\0d:{directory}".encode())
+        for file_info in self.quiz_data['files'] + self.quiz_data['hidden_files']:
+            hasher.update(f"\0f:{file_info['path']}:{file_info['size']}".encode())
+        for record in self.bulk_files:
+            hasher.update(f"\0{'s' if record.sparse else 'f'}:{record.path}:{record.size}".encode())
+        return hasher.hexdigest()
+    
+    def read_manifest_digest(self):
+        try:
+            with open(self.quiz_sibling('manifest.json'), 'r') as f:
+                return json.load(f).get('digest')
+        except (OSError, ValueError, AttributeError):
+            return None
+    
+    def write_manifest_digest(self, digest):
+        manifest_path = self.quiz_sibling('manifest.json')
+        temp_path = f"{manifest_path}.{os.getpid()}"
+        with open(temp_path, 'w') as f:
+            json.dump({'digest': digest, 'student_id': self.student_id, 'assignment_key': self.assignment_key}, f)
+        os.replace(temp_path, manifest_path)
+    
+    def quiz_tree_intact(self, directories):
+        """True if the tree on disk has exactly the planned directories, files and sizes (students may edit it)"""
+        expected = {f['path']: f['size'] for f in self.quiz_data['files'] + self.quiz_data['hidden_files']}
+        expected.update((record.path, record.size) for record in self.bulk_files)
+        expected_dirs = set(directories)
+        pending = ['']
+        while pending:
+            relative = pending.pop()
+            try:
+                with os.scandir(os.path.join(self.quiz_directory, relative)) as entries:
+                    for entry in entries:
+                        path = f"{relative}{entry.name}"
+                        if entry.is_dir(follow_symlinks=False):
+                            if path not in expected_dirs:
+                                return False
+                            expected_dirs.discard(path)
+                            pending.append(path + '/')
+                        elif expected.pop(path, None) != entry.stat(follow_symlinks=False).st_size:
+                            return False
+            except OSError:
+                return False
+        return not expected and not expected_dirs
+    
+    def build_quiz_tree(self, directories, contents):
+        """
+        Write the planned tree into a fresh sibling directory and swap it into place.
+
+        A crash mid-build only leaves a hidden build directory behind (removed on
+        the next run); the student never sees a half-written QuizEnvironment.
+        The previous tree is renamed aside and deleted on a background thread.
+        """
+        # Leftovers of crashed builds or interrupted background deletes
+        stale = [path for kind in ('build', 'old') for path in glob.glob(glob.escape(self.quiz_sibling(kind)) + '-*')]
+        self.remove_in_background(stale)
+        build_directory = self.quiz_sibling(f"build-{os.getpid()}-{time.time_ns()}")
+        os.makedirs(build_directory)
+        for directory in directories:
+            os.makedirs(os.path.join(build_directory, directory), exist_ok=True)
+        for path, content in contents.items():
+            with open(os.path.join(build_directory, path), 'w') as f:
+                f.write(content)
+        for record in self.bulk_files:
+            with open(os.path.join(build_directory, record.path), 'wb') as f:
+                if record.sparse:
+                    f.truncate(record.size)  # A hole: st_size is real, no blocks are written
+                else:
+                    f.write(self.bulk_file_content(record).encode('ascii', 'replace'))
+        
+        old_directory = None
+        if os.path.lexists(self.quiz_directory):
+            old_directory = self.quiz_sibling(f"old-{os.getpid()}-{time.time_ns()}")
+            os.rename(self.quiz_directory, old_directory)
+        os.rename(build_directory, self.quiz_directory)
+        self.index = None  # A new tree: index it from scratch
+        if old_directory:
+            self.remove_in_background([old_directory])
+    
+    def remove_in_background(self, paths):
+        """Delete directory trees on a daemon thread so quiz start does not wait for them"""
+        if not paths:
+            return
+        def remove():
+            for path in paths:
+                shutil.rmtree(path, ignore_errors=True)
+        thread = threading.Thread(target=remove, name="quiz-cleanup", daemon=True)
+        thread.start()
+        self.cleanup_threads.append(thread)
+    
+    def finish_cleanup(self, timeout=5.0):
+        """Give background deletes a moment to finish before the program exits"""
+        for thread in self.cleanup_threads:
+            thread.join(timeout)
         
     def generate_questions(self):
-        """Generate quiz questions based on the file structure"""
+        """Draw this student's questions from the question bank"""
         clear_screen()  # Set white background without clearing
         self.print_section("Generating Quiz Questions")
         
-        # Analyze the generated structure for question answers
-        self.analyze_file_structure()
-        
-        question_templates = [
-            {
-                'type': 'file_path',
-                'question': f"What is the relative path to the file named '{self.quiz_data['target_file']['name']}'? (Answer without leading ./)",
-                'answer': self.quiz_data['target_file']['path'],
-                'hint': "Use: find . -name 'filename' (remove the ./ from the result)"
-            },
-            {
-                'type': 'file_count',
-                'question': f"How many files are in the '{self.quiz_data['target_directory']}' directory (not including subdirectories)?",
-                'answer': str(self.quiz_data['files_in_target_dir']),
-                'hint': "Use: ls directory_name | wc -l"
-            },
-            {
-                'type': 'file_size',
-                'question': f"What is the size in bytes of the file '{self.quiz_data['size_test_file']['name']}'?",
-                'answer': str(self.quiz_data['size_test_file']['size']),
-                'hint': "Use: ls -l filename or du -b filename"
-            },
-            {
-                'type': 'hidden_files',
-                'question': "How many hidden files (names starting with '.') exist in the entire quiz structure?",
-                'answer': str(len(self.quiz_data['hidden_files'])),
-                'hint': "Use: find . -name '.*' -type f | wc -l"
-            },
-            {
-                'type': 'file_content',
-                'question': "What is the content of the file 'secret_code.txt'?",
-                'answer': self.quiz_data['secret_content'],
-                'hint': "Use: cat temp/secret_code.txt"
-            },
-            {
-                'type': 'file_extension',
-                'question': "How many files with the '.txt' extension exist in total?",
-                'answer': str(self.quiz_data['txt_file_count']),
-                'hint': "Use: find . -name '*.txt' | wc -l"
-            },
-            {
-                'type': 'largest_file',
-                'question': "What is the name of the largest file in the entire structure?",
-                'answer': self.quiz_data['largest_file']['name'],
-                'hint': "Use: find . -type f -exec ls -la {} + | sort -k5 -n"
-            },
-            {
-                'type': 'directory_comparison',
-                'question': f"Which directory contains more files: 'documents' or 'projects'?",
-                'answer': self.quiz_data['busiest_directory'],
-                'hint': "Count files in each directory and compare"
-            }
-        ]
-        
-        self.questions = question_templates
-        print(f"✅ Generated {len(self.questions)} questions")
+        # One index of the tree answers every question; the bank computes only what the draw needs
+        self.questions = QUESTION_BANK.draw(self.quiz_index(), f"{self.student_id}:{self.assignment_key}",
+                                            self.num_questions)
+        print(f"✅ Drew {len(self.questions)} questions from a bank of {len(QUESTION_BANK.generators)} question types")
+        if len(self.questions) < self.num_questions:
+            print(f"⚠️ Only {len(self.questions)} distinct questions can be asked about this quiz tree "
+                  f"(asked for {self.num_questions})")
+            self.num_questions = len(self.questions)
         print("✅ Questions are ready!")
         
-    def analyze_file_structure(self):
-        """Analyze the generated structure to create question answers"""
-        # Find target file for path question
-        regular_files = [f for f in self.quiz_data['files'] if f['type'] != 'secret']
-        self.quiz_data['target_file'] = random.choice(regular_files)
-        
-        # Find target directory for counting
-        self.quiz_data['target_directory'] = 'documents'
-        files_in_docs = [f for f in self.quiz_data['files'] if f['path'].startswith('documents/') and '/' not in f['path'][10:]]
-        self.quiz_data['files_in_target_dir'] = len(files_in_docs)
-        
-        # Find size test file
-        size_files = [f for f in self.quiz_data['files'] if 'size_test' in f['name']]
-        if size_files:
-            self.quiz_data['size_test_file'] = size_files[0]
-        else:
-            self.quiz_data['size_test_file'] = random.choice(self.quiz_data['files'])
-            
-        # Get secret content
-        secret_path = os.path.join(self.quiz_directory, 'temp/secret_code.txt')
-        if os.path.exists(secret_path):
-            with open(secret_path, 'r') as f:
-                self.quiz_data['secret_content'] = f.read().strip()
-        
-        # Count txt files
-        txt_files = [f for f in self.quiz_data['files'] + self.quiz_data['hidden_files'] if f['name'].endswith('.txt')]
-        self.quiz_data['txt_file_count'] = len(txt_files)
-        
-        # Find largest file
-        all_files = self.quiz_data['files'] + self.quiz_data['hidden_files']
-        largest = max(all_files, key=lambda f: f['size'])
-        self.quiz_data['largest_file'] = largest
-        
-        # Compare directory file counts
-        docs_count = len([f for f in self.quiz_data['files'] if f['path'].startswith('documents/')])
-        projects_count = len([f for f in self.quiz_data['files'] if f['path'].startswith('projects/')])
-        self.quiz_data['busiest_directory'] = 'documents' if docs_count > projects_count else 'projects'
-        
+    def quiz_index(self):
+        """Index of the quiz tree on disk, refreshed incrementally when it already exists"""
+        self.index = self.index.refresh() if self.index else QuizIndex(self.quiz_directory)
+        return self.index
+    
     def run_shell_command(self, command):
         """Execute a shell command in the quiz directory and return output"""
         try:
@@ -426,24 +449,25 @@ class LinuxNavigationQuizTextOnly:
             
     def show_shell_help(self):
         """Display shell command help"""
-        print("\n📚 Useful Commands for Navigation:")
-        print("  ls              - List files in current directory")
-        print("  ls -la          - List all files (including hidden) with details")
-        print("  cd <directory>  - Change to directory")
-        print("  cd ..           - Go up one directory level")
-        print("  pwd             - Show current directory path")
-        print("  find . -name 'filename' - Find files by name")
-        print("  find . -name '*.txt'    - Find files by extension")
-        print("  cat <filename>  - Show file contents")
-        print("  wc -l <file>    - Count lines in file")
-        print("  ls | wc -l      - Count files in directory")
-        print("  du -b <file>    - Show file size in bytes")
-        print("  ls -la <file>   - Show file details including size")
-        print("\n� Quiz Commands:")
-        print("  question        - Show current question and hint again")
-        print("  help            - Show this help message")
-        print("  exit            - Return to quiz interface")
-        print("\n�💡 Tip: You can run commands while answering questions!")
+        with RENDERER.screen():
+            print("\n📚 Useful Commands for Navigation:")
+            print("  ls              - List files in current directory")
+            print("  ls -la          - List all files (including hidden) with details")
+            print("  cd <directory>  - Change to directory")
+            print("  cd ..           - Go up one directory level")
+            print("  pwd             - Show current directory path")
+            print("  find . -name 'filename' - Find files by name")
+            print("  find . -name '*.txt'    - Find files by extension")
+            print("  cat <filename>  - Show file contents")
+            print("  wc -l <file>    - Count lines in file")
+            print("  ls | wc -l      - Count files in directory")
+            print("  du -b <file>    - Show file size in bytes")
+            print("  ls -la <file>   - Show file details including size")
+            print("\n� Quiz Commands:")
+            print("  question        - Show current question and hint again")
+            print("  help            - Show this help message")
+            print("  exit            - Return to quiz interface")
+            print("\n�💡 Tip: You can run commands while answering questions!")
         
     def interactive_shell(self, question_text=None, hint_text=None, question_num=None):
         """Provide an interactive shell session with full black background"""
@@ -492,17 +516,18 @@ class LinuxNavigationQuizTextOnly:
         """Present a single question to the student"""
         question = self.questions[question_num]
         
-        clear_screen()  # Set white background without clearing
-        self.print_header(f"Question {question_num + 1} of {len(self.questions)}")
-        print_white_bg(f"📝 {question['question']}")
-        print_white_bg()
-        print_white_bg(f"💡 Hint: {question['hint']}")
-        print_white_bg()
-        print_white_bg("Options:")
-        print_white_bg("  1. Type your answer")
-        print_white_bg("  2. Open shell to explore (type 'shell')")
-        print_white_bg("  3. Show hint again (type 'hint')")
-        print_white_bg("  4. Quit quiz (type 'quit' or 'exit')")
+        with RENDERER.screen():
+            clear_screen()  # Set white background without clearing
+            self.print_header(f"Question {question_num + 1} of {len(self.questions)}")
+            print_white_bg(f"📝 {question['question']}")
+            print_white_bg()
+            print_white_bg(f"💡 Hint: {question['hint']}")
+            print_white_bg()
+            print_white_bg("Options:")
+            print_white_bg("  1. Type your answer")
+            print_white_bg("  2. Open shell to explore (type 'shell')")
+            print_white_bg("  3. Show hint again (type 'hint')")
+            print_white_bg("  4. Quit quiz (type 'quit' or 'exit')")
         
         while True:
             print_white_bg()
@@ -573,21 +598,21 @@ class LinuxNavigationQuizTextOnly:
         
     def run_quiz(self):
         """Run the complete quiz"""
-        clear_screen()  # Set white background without clearing
-        self.print_header("🚀 Starting Quiz")
+        with RENDERER.screen():
+            clear_screen()  # Set white background without clearing
+            self.print_header("🚀 Starting Quiz")
         
-        print("You are now ready to begin the quiz!")
-        print("The file structure has been generated in the 'QuizEnvironment' directory.")
-        print("You can explore it using shell commands between questions.")
+            print("You are now ready to begin the quiz!")
+            print("The file structure has been generated in the 'QuizEnvironment' directory.")
+            print("You can explore it using shell commands between questions.")
         
-        # Show initial structure overview
-        print(f"\n📁 Your quiz environment contains:")
-        output = self.run_shell_command("find . -type d | head -10")
-        print("Directories:")
-        print(output)
+            # Show initial structure overview
+            print(f"\n📁 Your quiz environment contains:")
+            index = self.quiz_index()
+            print("Directories:")
+            print("\n".join(directory if directory == '.' else f"./{directory}" for directory in index.directories[:10]))
         
-        output = self.run_shell_command("find . -type f | wc -l")
-        print(f"Total files: {output.strip()}")
+            print(f"Total files: {index.total_files}")
         
         input("\nPress Enter to begin the quiz...")
         
@@ -605,32 +630,33 @@ class LinuxNavigationQuizTextOnly:
         
     def show_final_results(self):
         """Display final quiz results and verification code"""
-        clear_screen()  # Set white background without clearing
-        self.print_header("🎉 Quiz Complete!")
-        
-        percentage = (self.score / len(self.questions)) * 100
-        
-        print(f"📊 Final Score: {self.score}/{len(self.questions)} ({percentage:.1f}%)")
-        print(f"👤 Student: {self.student_id}")
-        print(f"📝 Assignment: {self.assignment_key}")
-        print(f"📅 Completed: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        # Generate verification code
-        verification_code = self.generate_verification_code()
-        
-        print(f"\n{Colors.SUCCESS}🔑 Your Verification Code: {verification_code}{Colors.RESET}")
-        print("=" * 50)
-        print(f"{Colors.WARNING}📋 IMPORTANT: Submit this verification code to your instructor!{Colors.RESET}")
-        print("This code proves you completed the quiz and shows your score.")
-        print("=" * 50)
-        
-        # Show score breakdown
-        print(f"\n📈 Score Breakdown:")
-        for i, (question_num, correct) in enumerate(self.answers.items()):
-            status = f"{Colors.SUCCESS}✅{Colors.RESET}" if correct else f"{Colors.ERROR}❌{Colors.RESET}"
-            print(f"  Question {question_num + 1}: {status}")
+        with RENDERER.screen():
+            clear_screen()  # Set white background without clearing
+            self.print_header("🎉 Quiz Complete!")
+        
+            percentage = (self.score / len(self.questions)) * 100
+        
+            print(f"📊 Final Score: {self.score}/{len(self.questions)} ({percentage:.1f}%)")
+            print(f"👤 Student: {self.student_id}")
+            print(f"📝 Assignment: {self.assignment_key}")
+            print(f"📅 Completed: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        
+            # Generate verification code
+            verification_code = self.generate_verification_code()
+        
+            print(f"\n{Colors.SUCCESS}🔑 Your Verification Code: {verification_code}{Colors.RESET}")
+            print("=" * 50)
+            print(f"{Colors.WARNING}📋 IMPORTANT: Submit this verification code to your instructor!{Colors.RESET}")
+            print("This code proves you completed the quiz and shows your score.")
+            print("=" * 50)
+        
+            # Show score breakdown
+            print(f"\n📈 Score Breakdown:")
+            for i, (question_num, correct) in enumerate(self.answers.items()):
+                status = f"{Colors.SUCCESS}✅{Colors.RESET}" if correct else f"{Colors.ERROR}❌{Colors.RESET}"
+                print(f"  Question {question_num + 1}: {status}")
             
-        print(f"\nThank you for completing the Linux Navigation Quiz!")
+            print(f"\nThank you for completing the Linux Navigation Quiz!")
         
     def generate_verification_code(self):
         """Generate a verification code based on student performance"""
@@ -671,11 +697,24 @@ class LinuxNavigationQuizTextOnly:
 
 def main():
     """Entry point for the quiz"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Text-only Linux navigation quiz")
+    parser.add_argument('--scale', type=int, default=0,
+                        help="add this many files in a deep, wide tree under data/ (e.g. 100000)")
+    parser.add_argument('--questions', type=int, default=8,
+                        help="questions drawn per student from the question bank (default: 8)")
+    args = parser.parse_args()
+    if args.questions < 1:
+        parser.error("--questions must be at least 1")
+    
     # Clear screen completely at program start
     clear_screen_completely()
+    RENDERER.watch_resize()
     
-    quiz = LinuxNavigationQuizTextOnly()
+    quiz = LinuxNavigationQuizTextOnly(scale=args.scale, num_questions=args.questions)
     quiz.main()
+    quiz.finish_cleanup()
+    report_spawns()
 
 if __name__ == "__main__":
     main()
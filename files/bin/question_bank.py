@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Parameterized question bank shared by both navigation quizzes
+
+Generators register with QUESTION_BANK together with the index features
+they read. A student's questions are drawn deterministically from a seed
+string built from their ID and the assignment key, so the instructor can
+regenerate the same quiz and its answers.
+"""
+
+import hashlib
+import random
+
+from quiz_index import QuizIndex
+
+
+class IndexFeatures(dict):
+    """Features of one QuizIndex, each computed the first time a generator reads it"""
+
+    def __init__(self, functions, index):
+        super().__init__()
+        self.functions = functions
+        self.index = index
+
+    def __missing__(self, name):
+        value = self[name] = self.functions[name](self.index)
+        return value
+
+
+class LazyQuestion:
+    """A drawn question; its text and answer are only computed when first read"""
+
+    __slots__ = ('render', 'rendered')
+
+    def __init__(self, render):
+        self.render = render  # Zero-argument function returning the question dict
+        self.rendered = None
+
+    def __getitem__(self, key):
+        if self.rendered is None:
+            self.rendered = self.render()
+        return self.rendered[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class QuestionBank:
+    """
+    Registry of parameterized question generators over a QuizIndex.
+
+    Each generator names the index features it needs and returns the
+    parameters it chose (e.g. a path) with a function that renders the
+    question. draw() picks questions deterministically from a seed string,
+    computes a feature only when a generator it tries reads it and returns
+    LazyQuestion objects rendered on first use, so the cost of a quiz does
+    not grow with the size of the bank or the tree.
+    """
+
+    REROLLS = 3  # Tries per generator and pass to find parameters not asked about yet
+
+    def __init__(self):
+        # name -> (feature names, function(rng, index, features) -> (parameters, render) or None)
+        self.generators = {}
+        self.feature_functions = {}  # feature name -> function(index)
+
+    def feature(self, name):
+        """Decorator registering a feature computed from the index"""
+        def register(function):
+            self.feature_functions[name] = function
+            return function
+        return register
+
+    def question(self, name, *features):
+        """Decorator registering a question generator and the features it reads"""
+        def register(function):
+            self.generators[name] = (features, function)
+            return function
+        return register
+
+    def draw(self, index, seed_string, count):
+        """
+        Up to count distinct questions for one student.
+
+        Generators are tried in a shuffled order. One that has nothing to ask
+        about in this tree, or only picks parameters already asked about,
+        gives its slot to the next generator not drawn yet. Once every
+        generator has been tried, further passes ask the parameterized ones
+        about other items. Questions are told apart by generator name and
+        parameters, so none is rendered here. Fewer than count questions are
+        returned when the tree has nothing new to offer.
+        """
+        rng = random.Random(int(hashlib.md5(f"questions:{seed_string}".encode()).hexdigest()[:8], 16))
+        order = rng.sample(sorted(self.generators), len(self.generators))
+        features = IndexFeatures(self.feature_functions, index)
+        questions = []
+        asked = set()
+        while len(questions) < count:
+            found = False
+            for name in order:
+                if len(questions) == count:
+                    break
+                for _ in range(self.REROLLS):
+                    chosen = self.generators[name][1](random.Random(rng.getrandbits(32)), index, features)
+                    if chosen is None:
+                        break
+                    parameters, render = chosen
+                    if (name, parameters) not in asked:
+                        asked.add((name, parameters))
+                        questions.append(LazyQuestion(render))
+                        found = True
+                        break
+            if not found:
+                break  # A whole pass added nothing: the tree is out of distinct questions
+        return questions
+
+
+QUESTION_BANK = QuestionBank()
+
+
+@QUESTION_BANK.feature('unique_names')
+def feature_unique_names(index):
+    """Paths of visible files whose name occurs once in the tree (so 'find -name' has one answer)"""
+    return sorted(paths[0] for name, paths in index.paths_by_name.items()
+                  if len(paths) == 1 and not name.startswith('.'))
+
+
+@QUESTION_BANK.feature('files_by_size')
+def feature_files_by_size(index):
+    return index.files_by_size()
+
+
+@QUESTION_BANK.feature('subdirectories')
+def feature_subdirectories(index):
+    """Every directory below the quiz root, depth-first"""
+    return [directory for directory in index.directories if directory != '.']
+
+
+@QUESTION_BANK.feature('extensions')
+def feature_extensions(index):
+    return sorted(index.extensions.items())
+
+
+@QUESTION_BANK.feature('short_files')
+def feature_short_files(index):
+    """Visible files small enough to type their content as an answer"""
+    return sorted(QuizIndex.file_path(directory, name)
+                  for directory, record in index.records.items()
+                  for name, size in record.files.items() if 0 < size <= 40 and not name.startswith('.'))
+
+
+@QUESTION_BANK.question('file_path', 'unique_names')
+def question_file_path(rng, index, features):
+    if not features['unique_names']:
+        return None
+    path = rng.choice(features['unique_names'])
+    return (path,), lambda: {
+        'type': 'file_path',
+        'question': f"What is the relative path to the file named '{path.rpartition('/')[2]}'? (Answer without leading ./)",
+        'answer': path,
+        'hint': "Use: find . -name 'filename' (remove the ./ from the result)"
+    }
+
+
+@QUESTION_BANK.question('file_count', 'subdirectories')
+def question_file_count(rng, index, features):
+    candidates = [directory for directory in features['subdirectories'] if index.file_count(directory)]
+    if not candidates:
+        return None
+    directory = rng.choice(candidates)
+    return (directory,), lambda: {
+        'type': 'file_count',
+        'question': f"How many files are in the '{directory}' directory (not including subdirectories, hidden files included)?",
+        'answer': str(index.file_count(directory)),
+        'hint': f"Use: find {directory} -maxdepth 1 -type f | wc -l"
+    }
+
+
+@QUESTION_BANK.question('recursive_file_count', 'subdirectories')
+def question_recursive_file_count(rng, index, features):
+    candidates = [directory for directory in features['subdirectories']
+                  if index.file_count(directory, recursive=True) > index.file_count(directory)]
+    if not candidates:
+        return None
+    directory = rng.choice(candidates)
+    return (directory,), lambda: {
+        'type': 'file_count',
+        'question': f"How many files are in '{directory}' including all of its subdirectories?",
+        'answer': str(index.file_count(directory, recursive=True)),
+        'hint': f"Use: find {directory} -type f | wc -l"
+    }
+
+
+@QUESTION_BANK.question('subdirectory_count', 'subdirectories')
+def question_subdirectory_count(rng, index, features):
+    candidates = [directory for directory in features['subdirectories'] if index.records[directory].subdirectories]
+    if not candidates:
+        return None
+    directory = rng.choice(candidates)
+    return (directory,), lambda: {
+        'type': 'directory_count',
+        'question': f"How many directories are directly inside '{directory}'?",
+        'answer': str(len(index.records[directory].subdirectories)),
+        'hint': f"Use: find {directory} -mindepth 1 -maxdepth 1 -type d | wc -l"
+    }
+
+
+@QUESTION_BANK.question('directory_total', 'subdirectories')
+def question_directory_total(rng, index, features):
+    return (), lambda: {
+        'type': 'directory_count',
+        'question': "How many directories are there in the quiz structure, not counting the top directory itself?",
+        'answer': str(len(features['subdirectories'])),
+        'hint': "Use: find . -mindepth 1 -type d | wc -l"
+    }
+
+
+@QUESTION_BANK.question('file_size', 'unique_names')
+def question_file_size(rng, index, features):
+    if not features['unique_names']:
+        return None
+    path = rng.choice(features['unique_names'])
+    return (path,), lambda: {
+        'type': 'file_size',
+        'question': f"What is the size in bytes of the file '{path.rpartition('/')[2]}'?",
+        'answer': str(index.size(path)),
+        'hint': "Use: ls -l filename or du -b filename"
+    }
+
+
+@QUESTION_BANK.question('hidden_files')
+def question_hidden_files(rng, index, features):
+    return (), lambda: {
+        'type': 'hidden_files',
+        'question': "How many hidden files (names starting with '.') exist in the entire quiz structure?",
+        'answer': str(index.hidden_files),
+        'hint': "Use: find . -name '.*' -type f | wc -l"
+    }
+
+
+@QUESTION_BANK.question('file_extension', 'extensions')
+def question_file_extension(rng, index, features):
+    if not features['extensions']:
+        return None
+    extension, count = rng.choice(features['extensions'])
+    return (extension,), lambda: {
+        'type': 'file_extension',
+        'question': f"How many files with the '{extension}' extension exist in total?",
+        'answer': str(count),
+        'hint': f"Use: find . -name '*{extension}' -type f | wc -l"
+    }
+
+
+@QUESTION_BANK.question('largest_file', 'files_by_size')
+def question_largest_file(rng, index, features):
+    by_size = features['files_by_size']
+    
+    # Ask for the n-th largest only where its size is not shared, so the answer is unambiguous
+    def unambiguous(rank):
+        return all(by_size[other][0] != by_size[rank][0] for other in (rank - 1, rank + 1) if 0 <= other < len(by_size))
+    ranks = [rank for rank in range(min(3, len(by_size))) if unambiguous(rank)]
+    if not ranks:
+        return None
+    rank = rng.choice(ranks)
+    ordinal = ["largest", "second largest", "third largest"][rank]
+    return (rank,), lambda: {
+        'type': 'largest_file',
+        'question': f"What is the name of the {ordinal} file in the entire structure?",
+        'answer': by_size[rank][1].rpartition('/')[2],
+        'hint': "Use: find . -type f -exec ls -la {} + | sort -k5 -n"
+    }
+
+
+@QUESTION_BANK.question('file_content', 'short_files')
+def question_file_content(rng, index, features):
+    candidates = [path for path in features['short_files']
+                  if (index.content(path) or '').strip() and '\n' not in index.content(path).strip()]
+    if not candidates:
+        return None
+    # secret_code.txt stays the classic choice when present
+    secret = [path for path in candidates if path.endswith('secret_code.txt')]
+    path = secret[0] if secret and rng.random() < 0.5 else rng.choice(candidates)
+    return (path,), lambda: {
+        'type': 'file_content',
+        'question': f"What is the content of the file '{path}'?",
+        'answer': index.content(path).strip(),
+        'hint': f"Use: cat {path}"
+    }
+
+
+@QUESTION_BANK.question('directory_comparison', 'subdirectories')
+def question_directory_comparison(rng, index, features):
+    def pairs(directories):
+        return [(first, second) for first in directories for second in directories if first < second and
+                index.file_count(first, recursive=True) != index.file_count(second, recursive=True)]
+    # Top-level directories read best; any two directories will do when those all tie
+    candidates = pairs([directory for directory in features['subdirectories'] if '/' not in directory])
+    candidates = candidates or pairs(features['subdirectories'][:50])
+    if not candidates:
+        return None
+    first, second = rng.choice(candidates)
+    return (first, second), lambda: {
+        'type': 'directory_comparison',
+        'question': f"Which directory contains more files (including subdirectories): '{first}' or '{second}'?",
+        'answer': max((first, second), key=lambda directory: index.file_count(directory, recursive=True)),
+        'hint': "Count files in each directory with find DIR -type f | wc -l and compare"
+    }
+
+
+@QUESTION_BANK.question('total_files')
+def question_total_files(rng, index, features):
+    return (), lambda: {
+        'type': 'file_count',
+        'question': "How many files (hidden files included) are in the entire quiz structure?",
+        'answer': str(index.total_files),
+        'hint': "Use: find . -type f | wc -l"
+    }
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Index of a navigation quiz tree, shared by both navigation quizzes
+
+One os.scandir traversal records every directory's files and sizes, so each
+quiz answer is a dict lookup instead of another walk of the tree, and a
+refresh after the student changes something only rescans directories whose
+mtime moved.
+"""
+
+import os
+
+
+class DirectoryRecord:
+    """One directory as last seen by QuizIndex: its files and a summary of them"""
+
+    __slots__ = ('mtime_ns', 'files', 'contents', 'subdirectories', 'hidden', 'extensions', 'largest')
+
+    def __init__(self, mtime_ns):
+        self.mtime_ns = mtime_ns
+        self.files = {}            # name -> size in bytes
+        self.contents = {}         # name -> text of small files, read on first lookup
+        self.subdirectories = []   # names, alphabetical
+        self.hidden = 0
+        self.extensions = {}       # '.txt' -> count
+        self.largest = None        # (size, name)
+
+
+class QuizIndex:
+    """
+    Index of a quiz tree built with one os.scandir traversal, so every answer is a dict lookup.
+
+    Counts follow `find` semantics: regular files only, symlinks not followed,
+    hidden means the file name starts with '.'. Directory mtimes are cached and
+    refresh() rescans only directories whose entries changed (edits inside an
+    existing file do not change its directory's mtime and are not picked up).
+    The traversal only stats; small files are read once, when their content is
+    first asked for, so indexing a tree of 100k files reads none of them.
+    """
+
+    SMALL_FILE_BYTES = 4096  # Contents of text files up to this size are available
+
+    def __init__(self, root):
+        self.root = root
+        self.records = {}  # relative directory ('.' for the root) -> DirectoryRecord
+        self.refresh()
+
+    def refresh(self):
+        """Bring the index up to date, rescanning only directories whose mtime changed"""
+        previous, self.records = self.records, {}
+        pending = ['.']
+        while pending:
+            relative = pending.pop()
+            path = self.root if relative == '.' else os.path.join(self.root, relative)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            record = previous.get(relative)
+            if record is None or record.mtime_ns != mtime_ns:
+                record = self.scan_directory(path, mtime_ns)
+            self.records[relative] = record
+            prefix = '' if relative == '.' else relative + '/'
+            pending.extend(prefix + name for name in reversed(record.subdirectories))
+        self.summarize()
+        return self
+
+    def scan_directory(self, path, mtime_ns):
+        record = DirectoryRecord(mtime_ns)
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    record.subdirectories.append(entry.name)
+                elif entry.is_file(follow_symlinks=False):
+                    size = entry.stat(follow_symlinks=False).st_size
+                    record.files[entry.name] = size
+                    if entry.name.startswith('.'):
+                        record.hidden += 1
+                    extension = os.path.splitext(entry.name)[1]
+                    if extension:
+                        record.extensions[extension] = record.extensions.get(extension, 0) + 1
+                    if record.largest is None or (size, entry.name) > record.largest:
+                        record.largest = (size, entry.name)
+        record.subdirectories.sort()
+        return record
+
+    def read_small_file(self, path, size):
+        if size > self.SMALL_FILE_BYTES:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def summarize(self):
+        """Tree-wide totals from the per-directory records (no file is visited again)"""
+        self.directories = list(self.records)  # depth-first, alphabetical
+        self.recursive_counts = {}
+        for relative in reversed(self.directories):
+            prefix = '' if relative == '.' else relative + '/'
+            self.recursive_counts[relative] = len(self.records[relative].files) + sum(
+                self.recursive_counts[prefix + name] for name in self.records[relative].subdirectories)
+        self.total_files = self.recursive_counts.get('.', 0)
+        self.hidden_files = sum(record.hidden for record in self.records.values())
+        self.extensions = {}
+        self.paths_by_name = {}
+        largest = None
+        for relative, record in self.records.items():
+            for extension, count in record.extensions.items():
+                self.extensions[extension] = self.extensions.get(extension, 0) + count
+            for name in record.files:
+                self.paths_by_name.setdefault(name, []).append(self.file_path(relative, name))
+            if record.largest and (largest is None or record.largest[0] > largest[0]):
+                largest = (record.largest[0], self.file_path(relative, record.largest[1]))
+        self.largest_file = largest[1] if largest else None
+
+    @staticmethod
+    def file_path(directory, name):
+        return name if directory == '.' else f"{directory}/{name}"
+
+    def file_count(self, directory='.', recursive=False):
+        """Regular files in a directory, hidden ones included (find DIR [-maxdepth 1] -type f | wc -l)"""
+        if recursive:
+            return self.recursive_counts.get(directory, 0)
+        record = self.records.get(directory)
+        return len(record.files) if record else 0
+
+    def extension_count(self, extension):
+        """Files whose name ends in the extension, e.g. '.txt' (find . -name '*.txt' -type f)"""
+        return self.extensions.get(extension, 0)
+
+    def find(self, name):
+        """Relative paths of every file with this name (find . -name NAME -type f)"""
+        return self.paths_by_name.get(name, [])
+
+    def size(self, path):
+        """Size in bytes of a file, by relative path"""
+        directory, _, name = path.rpartition('/')
+        return self.records[directory or '.'].files[name]
+
+    def content(self, path):
+        """Text of a small file by relative path (None if large, binary or missing)"""
+        directory, _, name = path.rpartition('/')
+        record = self.records.get(directory or '.')
+        if record is None or name not in record.files:
+            return None
+        if name not in record.contents:
+            record.contents[name] = self.read_small_file(os.path.join(self.root, path), record.files[name])
+        return record.contents[name]
+
+    def files_by_size(self):
+        """(size, path) of every file, largest first (find . -type f -printf '%s %p' | sort -rn)"""
+        return sorted(((size, self.file_path(relative, name))
+                       for relative, record in self.records.items()
+                       for name, size in record.files.items()), reverse=True)
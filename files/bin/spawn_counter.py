@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Child-process accounting shared by tutorial.py and both navigation quizzes
+
+Importing this module installs an audit hook that counts every process the
+program starts, so housekeeping forks show up. The summary is a developer
+aid: it is printed on exit only when TUTORIAL_DEBUG is set (to anything but
+0), never to students by default.
+"""
+
+import os
+import sys
+
+
+class SpawnCounter:
+    """Count child processes started by this program (via an audit hook) so housekeeping forks show up"""
+
+    # subprocess.Popen also covers its posix_spawn fast path, so os.posix_spawn is not counted twice
+    EVENTS = frozenset(('subprocess.Popen', 'os.system', 'os.fork', 'os.forkpty', 'os.spawn'))
+
+    def __init__(self):
+        self.programs = {}  # program name -> number of spawns
+
+    def install(self):
+        sys.addaudithook(self.audit)
+
+    def audit(self, event, args):
+        if event not in self.EVENTS:
+            return
+        if event == 'subprocess.Popen':
+            executable, command = args[0], args[1]
+            if not executable:
+                executable = command if isinstance(command, (str, bytes)) else command[0]
+            program = os.path.basename(os.fsdecode(executable)).split()[0]
+        elif event == 'os.system':
+            program = 'sh'
+        else:
+            program = event.split('.')[-1]
+        self.programs[program] = self.programs.get(program, 0) + 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.programs.values())
+
+    def summary(self) -> str:
+        """One-line description, e.g. '2 processes spawned (bash ×1, ls ×1)'"""
+        if not self.programs:
+            return "0 processes spawned"
+        details = ", ".join(f"{program} ×{count}" for program, count in sorted(self.programs.items()))
+        return f"{self.total} process{'es' if self.total != 1 else ''} spawned ({details})"
+
+
+SPAWN_COUNTER = SpawnCounter()
+SPAWN_COUNTER.install()
+
+
+def debug_enabled() -> bool:
+    """Whether TUTORIAL_DEBUG asks for developer diagnostics"""
+    return os.environ.get('TUTORIAL_DEBUG', '0') not in ('', '0')
+
+
+def report_spawns(write=print):
+    """Print the spawn summary on exit, only in debug mode"""
+    if debug_enabled():
+        write(f"🔧 {SPAWN_COUNTER.summary()}")
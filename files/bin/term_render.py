@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Terminal rendering shared by tutorial.py and linux_navigation_quiz_text.py
+
+Both scripts paint the screen the same way: a white background for the
+lesson or quiz text and a black one while the student types shell commands.
+Renderer pads every line to the terminal width so the background fills the
+row, and composes a whole screen into a single write.
+
+Only os and sys are imported here, so loading this module keeps tutorial.py
+off the slow startup path.
+"""
+
+import os
+import sys
+
+
+class Colors:
+    """ANSI color codes for background changes without clearing screen"""
+    # Background modes without clearing screen
+    WHITE_MODE = '\033[47m\033[30m'    # White background, black text
+    BLACK_MODE = '\033[40m\033[32m'    # Black background, green text
+    RESET = '\033[0m'
+
+    # Simple status colors (no background change)
+    SUCCESS = '\033[32m'     # Green text
+    ERROR = '\033[31m'       # Red text
+    WARNING = '\033[33m'     # Yellow text
+    YELLOW = '\033[33m'      # Yellow text (same as WARNING)
+    PROGRESS = '\033[36m'    # Cyan text for progress messages
+
+
+def terminal_size() -> os.terminal_size:
+    """Terminal size without importing shutil (honours COLUMNS/LINES like shutil does)"""
+    try:
+        size = os.get_terminal_size(sys.__stdout__.fileno())
+    except (AttributeError, ValueError, OSError):
+        size = os.terminal_size((80, 24))
+    try:
+        columns = int(os.environ.get('COLUMNS', 0)) or size.columns
+    except ValueError:
+        columns = size.columns
+    try:
+        lines = int(os.environ.get('LINES', 0)) or size.lines
+    except ValueError:
+        lines = size.lines
+    return os.terminal_size((columns, lines))
+
+
+ANSI_ESCAPE = None  # Compiled on first use so `re` stays off the startup path
+
+
+def strip_ansi(text: str) -> str:
+    """Remove ANSI color escape sequences"""
+    global ANSI_ESCAPE
+    if '\x1b' not in text:
+        return text
+    if ANSI_ESCAPE is None:
+        import re
+        ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*m')
+    return ANSI_ESCAPE.sub('', text)
+
+
+class Renderer:
+    """
+    Buffered ANSI screen writer.
+
+    Lines are padded to the full terminal width so the background color
+    fills the row. The terminal size is cached and refreshed on SIGWINCH, and
+    display widths (emoji count as two columns) are cached per string.
+    Inside `with RENDERER.screen():` everything written, including plain
+    print() calls, is collected and flushed with a single write, so a whole
+    screen crosses to the terminal at once.
+    """
+
+    def __init__(self):
+        self.size = None
+        self.widths = {}
+        self.pending = []
+        self.depth = 0
+        self.stream = None  # Real stdout while a screen is being composed
+
+    def watch_resize(self):
+        """Refresh the cached terminal size whenever the window is resized"""
+        import signal
+        try:
+            signal.signal(signal.SIGWINCH, lambda signum, frame: setattr(self, 'size', None))
+        except (AttributeError, ValueError):
+            pass  # No SIGWINCH on this platform, or not on the main thread
+
+    def columns(self) -> int:
+        if self.size is None:
+            self.size = terminal_size()
+        return self.size.columns
+
+    def lines(self) -> int:
+        if self.size is None:
+            self.size = terminal_size()
+        return self.size.lines
+
+    def display_width(self, text: str) -> int:
+        """Number of terminal columns text occupies, ignoring ANSI escapes"""
+        width = self.widths.get(text)
+        if width is None:
+            plain = strip_ansi(text)
+            if plain.isascii():
+                width = len(plain)
+            else:
+                import unicodedata
+                width = 0
+                for char in plain:
+                    if char in '\u200d\ufe0e\ufe0f' or unicodedata.combining(char):
+                        continue
+                    width += 2 if unicodedata.east_asian_width(char) in 'WF' else 1
+            if len(self.widths) > 4096:
+                self.widths.clear()
+            self.widths[text] = width
+        return width
+
+    def write(self, text: str):
+        """Write raw text now, or add it to the screen being composed"""
+        if self.depth:
+            self.pending.append(text)
+        else:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+    def flush(self):
+        pass  # Lets the renderer stand in for sys.stdout while composing
+
+    def line(self, text: str = "", mode: str = Colors.WHITE_MODE, end: str = '\n', after=None):
+        """Write text padded with spaces to the full width in the given color mode"""
+        padding = self.columns() - self.display_width(text) if text else self.columns()
+        fill = " " * padding if padding > 0 else ""
+        trailer = (mode if after is None else after) if end == '\n' else ''
+        self.write(f'{mode}{text}{fill}{end}{trailer}')
+
+    def screen(self):
+        """Context manager that composes output and flushes it in one write"""
+        return _ScreenBlock(self)
+
+
+class _ScreenBlock:
+    """Redirects stdout into the renderer until the outermost block exits"""
+
+    def __init__(self, renderer: Renderer):
+        self.renderer = renderer
+
+    def __enter__(self):
+        renderer = self.renderer
+        if renderer.depth == 0:
+            renderer.stream = sys.stdout
+            sys.stdout = renderer
+        renderer.depth += 1
+        return renderer
+
+    def __exit__(self, *exc_info):
+        renderer = self.renderer
+        renderer.depth -= 1
+        if renderer.depth == 0:
+            sys.stdout = renderer.stream
+            output = ''.join(renderer.pending)
+            renderer.pending.clear()
+            sys.stdout.write(output)
+            sys.stdout.flush()
+        return False
+
+
+RENDERER = Renderer()
+
+
+def clear_screen():
+    """Set white background mode without clearing screen"""
+    # Fill the current line with white background
+    RENDERER.write(f'{Colors.WHITE_MODE}{" " * RENDERER.columns()}\r')
+
+def clear_screen_completely():
+    """Clear screen completely and set white background mode"""
+    # Clear screen, home cursor, fill the screen with white background, return to top
+    blank = " " * RENDERER.columns() + "\n"
+    RENDERER.write(f'\033[2J\033[H{Colors.WHITE_MODE}{blank * RENDERER.lines()}\033[H')
+
+def enter_shell_mode():
+    """Switch to black background shell mode without clearing screen"""
+    RENDERER.write(Colors.BLACK_MODE)
+
+def exit_shell_mode():
+    """Return to white background mode without clearing screen"""
+    RENDERER.write(Colors.WHITE_MODE)
+
+def print_white_bg(text="", end='\n'):
+    """Print text with white background that extends across full line"""
+    RENDERER.line(text, Colors.WHITE_MODE, end)
+
+def print_black_bg(text="", end='\n'):
+    """Print text with black background that extends across full line"""
+    # Reset to default after printing
+    RENDERER.line(text, Colors.BLACK_MODE, end, after=Colors.RESET)
@@ -2,178 +2,857 @@
 """
 Linux Command Tutorial
 An interactive tutorial for learning essential Linux commands
+
+Startup only imports what is needed to reach the first prompt; everything
+else (subprocess, re, hashlib, tempfile, ...) is imported where it is used.
+Run with --startup-report [--json] to see how long each import takes.
 """
 
-import os
+from __future__ import annotations
+
 import sys
-import subprocess
 import time
-import hashlib
-import json
-import datetime
-import random
-from typing import List, Dict, Any
-import tempfile
-import shutil
-
-
-class Colors:
-    """ANSI color codes for background changes without clearing screen"""
-    # Background modes without clearing screen
-    WHITE_MODE = '\033[47m\033[30m'    # White background, black text
-    BLACK_MODE = '\033[40m\033[32m'    # Black background, green text
-    RESET = '\033[0m'
-
-    # Simple status colors (no background change)
-    SUCCESS = '\033[32m'     # Green text
-    ERROR = '\033[31m'       # Red text
-    WARNING = '\033[33m'     # Yellow text
-    YELLOW = '\033[33m'      # Yellow text (same as WARNING)
-    PROGRESS = '\033[36m'    # Cyan text for progress messages
-
-def clear_screen():
-    """Set white background mode without clearing screen"""
-    # Get terminal width and fill the current line with white background
-    try:
-        import shutil
-        width = shutil.get_terminal_size().columns
-        print(f'{Colors.WHITE_MODE}{" " * width}', end='\r')
-    except:
-        print(Colors.WHITE_MODE, end='')
-
-def clear_screen_completely():
-    """Clear screen completely and set white background mode"""
-    print('\033[2J\033[H', end='')  # Clear screen and home cursor
-    print(Colors.WHITE_MODE, end='')
-    # Fill initial screen with white background
-    try:
-        import shutil
-        width = shutil.get_terminal_size().columns
-        height = shutil.get_terminal_size().lines
-        for _ in range(height):
-            print(f'{" " * width}')
-        print('\033[H', end='')  # Return to top
-    except:
-        pass
 
-def enter_shell_mode():
-    """Switch to black background shell mode without clearing screen"""
-    print(Colors.BLACK_MODE, end='')
 
-def exit_shell_mode():
-    """Return to white background mode without clearing screen"""
-    print(Colors.WHITE_MODE, end='')
+class ImportTimer:
+    """Record first-time imports with self/cumulative times, like `python -X importtime`"""
 
-def print_white_bg(text="", end='\n'):
-    """Print text with white background that extends across full line"""
-    try:
-        import shutil
-        width = shutil.get_terminal_size().columns
-
-        # Always ensure we're in white mode first
-        print(Colors.WHITE_MODE, end='')
-
-        if text:
-            # Calculate actual display length (excluding ANSI codes)
-            import re
-            # Remove ANSI escape sequences for length calculation
-            display_text = re.sub(r'\x1b\[[0-9;]*m', '', text)
-            text_len = len(display_text)
-
-            if text_len < width:
-                spaces_needed = width - text_len
-                # Print text with white background, then fill rest with spaces
-                print(f'{Colors.WHITE_MODE}{text}{" " * spaces_needed}', end=end)
-            else:
-                # Text is longer than width, just print with white background
-                print(f'{Colors.WHITE_MODE}{text}', end=end)
-        else:
-            # Just print a full line of spaces for empty lines
-            print(f'{Colors.WHITE_MODE}{" " * width}', end=end)
+    def __init__(self):
+        import builtins
+        self.builtins = builtins
+        self.original_import = builtins.__import__
+        self.records = []  # [name, depth, cumulative seconds]
+        self.depth = 0
+        self.started = time.perf_counter()
+
+    def install(self):
+        self.builtins.__import__ = self.timed_import
+
+    def uninstall(self):
+        self.builtins.__import__ = self.original_import
+
+    def timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self.original_import(name, globals, locals, fromlist, level)
+        record = [name, self.depth, 0.0]
+        self.records.append(record)
+        self.depth += 1
+        start = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            record[2] = time.perf_counter() - start
+            self.depth -= 1
+
+    def rows(self):
+        """Yield (name, depth, self_ms, cumulative_ms) in import order"""
+        for index, (name, depth, cumulative) in enumerate(self.records):
+            children = 0.0
+            for child_name, child_depth, child_cumulative in self.records[index + 1:]:
+                if child_depth <= depth:
+                    break
+                if child_depth == depth + 1:
+                    children += child_cumulative
+            yield name, depth, (cumulative - children) * 1000, cumulative * 1000
+
+
+IMPORT_TIMER = None
+if '--startup-report' in sys.argv:
+    IMPORT_TIMER = ImportTimer()
+    IMPORT_TIMER.install()
 
-        # Ensure we end with white mode for next line
-        if end == '\n':
-            print(Colors.WHITE_MODE, end='')
+import os
+import posixpath
+from abc import ABC, abstractmethod
 
-    except:
-        # Fallback if terminal size detection fails
-        print(f'{Colors.WHITE_MODE}{text}', end=end)
+from spawn_counter import SPAWN_COUNTER, report_spawns
+from term_render import (RENDERER, Colors, clear_screen, clear_screen_completely, enter_shell_mode,
+                         exit_shell_mode, print_black_bg, print_white_bg)
 
-def print_black_bg(text="", end='\n'):
-    """Print text with black background that extends across full line"""
-    try:
-        import shutil
-        width = shutil.get_terminal_size().columns
-
-        # Always ensure we're in black mode first
-        print(Colors.BLACK_MODE, end='')
-
-        if text:
-            # Calculate actual display length (excluding ANSI codes)
-            import re
-            # Remove ANSI escape sequences for length calculation
-            display_text = re.sub(r'\x1b\[[0-9;]*m', '', text)
-            text_len = len(display_text)
-
-            if text_len < width:
-                spaces_needed = width - text_len
-                # Print text with black background, then fill rest with spaces
-                print(f'{Colors.BLACK_MODE}{text}{" " * spaces_needed}', end=end)
-            else:
-                # Text is longer than width, just print with black background
-                print(f'{Colors.BLACK_MODE}{text}', end=end)
-        else:
-            # Just print a full line of spaces for empty lines
-            print(f'{Colors.BLACK_MODE}{" " * width}', end=end)
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import List, Dict, Any, Optional
 
-        # Reset to default after printing
-        if end == '\n':
-            print(Colors.RESET, end='')
 
-    except:
-        # Fallback if terminal size detection fails
-        print(f'{Colors.BLACK_MODE}{text}{Colors.RESET}', end=end)
+def timestamp() -> str:
+    """Current local time in ISO format (without importing datetime)"""
+    return time.strftime('%Y-%m-%dT%H:%M:%S')
 
-class TutorialEnvironment:
-    def __init__(self):
-        self.temp_dir = tempfile.mkdtemp(prefix="linux_tutorial_")
-        self.setup_filesystem()
-
-    def setup_filesystem(self):
-        # Remove and recreate the temp directory for a fresh start
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-        os.makedirs(self.temp_dir, exist_ok=True)
-        # Directory structure
-        dirs = [
+
+# Files and directories written into the tutorial sandbox, grouped so each
+# lesson only materializes what it uses. File content is either a string or
+# a (character, count) pair for large filler files, which are written in chunks.
+FIXTURE_MANIFEST = {
+    'practice': {
+        'dirs': [
             'practice_dir',
             'practice_dir/subdir1',
             'practice_dir/subdir2',
-            'docs',
             'projects',
-        ]
-        files = [
-            'practice_dir/file1.txt',
-            'practice_dir/file2.txt',
-            'practice_dir/subdir1/note.txt',
-            'docs/readme.md',
-            'projects/project1.txt',
-        ]
-        for d in dirs:
-            os.makedirs(os.path.join(self.temp_dir, d), exist_ok=True)
-        for f in files:
-            file_path = os.path.join(self.temp_dir, f)
-            with open(file_path, 'w') as fp:
-                if f.endswith('.txt'):
-                    fp.write(f"This is {f}\n")
-                elif f.endswith('.md'):
-                    fp.write(f"# {f}\n")
-                else:
-                    fp.write(f"{f}\n")
-        # Change working directory to the tutorial temp dir
-        os.chdir(self.temp_dir)
+        ],
+        'files': {
+            'practice_dir/file1.txt': "This is practice_dir/file1.txt\n",
+            'practice_dir/file2.txt': "This is practice_dir/file2.txt\n",
+            'practice_dir/subdir1/note.txt': "This is practice_dir/subdir1/note.txt\n",
+            'projects/project1.txt': "This is projects/project1.txt\n",
+            '.hidden_file': "This is a hidden file.\nIt contains secret tutorial info.\nDo not delete!\n",
+        },
+    },
+    'documents': {
+        'dirs': ['Documents'],
+        'files': {
+            'Documents/small.txt': "Hello!\n",
+            'Documents/project.txt': "Project: Linux Tutorial\nThis project helps students learn Linux.\nIt covers navigation, file operations, and more.\nLine 4: Example\nLine 5: End of preview.\n",
+            'Documents/README.txt': "Welcome to the Linux Tutorial!\nThis README describes the tutorial.\nLinux is a powerful operating system.\n",
+            'Documents/students.txt': "Alice Johnson\nBob Smith\nCharlie Computer\nDana Lee\n",
+            'Documents/commands.txt': "ls\ncd\npwd\ncat\ngrep\nhead\ntail\nwc\nchmod\n",
+            'Documents/big1.txt': ('A', 1024 * 100),  # ~100 KB
+            'Documents/big2.txt': ('B', 1024 * 300),  # ~300 KB
+        },
+    },
+}
+
+# Prebuilt copy of FIXTURE_MANIFEST, written at image build time with
+# `tutorial.py --build-fixture-template <dir>` and cloned into each sandbox.
+FIXTURE_TEMPLATE_DIR = os.environ.get('TUTORIAL_FIXTURE_TEMPLATE', '/usr/local/share/linux_tutorial/fixtures')
+FIXTURE_TEMPLATE_HASH_FILE = '.manifest_sha256'
+
+FICLONE = 0x40049409  # ioctl request for a copy-on-write reflink (Linux)
+
+
+def fixture_manifest_hash() -> str:
+    """Content hash of FIXTURE_MANIFEST, used to detect a stale prebuilt template"""
+    import hashlib
+    import json
+    return hashlib.sha256(json.dumps(FIXTURE_MANIFEST, sort_keys=True).encode()).hexdigest()
+
+
+def fixture_size(content) -> int:
+    """Size in bytes of a fixture file once written"""
+    if isinstance(content, tuple):
+        return content[1] + 1
+    return len(content.encode())
+
+
+def write_fixture_file(file_path: str, content) -> int:
+    """Write one fixture file from its manifest entry and return the bytes written"""
+    with open(file_path, 'w') as fp:
+        if isinstance(content, tuple):
+            # Large filler file: write in chunks instead of building one string
+            char, count = content
+            chunk = char * 65536
+            for _ in range(count // len(chunk)):
+                fp.write(chunk)
+            fp.write(char * (count % len(chunk)) + "\n")
+        else:
+            fp.write(content)
+    return fixture_size(content)
+
+
+def clone_file(source: str, target: str) -> bool:
+    """
+    Reflink source to target (copy-on-write, no data written); False if the
+    filesystem cannot. Never a hardlink, which would share the template's
+    inode, owner and mode with the sandbox.
+    """
+    import fcntl
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return True
+        except OSError:
+            return False
+
+
+def build_fixture_template(template_dir: str):
+    """Write every fixture group into template_dir/<group>/ and record the manifest hash"""
+    import shutil
+    shutil.rmtree(template_dir, ignore_errors=True)
+    for group_name, group in FIXTURE_MANIFEST.items():
+        group_root = os.path.join(template_dir, group_name)
+        for d in group['dirs']:
+            os.makedirs(os.path.join(group_root, d), exist_ok=True)
+        for f, content in group['files'].items():
+            write_fixture_file(os.path.join(group_root, f), content)
+    # Written last, so an interrupted build is never mistaken for a valid template
+    with open(os.path.join(template_dir, FIXTURE_TEMPLATE_HASH_FILE), 'w') as fp:
+        fp.write(fixture_manifest_hash() + "\n")
+    print(f"📁 Fixture template built in {template_dir}")
+
+
+def find_fixture_template() -> Optional[str]:
+    """Return the prebuilt template directory if it exists and matches FIXTURE_MANIFEST"""
+    try:
+        with open(os.path.join(FIXTURE_TEMPLATE_DIR, FIXTURE_TEMPLATE_HASH_FILE)) as fp:
+            stored_hash = fp.read().strip()
+    except OSError:
+        return None
+    return FIXTURE_TEMPLATE_DIR if stored_hash == fixture_manifest_hash() else None
+
+
+# Append-only record of the student's session, replayed on startup so a tab
+# reload or crash resumes at the same exercise instead of starting over.
+JOURNAL_PATH = os.environ.get('TUTORIAL_JOURNAL', os.path.expanduser('~/.linux_tutorial/session.jsonl'))
+
+
+class SessionJournal:
+    """
+    Append-only JSONL journal of session events with batched fsync.
+
+    Each record carries a sequence number. When the journal grows past
+    `compact_after` records (or a run ends) the replayed state is written to
+    a snapshot and the journal is truncated, so resuming reads at most one
+    snapshot plus a short tail.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH, sync_every: int = 8,
+                 sync_interval: float = 2.0, compact_after: int = 64):
+        self.path = path
+        self.snapshot_path = os.path.splitext(path)[0] + '.snapshot.json'
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_after = compact_after
+        self.state = self.empty_state()
+        self.file = None
+        self.records = 0  # Records in the journal file since the last compaction
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    @staticmethod
+    def empty_state() -> Dict[str, Any]:
+        return {'seq': 0, 'user_progress': None, 'run': None}
+
+    @staticmethod
+    def apply(state: Dict[str, Any], record: Dict[str, Any]):
+        """Fold one journal record into the replayed state"""
+        kind = record['type']
+        progress = state['user_progress']
+        run = state['run']
+        if kind == 'session':
+            state['user_progress'] = {
+                'student_id': record['student_id'],
+                'assignment_key': None,
+                'start_time': record['start_time'],
+                'completed_exercises': [],
+                'completion_codes': [],
+                'total_exercises': 0
+            }
+            if record.get('student_name'):
+                state['user_progress']['student_name'] = record['student_name']
+            state['run'] = None
+        elif kind == 'run':
+            progress['assignment_key'] = record['assignment_key']
+            progress['total_exercises'] = record['total_exercises']
+            progress['completion_codes'] = []
+            state['run'] = {
+                'mode': record['mode'],
+                'position': [record['lesson'], 0],  # Next exercise to present
+                'exercise_counter': 0,
+                'commands': []  # Accepted commands of the current lesson, replayed on resume
+            }
+        elif kind == 'exercise':
+            if run['position'][0] != record['lesson']:
+                run['commands'] = []
+            run['position'] = [record['lesson'], record['exercise'] + 1]
+            if record.get('record'):
+                progress['completed_exercises'].append(record['record'])
+                run['exercise_counter'] += 1
+                run['commands'].append(record['record']['user_input'])
+        elif kind == 'code':
+            progress['completion_codes'].append(record['entry'])
+        elif kind == 'run_end':
+            state['run'] = None
+        state['seq'] = record['seq']
+
+    def load(self) -> Dict[str, Any]:
+        """Replay snapshot + journal into self.state and return it"""
+        import json
+        state = self.empty_state()
+        try:
+            with open(self.snapshot_path, encoding='utf-8') as fp:
+                state = json.load(fp)
+        except (OSError, ValueError):
+            pass
+        self.records = 0
+        try:
+            with open(self.path, encoding='utf-8') as fp:
+                for line in fp:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn final write from a crash
+                    self.records += 1
+                    # Records already folded into the snapshot (crash mid-compaction)
+                    if record['seq'] > state['seq']:
+                        self.apply(state, record)
+        except OSError:
+            pass
+        self.state = state
+        return state
+
+    def append(self, kind: str, sync: bool = False, **fields):
+        """Record an event; fsync is batched unless `sync` is set"""
+        import json
+        record = {'type': kind, 'seq': self.state['seq'] + 1, **fields}
+        self.apply(self.state, record)
+        if self.file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self.file = open(self.path, 'a', encoding='utf-8')
+        self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.file.flush()
+        self.records += 1
+        self.unsynced += 1
+        if kind == 'run_end' or self.records >= self.compact_after:
+            self.compact()
+        elif sync or self.unsynced >= self.sync_every or time.monotonic() - self.last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        if self.file is not None and self.unsynced:
+            os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def compact(self):
+        """Write the replayed state to the snapshot, then truncate the journal"""
+        import json
+        temp_path = self.snapshot_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as fp:
+            json.dump(self.state, fp, separators=(',', ':'))
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        if self.file is not None:
+            self.file.truncate(0)
+            os.fsync(self.file.fileno())
+        self.records = 0
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def reset(self):
+        """Forget the previous session before starting a new one"""
+        self.close()
+        for path in (self.path, self.snapshot_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.state = self.empty_state()
+        self.records = 0
+
+    def close(self):
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+
+
+class OutputCapture:
+    """
+    Bounded, streaming view of one output stream of a command.
+
+    Text is echoed to the terminal as it arrives. Only the last `limit`
+    characters are kept, alongside a running SHA-256 and byte count of the
+    whole stream. Regexes registered up front are searched incrementally,
+    chunk by chunk, and dropped once they match, so the whole output is
+    never rescanned. The command itself always runs to completion: its
+    output belongs to the student and the shell framing needs the sentinel.
+    """
+
+    def __init__(self, patterns=(), echo=None, limit: int = 64 * 1024):
+        import codecs
+        import hashlib
+        self.echo = echo
+        self.limit = limit
+        self.tail = ''
+        self.carry = ''        # Unfinished last line, so line-anchored matches see all of it
+        self.carry_start = 0   # 1 when carry was truncated and does not start a line
+        self.total_bytes = 0
+        self.digest = hashlib.sha256()
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.pending = {regex: False for regex in patterns}
+        self.matched = set()
+
+    def feed(self, data: bytes, final: bool = False):
+        """Consume a chunk of raw output"""
+        self.total_bytes += len(data)
+        self.digest.update(data)
+        text = self.decoder.decode(data, final)
+        if not text:
+            return
+
+        if self.echo is not None:
+            self.echo.write(text)
+            self.echo.flush()
+
+        self.tail = (self.tail + text)[-self.limit:]
+
+        if self.pending:
+            window = self.carry + text
+            for regex in list(self.pending):
+                # Searching from carry_start keeps ^ and \A off a truncated line's cut
+                if regex.search(window, self.carry_start):
+                    self.matched.add(regex)
+                    del self.pending[regex]
+            newline = window.rfind('\n')
+            if newline >= 0:
+                self.carry, self.carry_start = window[newline + 1:], 0
+            else:
+                self.carry = window
+            if len(self.carry) > self.limit:
+                # Very long line: keep its end behind a placeholder character
+                self.carry, self.carry_start = ' ' + self.carry[-self.limit:], 1
+
+    def found(self, regex) -> Optional[bool]:
+        """Whether a registered regex matched; None if it was not registered"""
+        if regex in self.matched:
+            return True
+        if regex in self.pending:
+            return False
+        return None
+
+    @property
+    def sha256(self) -> str:
+        return self.digest.hexdigest()
+
+
+class ShellResult:
+    """
+    Result of a shell command, compatible with subprocess.CompletedProcess.
+
+    Defined without subclassing so subprocess is not imported at startup.
+    Also records wall time and the shell's working directory.
+    """
+
+    def __init__(self, args, returncode, stdout=None, stderr=None, elapsed=0.0, cwd=None,
+                 stdout_capture=None, stderr_capture=None):
+        self.args = args
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.elapsed = elapsed
+        self.cwd = cwd
+        self.stdout_capture = stdout_capture
+        self.stderr_capture = stderr_capture
+
+    def __repr__(self):
+        return f"ShellResult(args={self.args!r}, returncode={self.returncode!r})"
+
+    def check_returncode(self):
+        """Raise CalledProcessError if the exit code is non-zero"""
+        if self.returncode:
+            import subprocess
+            raise subprocess.CalledProcessError(self.returncode, self.args, self.stdout, self.stderr)
+
+
+class ShellSession:
+    """
+    Long-lived shell coprocess for running student commands.
+
+    Every command is sent to the same bash process and framed with a
+    per-command sentinel, so stdout, stderr and the exit status can be
+    separated without forking a new shell for each attempt. The working
+    directory and exported variables persist between commands.
+    """
+
+    def __init__(self, cwd: Optional[str] = None):
+        import shutil
+        self.shell = shutil.which('bash') or '/bin/sh'
+        self.cwd = cwd or os.getcwd()
+        self.process = None
+        self.timings = []  # Wall time (seconds) of each command run
+
+    def start(self):
+        """Start the shell coprocess in the current working directory"""
+        import subprocess
+        self.process = subprocess.Popen(
+            [self.shell, '--noprofile', '--norc'] if self.shell.endswith('bash') else [self.shell],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.cwd,
+            start_new_session=True
+        )
+
+    def is_alive(self) -> bool:
+        """Check whether the shell coprocess is still running"""
+        return self.process is not None and self.process.poll() is None
+
+    def run(self, command: str, timeout: float = 10,
+            stdout_capture: Optional[OutputCapture] = None,
+            stderr_capture: Optional[OutputCapture] = None) -> ShellResult:
+        """
+        Run a command in the persistent shell.
+
+        Output is handed to the captures chunk by chunk as it arrives; the
+        returned result's stdout/stderr hold only their bounded tails.
+        """
+        import shlex
+        if not self.is_alive():
+            self.start()
+        stdout_capture = stdout_capture or OutputCapture()
+        stderr_capture = stderr_capture or OutputCapture()
+
+        sentinel = f"__TUTORIAL_DONE_{os.urandom(8).hex()}__"
+        # eval keeps syntax errors from killing the shell; stdin is detached so
+        # commands like a bare `cat` cannot swallow the framing script
+        script = (
+            f"eval {shlex.quote(command)} </dev/null\n"
+            f"__rc=$?; printf '{sentinel} %d %s\\n' \"$__rc\" \"$PWD\"; "
+            f"printf '{sentinel}\\n' >&2\n"
+        )
+
+        # Background jobs from earlier commands may have written since the
+        # last sentinel; that output belongs to no command, so drop it
+        self._discard_stray_output()
+
+        start_time = time.monotonic()
+        self.process.stdin.write(script.encode())
+        self.process.stdin.flush()
+
+        status_line = self._stream_until_sentinel(
+            sentinel, command, timeout, {'stdout': stdout_capture, 'stderr': stderr_capture}
+        )
+        elapsed = time.monotonic() - start_time
+        self.timings.append(elapsed)
+
+        if status_line is None:
+            # The command exited the shell (e.g. `exit 1`); restart on next run
+            returncode = self.process.wait()
+            self.process = None
+        else:
+            rc_text, _, cwd = status_line.partition(' ')
+            returncode = int(rc_text)
+            self.cwd = cwd or self.cwd
+
+        return ShellResult(
+            command,
+            returncode,
+            stdout_capture.tail,
+            stderr_capture.tail,
+            elapsed=elapsed,
+            cwd=self.cwd,
+            stdout_capture=stdout_capture,
+            stderr_capture=stderr_capture
+        )
+
+    def _discard_stray_output(self):
+        """Read and drop whatever the shell printed between commands"""
+        import selectors
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.process.stdout, selectors.EVENT_READ)
+            selector.register(self.process.stderr, selectors.EVENT_READ)
+            while True:
+                ready = selector.select(0)
+                if not ready:
+                    return
+                for key, _ in ready:
+                    if not os.read(key.fd, 65536):
+                        selector.unregister(key.fileobj)
+
+    def _stream_until_sentinel(self, sentinel: str, command: str, timeout: float, captures) -> Optional[str]:
+        """Forward stdout/stderr to their captures until both report the sentinel"""
+        import selectors
+        import subprocess
+        marker = sentinel.encode()
+        # Bytes held back because they could be the start of the sentinel
+        pending = {name: bytearray() for name in captures}
+        status = bytearray()
+        done = {name: False for name in captures}
+        deadline = time.monotonic() + timeout
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.process.stdout, selectors.EVENT_READ, 'stdout')
+            selector.register(self.process.stderr, selectors.EVENT_READ, 'stderr')
+
+            while not all(done.values()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.kill()
+                    raise subprocess.TimeoutExpired(command, timeout)
+
+                for key, _ in selector.select(remaining):
+                    name = key.data
+                    chunk = os.read(key.fd, 65536)
+                    buffer = pending[name]
+                    if not chunk:
+                        # Shell exited before printing the sentinel
+                        selector.unregister(key.fileobj)
+                        captures[name].feed(bytes(buffer), final=True)
+                        buffer.clear()
+                        done[name] = True
+                        continue
+
+                    buffer.extend(chunk)
+                    index = buffer.find(marker)
+                    if index == -1:
+                        safe = max(len(buffer) - len(marker) + 1, 0)
+                        captures[name].feed(bytes(buffer[:safe]))
+                        del buffer[:safe]
+                    elif b'\n' in buffer[index:]:
+                        captures[name].feed(bytes(buffer[:index]), final=True)
+                        if name == 'stdout':
+                            status = buffer[index + len(marker):].split(b'\n', 1)[0]
+                        buffer.clear()
+                        selector.unregister(key.fileobj)
+                        done[name] = True
+
+        return status.decode(errors='replace').strip() if status else None
+
+    def average_time(self) -> float:
+        """Average wall time per command in seconds"""
+        return sum(self.timings) / len(self.timings) if self.timings else 0.0
+
+    def kill(self):
+        """Kill the shell and anything it started; the next run restarts it"""
+        if self.process is None:
+            return
+        import signal
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        self.process.wait()
+        self.process = None
+
+    def close(self):
+        """Shut down the shell coprocess"""
+        import subprocess
+        if self.is_alive():
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=1)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        self.kill()
+
+class Check(ABC):
+    """
+    Compiled exercise verification.
+
+    Checks are built once when lessons load and called on every attempt with
+    the student's input and the command result. They combine with &, | and ~.
+    """
+
+    @abstractmethod
+    def __call__(self, user_input: str, result: ShellResult) -> bool:
+        """Whether the attempt passes"""
+
+    def output_patterns(self, user_input: str) -> list:
+        """Regexes to search for while the command's output is streaming"""
+        return []
+
+    def __and__(self, other):
+        return AllOf(self, other)
+
+    def __or__(self, other):
+        return AnyOf(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+
+class AllOf(Check):
+    """Passes when every child check passes"""
+
+    def __init__(self, *checks: Check):
+        self.checks = checks
+
+    def __call__(self, user_input, result):
+        return all(check(user_input, result) for check in self.checks)
+
+    def output_patterns(self, user_input):
+        return [regex for check in self.checks for regex in check.output_patterns(user_input)]
+
+
+class AnyOf(Check):
+    """Passes when at least one child check passes"""
+
+    def __init__(self, *checks: Check):
+        self.checks = checks
+
+    def __call__(self, user_input, result):
+        return any(check(user_input, result) for check in self.checks)
+
+    def output_patterns(self, user_input):
+        return [regex for check in self.checks for regex in check.output_patterns(user_input)]
+
+
+class Not(Check):
+    """Inverts a child check"""
+
+    def __init__(self, check: Check):
+        self.check = check
+
+    def __call__(self, user_input, result):
+        return not self.check(user_input, result)
+
+    def output_patterns(self, user_input):
+        return self.check.output_patterns(user_input)
+
+
+class Succeeded(Check):
+    """Command exited with status 0"""
+
+    def __call__(self, user_input, result):
+        return result.returncode == 0
+
+
+def output_found(regex, result) -> bool:
+    """Look up a regex in the streamed output, falling back to searching stdout"""
+    capture = getattr(result, 'stdout_capture', None)
+    found = capture.found(regex) if capture is not None else None
+    if found is None:
+        return regex.search(result.stdout or '') is not None
+    return found
+
+
+class OutputMatches(Check):
+    """
+    Command stdout matches a precompiled regular expression.
+
+    While streaming, output is searched in line-aligned windows, so use
+    (?m)^ rather than \\A to anchor a pattern.
+    """
+
+    def __init__(self, pattern: str, flags: int = 0):
+        import re
+        self.regex = re.compile(pattern, flags)
+
+    def __call__(self, user_input, result):
+        return output_found(self.regex, result)
+
+    def output_patterns(self, user_input):
+        return [self.regex]
+
+
+class OutputContains(Check):
+    """
+    Command stdout contains literal text.
+
+    When the student passes case_flag (e.g. grep -i) the comparison
+    ignores case, as the original grep check did.
+    """
+
+    def __init__(self, text: str, case_flag: Optional[str] = None):
+        import re
+        self.text = text
+        self.exact = re.compile(re.escape(text))
+        self.folded = re.compile(re.escape(text), re.IGNORECASE)
+        self.case_flag = case_flag
+
+    def regex_for(self, user_input: str):
+        ignore_case = self.case_flag is not None and self.case_flag in user_input.lower()
+        return self.folded if ignore_case else self.exact
+
+    def __call__(self, user_input, result):
+        return output_found(self.regex_for(user_input), result)
+
+    def output_patterns(self, user_input):
+        return [self.regex_for(user_input)]
+
+
+class OutputDigest(Check):
+    """Command stdout hashes to an exact SHA-256 digest (checked without keeping the output)"""
+
+    def __init__(self, sha256: str):
+        self.sha256 = sha256.lower()
+
+    def __call__(self, user_input, result):
+        capture = getattr(result, 'stdout_capture', None)
+        if capture is not None:
+            return capture.sha256 == self.sha256
+        import hashlib
+        return hashlib.sha256((result.stdout or '').encode()).hexdigest() == self.sha256
+
+
+class PathExists(Check):
+    """Path exists, optionally restricted to a regular file or directory"""
+
+    def __init__(self, path: str, kind: Optional[str] = None):
+        self.path = path
+        self.test = {'file': os.path.isfile, 'dir': os.path.isdir}.get(kind, os.path.exists)
+
+    def __call__(self, user_input, result):
+        return self.test(self.path)
+
+
+class FileContains(Check):
+    """File exists and its contents match a precompiled regular expression"""
+
+    def __init__(self, path: str, pattern: str, flags: int = 0):
+        import re
+        self.path = path
+        self.regex = re.compile(pattern, flags)
+
+    def __call__(self, user_input, result):
+        try:
+            with open(self.path, 'r', errors='replace') as f:
+                return self.regex.search(f.read()) is not None
+        except OSError:
+            return False
+
+
+# Shared check instance used by several verifications
+SUCCEEDED = Succeeded()
+
+# Verification name -> (number of ':' arguments, factory). Arguments are
+# split once at compile time, never per attempt.
+VERIFICATIONS = {
+    'check_pwd': (0, lambda: SUCCEEDED & OutputMatches(r'(?m)^\s*/')),
+    'check_ls': (0, lambda: SUCCEEDED),
+    'check_command_success': (0, lambda: SUCCEEDED),
+    'check_file_exists': (1, lambda path: PathExists(path)),
+    'check_file_not_exists': (1, lambda path: ~PathExists(path)),
+    'check_file_moved': (2, lambda old, new: ~PathExists(old) & PathExists(new)),
+    'check_dir_exists': (1, lambda path: PathExists(path, kind='dir')),
+    'check_files_not_exist': (1, lambda paths: AllOf(*(~PathExists(p.strip()) for p in paths.split(',')))),
+    'check_ls_specific': (1, lambda path: SUCCEEDED & OutputContains(path)),
+    'check_cat_output': (1, lambda path: SUCCEEDED & OutputMatches(r'\S')),
+    'check_head_output': (1, lambda path: SUCCEEDED & OutputMatches(r'\S')),
+    'check_tail_output': (1, lambda path: SUCCEEDED & OutputMatches(r'\S')),
+    'check_grep_output': (2, lambda term, path: SUCCEEDED & OutputContains(term, case_flag='-i')),
+    'check_output_contains': (1, lambda text: OutputContains(text)),
+    'check_output_regex': (1, lambda pattern: OutputMatches(pattern)),
+    'check_output_sha256': (1, lambda digest: OutputDigest(digest)),
+    'check_file_contains': (2, lambda path, pattern: FileContains(path, pattern)),
+}
+
+
+def compile_verification(spec) -> Check:
+    """
+    Compile a lesson verification spec into a Check.
+
+    A spec is either a verification string such as 'check_grep_output:Linux:README.txt',
+    a list of specs (all must pass), or a dict with a single 'all', 'any' or
+    'not' key. Unknown names raise ValueError, so a typo in a lesson fails
+    when lessons load instead of passing every attempt.
+    """
+    if isinstance(spec, Check):
+        return spec
+    if not spec:
+        return SUCCEEDED
+    if isinstance(spec, list):
+        return AllOf(*(compile_verification(item) for item in spec))
+    if isinstance(spec, dict):
+        (operator, operand), = spec.items()
+        if operator == 'all':
+            return AllOf(*(compile_verification(item) for item in operand))
+        if operator == 'any':
+            return AnyOf(*(compile_verification(item) for item in operand))
+        if operator == 'not':
+            return Not(compile_verification(operand))
+        raise ValueError(f"Unknown verification operator: {operator}")
+
+    name = spec.split(':', 1)[0]
+    if name not in VERIFICATIONS:
+        raise ValueError(f"Unknown verification: {name}")
+    arg_count, factory = VERIFICATIONS[name]
+    args = spec.split(':', arg_count)[1:]
+    if len(args) != arg_count:
+        raise ValueError(f"Verification '{spec}' expects {arg_count} argument(s)")
+    return factory(*args)
 
-    def cleanup(self):
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
 
 class LinuxTutorial:
     """
@@ -184,39 +863,57 @@ class LinuxTutorial:
     """
 
     def __init__(self):
-        self.setup_tutorial_environment()
+        self.provision_report = []  # Per-phase files/bytes/time of sandbox setup
+        self.provisioned_fixtures = set()
+        self.fixture_template = None  # Prebuilt template path, '' once known to be unusable
+        self.tutorial_temp_dir = None  # Sandbox, created when the first lesson starts
         self.current_lesson = 0
+        self.current_exercise = 0  # Index within the current lesson, for the journal
         self.user_progress = {
             'student_id': None,
             'assignment_key': None,  # Add assignment key tracking
-            'start_time': datetime.datetime.now().isoformat(),
+            'start_time': timestamp(),
             'completed_exercises': [],
             'completion_codes': [],
             'total_exercises': 0
         }
-        self.lessons = self.load_lessons()
+        self._lessons = None  # Loaded and compiled on first use
         self.progress_checkpoint = 5  # Generate code every 5 exercises
         self.exercise_counter = 0
-        self.num_groups = 5  # Default number of groups
+        # Grouping must match the instructor's answer keys (StudentToGroup.py)
+        self.num_groups, self.group_mode = self.grouping_from_environment()
         self.loaded_students = {}  # Store students loaded from file
         self.student_groups = {}   # Store student-to-group mapping
-        self.tutorial_env = TutorialEnvironment()  # Set up tutorial environment
+        self.shell_session = None  # Persistent shell, started on first command
+        self.normalized_commands = {}  # Cache of parsed expected commands
+        self.journal = SessionJournal()
 
-        # Set up tutorial environment for this session
-        self.setup_tutorial_environment()
+    def get_shell_session(self) -> ShellSession:
+        """Return the persistent shell session, starting it in the tutorial directory"""
+        if self.shell_session is None:
+            self.shell_session = ShellSession(cwd=os.getcwd())
+        return self.shell_session
 
     def clear_screen(self):
         """Clear the screen for better readability"""
-        # Clear screen - works on Windows, macOS, and Linux
-        os.system('cls' if os.name == 'nt' else 'clear')
+        # Same sequence `clear` sends (home, clear screen, clear scrollback), without forking it
+        RENDERER.write('\033[H\033[2J\033[3J')
+
+    @property
+    def lessons(self) -> List[Dict[str, Any]]:
+        """Lesson definitions, loaded (and their checks compiled) on first access"""
+        if self._lessons is None:
+            self._lessons = self.load_lessons()
+        return self._lessons
 
     def load_lessons(self) -> List[Dict[str, Any]]:
-        """Load tutorial lessons configuration"""
-        return [
+        """Load tutorial lessons configuration and compile their verifications"""
+        lessons = [
             {
                 "title": "Basic Navigation",
                 "description": "Learn to navigate the file system and analyze file sizes",
                 "commands": ["pwd", "ls", "ls -l", "ls -a", "ls -la", "ls -lh", "cd"],
+                "fixtures": ["practice", "documents"],
                 "exercises": [
                     {
                         "instruction": "Display your current directory",
@@ -284,6 +981,7 @@ class LinuxTutorial:
                 "title": "Document Content Exploration",
                 "description": "Learn to read and search through real document files",
                 "commands": ["cat", "grep", "head", "tail", "wc"],
+                "fixtures": ["practice", "documents"],
                 "exercises": [
                     {
                         "instruction": "Read the contents of the smallest file: cat Documents/small.txt",
@@ -351,6 +1049,7 @@ class LinuxTutorial:
                 "title": "File Operations",
                 "description": "Learn to create, copy, move, and delete files",
                 "commands": ["touch", "cp", "mv", "rm", "ls -l"],
+                "fixtures": ["practice"],
                 "exercises": [
                     {
                         "instruction": "Create a new file called 'test.txt'",
@@ -418,12 +1117,14 @@ class LinuxTutorial:
                 "title": "Text Processing",
                 "description": "Learn to view and process text files",
                 "commands": ["cat", "grep", "head", "tail", "echo", "wc"],
+                "fixtures": ["practice"],
                 "exercises": [
                     {
                         "instruction": "Create a text file with some content using echo command: echo 'Hello Linux World!' > greeting.txt",
                         "command": "echo 'Hello Linux World!' > greeting.txt",
                         "expected_output": None,
-                        "verification": "check_file_exists:greeting.txt"
+                        "verification": ["check_file_exists:greeting.txt",
+                                         "check_file_contains:greeting.txt:^Hello Linux World!$"]
                     },
                     {
                         "instruction": "Display the contents of greeting.txt using cat",
@@ -435,7 +1136,8 @@ class LinuxTutorial:
                         "instruction": "Add more content to the file: echo 'This is line 2' >> greeting.txt",
                         "command": "echo 'This is line 2' >> greeting.txt",
                         "expected_output": None,
-                        "verification": "check_file_exists:greeting.txt"
+                        "verification": {"all": ["check_file_contains:greeting.txt:(?m)^Hello Linux World!$",
+                                                 "check_file_contains:greeting.txt:(?m)^This is line 2$"]}
                     },
                     {
                         "instruction": "Add another line: echo 'Linux commands are powerful' >> greeting.txt",
@@ -485,6 +1187,7 @@ class LinuxTutorial:
                 "title": "Permissions",
                 "description": "Learn about file permissions and ownership",
                 "commands": ["chmod", "ls -l", "stat", "mkdir"],
+                "fixtures": ["practice"],
                 "exercises": [
                     {
                         "instruction": "Create a script file called 'myscript.sh'",
@@ -550,10 +1253,17 @@ class LinuxTutorial:
             }
         ]
 
-    def get_student_group(self, student_id: str) -> int:
-        """Assign student to one of N groups based on their student ID"""
-        group_hash = hash(student_id) % self.num_groups
-        return group_hash + 1  # Groups 1-N instead of 0-(N-1)
+        for lesson in lessons:
+            for exercise in lesson['exercises']:
+                exercise['check'] = compile_verification(exercise.get('verification'))
+        return lessons
+
+    def get_student_group(self, student_id: str, assignment_key: Optional[str] = None) -> int:
+        """Assign student to one of N groups based on their student ID and the assignment key"""
+        # Keyed, stable hash shared with StudentToGroup.py so answer keys agree with the VM
+        from group_hash import student_group
+        return student_group(student_id, assignment_key or self.user_progress['assignment_key'],
+                             self.num_groups, self.group_mode)
 
     def generate_progress_code(self, exercise_count: int) -> str:
         """Generate a 5-character progress code based on student group and assignment key"""
@@ -563,94 +1273,105 @@ class LinuxTutorial:
         # Use assignment key from user progress
         assignment_key = self.user_progress['assignment_key'] or "DEFAULT"
 
-        # Create a seed based on assignment key, group number and exercise count
-        seed_string = f"ASSIGNMENT-{assignment_key}-GROUP{group_number}-{exercise_count}"
-
-        # Convert string to numeric seed
-        seed_value = hash(seed_string) % (2**32)
-
-        # Seed the random number generator
-        random.seed(seed_value)
-
-        # Generate 5-character alphanumeric code
-        characters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
-        progress_code = ''.join(random.choices(characters, k=5))
-
-        return progress_code
+        # Codes are computed once per (group, exercise count) and shared with StudentToGroup.py
+        from group_hash import code_table
+        return code_table(assignment_key).code(group_number, exercise_count)
 
     def setup_tutorial_environment(self):
-        """Set up a fresh tutorial environment for this session"""
+        """Create an empty sandbox directory for this session; fixtures are added per lesson"""
         import tempfile
-        import shutil
-        # Create a new temp directory for each run
+        start = time.monotonic()
         self.tutorial_temp_dir = tempfile.mkdtemp(prefix="linux_tutorial_")
-        # Remove and recreate the temp directory for a fresh start
-        shutil.rmtree(self.tutorial_temp_dir, ignore_errors=True)
-        os.makedirs(self.tutorial_temp_dir, exist_ok=True)
-        # Directory structure
-        dirs = [
-            'practice_dir',
-            'practice_dir/subdir1',
-            'practice_dir/subdir2',
-            'Documents',
-            'projects',
-        ]
-        files = [
-            'practice_dir/file1.txt',
-            'practice_dir/file2.txt',
-            'practice_dir/subdir1/note.txt',
-            'Documents/small.txt',
-            'Documents/project.txt',
-            'Documents/README.txt',
-            'Documents/students.txt',
-            'Documents/commands.txt',
-            'Documents/big1.txt',
-            'Documents/big2.txt',
-            '.hidden_file',
-            'projects/project1.txt',
-        ]
-        for d in dirs:
-            os.makedirs(os.path.join(self.tutorial_temp_dir, d), exist_ok=True)
-        for f in files:
-            file_path = os.path.join(self.tutorial_temp_dir, f)
-            with open(file_path, 'w') as fp:
-                # Custom content for required files
-                if f == 'Documents/small.txt':
-                    fp.write("Hello!\n")
-                elif f == 'Documents/project.txt':
-                    fp.write("Project: Linux Tutorial\nThis project helps students learn Linux.\nIt covers navigation, file operations, and more.\nLine 4: Example\nLine 5: End of preview.\n")
-                elif f == 'Documents/README.txt':
-                    fp.write("Welcome to the Linux Tutorial!\nThis README describes the tutorial.\nLinux is a powerful operating system.\n")
-                elif f == 'Documents/students.txt':
-                    fp.write("Alice Johnson\nBob Smith\nCharlie Computer\nDana Lee\n")
-                elif f == 'Documents/commands.txt':
-                    fp.write("ls\ncd\npwd\ncat\ngrep\nhead\ntail\nwc\nchmod\n")
-                elif f == 'Documents/big1.txt':
-                    fp.write("A" * 1024 * 100 + "\n")  # ~100 KB
-                elif f == 'Documents/big2.txt':
-                    fp.write("B" * 1024 * 300 + "\n")  # ~300 KB
-                elif f == '.hidden_file':
-                    fp.write("This is a hidden file.\nIt contains secret tutorial info.\nDo not delete!\n")
-                elif f.endswith('.txt'):
-                    fp.write(f"This is {f}\n")
-                elif f.endswith('.md'):
-                    fp.write(f"# {f}\n")
-                else:
-                    fp.write(f"{f}\n")
+        self.provisioned_fixtures = set()
         # Change working directory to the tutorial temp dir
         os.chdir(self.tutorial_temp_dir)
+        self.record_provision_phase('sandbox', 0, 0, start)
+
+    def provision_lesson(self, lesson: Dict[str, Any]):
+        """Materialize the fixture groups a lesson needs, skipping any already written"""
+        if self.tutorial_temp_dir is None:
+            self.setup_tutorial_environment()
+        for group_name in lesson.get('fixtures', []):
+            if group_name not in self.provisioned_fixtures:
+                self.provision_fixture_group(group_name)
+
+    def provision_fixture_group(self, group_name: str):
+        """
+        Materialize one fixture group into the sandbox.
+
+        Files are reflinked from the prebuilt template when it is present and
+        its recorded manifest hash matches, so only metadata is written. On a
+        filesystem without reflinks the template is dropped for the session
+        and files are generated from FIXTURE_MANIFEST, which writes each file
+        once (a copy would read the template as well).
+        """
+        start = time.monotonic()
+        group = FIXTURE_MANIFEST[group_name]
+        bytes_written = 0
+        methods = set()
+
+        if self.fixture_template is None:
+            self.fixture_template = find_fixture_template() or ''
+
+        for d in group['dirs']:
+            os.makedirs(os.path.join(self.tutorial_temp_dir, d), exist_ok=True)
+
+        for f, content in group['files'].items():
+            file_path = os.path.join(self.tutorial_temp_dir, f)
+            if self.fixture_template:
+                source = os.path.join(self.fixture_template, group_name, f)
+                try:
+                    # Sizes are a stat away; a truncated template file is never cloned
+                    if os.stat(source).st_size == fixture_size(content):
+                        if clone_file(source, file_path):
+                            methods.add('reflink')
+                            continue
+                        self.fixture_template = ''  # No reflinks here: stop trying for this session
+                except OSError:
+                    pass
+            bytes_written += write_fixture_file(file_path, content)
+            methods.add('write')
+
+        self.provisioned_fixtures.add(group_name)
+        self.record_provision_phase(f"fixtures:{group_name} ({'+'.join(sorted(methods))})",
+                                    len(group['files']), bytes_written, start)
+
+    def record_provision_phase(self, phase: str, files: int, bytes_written: int, start: float):
+        """Record one sandbox setup phase for the provisioning report"""
+        self.provision_report.append({
+            'phase': phase,
+            'files': files,
+            'bytes': bytes_written,
+            'seconds': time.monotonic() - start
+        })
+
+    def show_provision_report(self):
+        """Display files, bytes written and elapsed time per provisioning phase"""
+        with RENDERER.screen():
+            print("\n📦 SANDBOX PROVISIONING REPORT:")
+            print("=" * 64)
+            print(f"{'Phase':<36}{'Files':>6}{'Bytes':>12}{'Time':>10}")
+            for entry in self.provision_report:
+                print(f"{entry['phase']:<36}{entry['files']:>6}{entry['bytes']:>12,}{entry['seconds'] * 1000:>8.1f}ms")
+            total_bytes = sum(entry['bytes'] for entry in self.provision_report)
+            total_time = sum(entry['seconds'] for entry in self.provision_report)
+            print("-" * 64)
+            print(f"{'Total':<36}{'':>6}{total_bytes:>12,}{total_time * 1000:>8.1f}ms")
+            print("=" * 64)
 
     def cleanup_tutorial_environment(self):
         """Clean up the tutorial environment (remove temp directory)"""
-        import shutil
-        shutil.rmtree(self.tutorial_temp_dir, ignore_errors=True)
+        if self.tutorial_temp_dir:
+            import shutil
+            shutil.rmtree(self.tutorial_temp_dir, ignore_errors=True)
 
     def setup_student_session(self):
         """Set up student identification and session"""
-        clear_screen_completely()
-        print_white_bg("🆔   STUDENT IDENTIFICATION")
-        print_white_bg("=" * 40)
-        print_white_bg("Please enter your student information:")
+        with RENDERER.screen():
+            clear_screen_completely()
+            print_white_bg("🆔   STUDENT IDENTIFICATION")
+            print_white_bg("=" * 40)
+            print_white_bg("Please enter your student information:")
 
         # Get student ID
         while True:
@@ -665,13 +1386,16 @@ class LinuxTutorial:
         if student_name:
             self.user_progress['student_name'] = student_name
 
-        # Show session info
-        group_number = self.get_student_group(student_id)
+        # A new session replaces whatever the journal held
+        self.journal.reset()
+        self.journal.append('session', sync=True, student_id=student_id,
+                            student_name=student_name or None,
+                            start_time=self.user_progress['start_time'])
 
+        # Show session info (the group depends on the assignment key, so it is shown once that is entered)
         print_white_bg(f"\n✅  Session started for: {student_id}")
         if student_name:
             print_white_bg(f"   Name: {student_name}")
-        print_white_bg(f"   Assigned to Group: {group_number}")
         print_white_bg(f"   Start time: {self.user_progress['start_time']}")
         print_white_bg()
         print_white_bg("ℹ️   Note: You'll be asked for assignment keys for each lesson/tutorial.")
@@ -691,35 +1415,48 @@ class LinuxTutorial:
             'exercise_count': self.exercise_counter,
             'assignment_key': self.user_progress['assignment_key'],
             'group_number': self.get_student_group(self.user_progress['student_id']),
-            'timestamp': datetime.datetime.now().isoformat(),
+            'timestamp': timestamp(),
             'lesson_progress': f"{self.current_lesson + 1}/{len(self.lessons)}"
         }
         self.user_progress['completion_codes'].append(code_entry)
+        self.journal.append('code', sync=True, entry=code_entry)
 
         # Display the code prominently
-        print("\n" + "🎯" * 20)
-        print("📊  PROGRESS CHECKPOINT REACHED!")
-        print("🎯" * 20)
-        print(f"Exercises completed: {self.exercise_counter}")
-        print(f"Current lesson: {self.current_lesson + 1}/{len(self.lessons)}")
-        print(f"Assignment: {self.user_progress['assignment_key']}")
-        print()
-        print("📝  ENTER THIS CODE IN CANVAS:")
-        print("=" * 40)
-        print(f"         {code}")
-        print("=" * 40)
-        print("⚠️  Important: Copy this code and enter it into ")
-        print("   the correct assignment in CANVAS to record your progress.")
-        print()
+        with RENDERER.screen():
+            print("\n" + "🎯" * 20)
+            print("📊  PROGRESS CHECKPOINT REACHED!")
+            print("🎯" * 20)
+            print(f"Exercises completed: {self.exercise_counter}")
+            print(f"Current lesson: {self.current_lesson + 1}/{len(self.lessons)}")
+            print(f"Assignment: {self.user_progress['assignment_key']}")
+            print()
+            print("📝  ENTER THIS CODE IN CANVAS:")
+            print("=" * 40)
+            print(f"         {code}")
+            print("=" * 40)
+            print("⚠️  Important: Copy this code and enter it into ")
+            print("   the correct assignment in CANVAS to record your progress.")
+            print()
         input("Press Enter after you've recorded the code to continue...")
         print("🎯" * 20)
         print()
 
     def start_tutorial(self):
         """Start the interactive tutorial with main menu"""
-        self.setup_student_session()
+        run = self.resume_session()
+        if run is None:
+            self.setup_student_session()
+        # Installed after the first prompt to keep `signal` off the startup path
+        RENDERER.watch_resize()
         self.display_welcome()
 
+        # Finish the interrupted run before showing the menu
+        if run is not None:
+            if run['mode'] == 'all':
+                self.run_all_lessons(resume=run)
+                return
+            self.run_single_lesson(run['position'][0], resume=run)
+
         # Main menu loop
         while True:
             choice = self.display_main_menu()
@@ -739,24 +1476,60 @@ class LinuxTutorial:
             else:
                 print_white_bg("❌  Invalid choice. Please try again.")
 
+    def resume_session(self) -> Optional[Dict[str, Any]]:
+        """Offer to continue an unfinished run found in the session journal"""
+        state = self.journal.load()
+        run = state['run']
+        if run is None:
+            return None
+        progress = state['user_progress']
+        lesson_index, exercise_index = run['position']
+        if not 0 <= lesson_index < len(self.lessons):
+            return None
+        lesson = self.lessons[lesson_index]
+
+        with RENDERER.screen():
+            clear_screen_completely()
+            print_white_bg("💾  UNFINISHED SESSION FOUND")
+            print_white_bg("=" * 40)
+            print_white_bg(f"Student ID: {progress['student_id']}")
+            print_white_bg(f"Assignment: {progress['assignment_key']}")
+            if exercise_index < len(lesson['exercises']):
+                print_white_bg(f"Resume at: {lesson['title']}, exercise {exercise_index + 1}")
+            else:
+                print_white_bg(f"Resume after: {lesson['title']}")
+            print_white_bg(f"Exercises completed: {run['exercise_counter']}/{progress['total_exercises']}")
+            print_white_bg()
+        choice = input("Resume where you left off? (y/n): ").strip().lower()
+        if choice != 'y':
+            return None
+
+        import copy
+        # The journal keeps folding new records into its own copy
+        self.user_progress = copy.deepcopy(progress)
+        self.exercise_counter = run['exercise_counter']
+        print_white_bg(f"\n✅  Welcome back, {progress.get('student_name') or progress['student_id']}!")
+        return run
+
     def display_main_menu(self):
         """Display the main menu and get user choice"""
-        print_white_bg("\n" + "=" * 60)
-        print_white_bg("🎯  LINUX TUTORIAL - MAIN MENU")
-        print_white_bg("=" * 60)
-        print_white_bg("Choose what you'd like to do:")
-        print_white_bg()
-        print_white_bg("📚  Available Lessons:")
-        for i, lesson in enumerate(self.lessons, 1):
-            exercise_count = len(lesson['exercises'])
-            print_white_bg(f"  {i}. {lesson['title']} ({exercise_count} exercises)")
-            print_white_bg(f"     {lesson['description']}")
-        print_white_bg()
-        print_white_bg("🎯  Options:")
-        print_white_bg("  all  - Complete all lessons in sequence")
-        print_white_bg("  1-4  - Choose a specific lesson number")
-        print_white_bg("  quit - Exit the tutorial")
-        print_white_bg()
+        with RENDERER.screen():
+            print_white_bg("\n" + "=" * 60)
+            print_white_bg("🎯  LINUX TUTORIAL - MAIN MENU")
+            print_white_bg("=" * 60)
+            print_white_bg("Choose what you'd like to do:")
+            print_white_bg()
+            print_white_bg("📚  Available Lessons:")
+            for i, lesson in enumerate(self.lessons, 1):
+                exercise_count = len(lesson['exercises'])
+                print_white_bg(f"  {i}. {lesson['title']} ({exercise_count} exercises)")
+                print_white_bg(f"     {lesson['description']}")
+            print_white_bg()
+            print_white_bg("🎯  Options:")
+            print_white_bg("  all  - Complete all lessons in sequence")
+            print_white_bg("  1-4  - Choose a specific lesson number")
+            print_white_bg("  quit - Exit the tutorial")
+            print_white_bg()
 
         while True:
             choice = input("Enter your choice: ").strip().lower()
@@ -764,54 +1537,75 @@ class LinuxTutorial:
                 return choice
             print_white_bg("❌  Please enter 'all', a lesson number (1-4), or 'quit'")
 
-    def run_all_lessons(self):
-        """Run all lessons in sequence"""
+    def run_all_lessons(self, resume: Optional[Dict[str, Any]] = None):
+        """Run all lessons in sequence, or continue a journaled run"""
         # Clear screen for better focus
         self.clear_screen()
 
-        print_white_bg("🚀  Starting complete tutorial...")
+        if resume is None:
+            print_white_bg("🚀  Starting complete tutorial...")
 
-        # Ask for assignment key once for all lessons
-        assignment_key = self.get_assignment_key("Complete Tutorial")
-        self.user_progress['assignment_key'] = assignment_key
+            # Ask for assignment key once for all lessons
+            assignment_key = self.get_assignment_key("Complete Tutorial")
+            self.user_progress['assignment_key'] = assignment_key
 
-        # Count total exercises for progress tracking
-        self.user_progress['total_exercises'] = sum(len(lesson['exercises']) for lesson in self.lessons)
-        self.user_progress['completion_codes'] = []  # Reset codes for this session
+            # Count total exercises for progress tracking
+            self.user_progress['total_exercises'] = sum(len(lesson['exercises']) for lesson in self.lessons)
+            self.user_progress['completion_codes'] = []  # Reset codes for this session
 
-        # Reset counters
-        self.current_lesson = 0
-        self.exercise_counter = 0
+            # Reset counters
+            self.current_lesson = 0
+            self.exercise_counter = 0
+            start_exercise, replay = 0, []
+            self.journal.append('run', sync=True, mode='all', lesson=0,
+                                assignment_key=assignment_key,
+                                total_exercises=self.user_progress['total_exercises'])
+        else:
+            print_white_bg("🚀  Continuing complete tutorial...")
+            self.current_lesson, start_exercise = resume['position']
+            replay = resume['commands']
+            if start_exercise >= len(self.lessons[self.current_lesson]['exercises']):
+                self.current_lesson += 1
+                start_exercise, replay = 0, []
 
         while self.current_lesson < len(self.lessons):
             lesson = self.lessons[self.current_lesson]
-            if self.run_lesson(lesson):
+            if self.run_lesson(lesson, start_exercise, replay):
                 self.current_lesson += 1
+                start_exercise, replay = 0, []
             else:
                 break
 
         self.display_completion()
 
-    def run_single_lesson(self, lesson_index):
-        """Run a single lesson"""
+    def run_single_lesson(self, lesson_index, resume: Optional[Dict[str, Any]] = None):
+        """Run a single lesson, or continue a journaled one"""
         lesson = self.lessons[lesson_index]
 
         # Clear screen for better focus
         self.clear_screen()
-
-        print_white_bg(f"🎯  Starting lesson: {lesson['title']}")
-
-        # Ask for assignment key for this specific lesson
-        assignment_key = self.get_assignment_key(lesson['title'])
-        self.user_progress['assignment_key'] = assignment_key
-
-        # Set up progress tracking for single lesson (reset for this session)
-        self.user_progress['total_exercises'] = len(lesson['exercises'])
-        self.user_progress['completion_codes'] = []  # Reset codes for this lesson
         self.current_lesson = lesson_index
-        self.exercise_counter = 0
 
-        if self.run_lesson(lesson):
+        if resume is None:
+            print_white_bg(f"🎯  Starting lesson: {lesson['title']}")
+
+            # Ask for assignment key for this specific lesson
+            assignment_key = self.get_assignment_key(lesson['title'])
+            self.user_progress['assignment_key'] = assignment_key
+
+            # Set up progress tracking for single lesson (reset for this session)
+            self.user_progress['total_exercises'] = len(lesson['exercises'])
+            self.user_progress['completion_codes'] = []  # Reset codes for this lesson
+            self.exercise_counter = 0
+            start_exercise, replay = 0, []
+            self.journal.append('run', sync=True, mode='lesson', lesson=lesson_index,
+                                assignment_key=assignment_key,
+                                total_exercises=self.user_progress['total_exercises'])
+        else:
+            print_white_bg(f"🎯  Continuing lesson: {lesson['title']}")
+            start_exercise, replay = resume['position'][1], resume['commands']
+
+        if self.run_lesson(lesson, start_exercise, replay):
             self.display_lesson_completion(lesson)
 
         # Ask if they want to continue with another lesson
@@ -827,6 +1621,8 @@ class LinuxTutorial:
         while True:
             assignment_key = input("Enter the assignment key provided by your instructor: ").strip()
             if assignment_key:
+                group_number = self.get_student_group(self.user_progress['student_id'], assignment_key)
+                print_white_bg(f"✅  Assigned to Group: {group_number}")
                 return assignment_key
             print_white_bg("❌  Please enter a valid assignment key.")
 
@@ -839,68 +1635,82 @@ class LinuxTutorial:
             'exercise_count': self.exercise_counter,
             'assignment_key': self.user_progress['assignment_key'],
             'group_number': self.get_student_group(self.user_progress['student_id']),
-            'timestamp': datetime.datetime.now().isoformat(),
+            'timestamp': timestamp(),
             'lesson_progress': f'LESSON_COMPLETED: {lesson["title"]}',
             'type': 'LESSON_COMPLETION'
         }
         self.user_progress['completion_codes'].append(final_code_entry)
+        self.journal.append('code', entry=final_code_entry)
+        self.journal.append('run_end')
+
+        with RENDERER.screen():
+            print_white_bg("\n" + "=" * 60)
+            print_white_bg(f"🎉  LESSON COMPLETED: {lesson['title']} 🎉")
+            print_white_bg("=" * 60)
+            print_white_bg(f"✅  You completed {self.exercise_counter} exercises!")
+            print_white_bg()
+            print_white_bg("🏆  LESSON COMPLETION CODE:")
+            print_white_bg("=" * 40)
+            print_white_bg(f"         {final_code}")
+            print_white_bg("=" * 40)
+            print_white_bg("📝  Enter this code in Canvas for this lesson!")
+            print_white_bg()
+
+            # Show progress codes if any checkpoints were reached
+            if len(self.user_progress['completion_codes']) > 1:
+                print_white_bg("📊  All your progress codes for this lesson:")
+                for i, code_entry in enumerate(self.user_progress['completion_codes'], 1):
+                    if code_entry.get('type') == 'LESSON_COMPLETION':
+                        print_white_bg(f"  {i}. {code_entry['code']} - LESSON COMPLETION")
+                    else:
+                        print_white_bg(f"  {i}. {code_entry['code']} - CHECKPOINT ({code_entry['exercise_count']} exercises)")
 
-        print_white_bg("\n" + "=" * 60)
-        print_white_bg(f"🎉  LESSON COMPLETED: {lesson['title']} 🎉")
-        print_white_bg("=" * 60)
-        print_white_bg(f"✅  You completed {self.exercise_counter} exercises!")
-        print_white_bg()
-        print_white_bg("🏆  LESSON COMPLETION CODE:")
-        print_white_bg("=" * 40)
-        print_white_bg(f"         {final_code}")
-        print_white_bg("=" * 40)
-        print_white_bg("📝  Enter this code in Canvas for this lesson!")
-        print_white_bg()
-
-        # Show progress codes if any checkpoints were reached
-        if len(self.user_progress['completion_codes']) > 1:
-            print_white_bg("📊  All your progress codes for this lesson:")
-            for i, code_entry in enumerate(self.user_progress['completion_codes'], 1):
-                if code_entry.get('type') == 'LESSON_COMPLETION':
-                    print_white_bg(f"  {i}. {code_entry['code']} - LESSON COMPLETION")
-                else:
-                    print_white_bg(f"  {i}. {code_entry['code']} - CHECKPOINT ({code_entry['exercise_count']} exercises)")
-
-        print_white_bg("=" * 60)
+            print_white_bg("=" * 60)
 
     def display_welcome(self):
         """Display welcome message and tutorial overview"""
-        print_white_bg("=" * 60)
-        print_white_bg("🐧  WELCOME TO LINUX COMMAND TUTORIAL  🐧")
-        print_white_bg("=" * 60)
-        print_white_bg()
-        print_white_bg("This interactive tutorial teaches essential Linux commands through")
-        print_white_bg("hands-on exercises. You can choose to:")
-        print_white_bg()
-        print_white_bg("🎯  Complete all lessons in sequence, OR")
-        print_white_bg("🎯  Work on individual lessons as assigned")
-        print_white_bg()
-        print_white_bg("💡  Each lesson or complete tutorial requires its own assignment key")
-        print_white_bg("💡  You'll receive progress codes to submit in Canvas")
-        print_white_bg("💡  Progress codes are generated every 5 exercises")
-        print()
+        with RENDERER.screen():
+            print_white_bg("=" * 60)
+            print_white_bg("🐧  WELCOME TO LINUX COMMAND TUTORIAL  🐧")
+            print_white_bg("=" * 60)
+            print_white_bg()
+            print_white_bg("This interactive tutorial teaches essential Linux commands through")
+            print_white_bg("hands-on exercises. You can choose to:")
+            print_white_bg()
+            print_white_bg("🎯  Complete all lessons in sequence, OR")
+            print_white_bg("🎯  Work on individual lessons as assigned")
+            print_white_bg()
+            print_white_bg("💡  Each lesson or complete tutorial requires its own assignment key")
+            print_white_bg("💡  You'll receive progress codes to submit in Canvas")
+            print_white_bg("💡  Progress codes are generated every 5 exercises")
+            print()
+
+    def run_lesson(self, lesson: Dict[str, Any], start_exercise: int = 0, replay: List[str] = ()) -> bool:
+        """Run a single lesson, starting at `start_exercise` when resuming"""
+        # Write this lesson's practice files only now that it is starting
+        self.provision_lesson(lesson)
+        # Redo the commands already accepted in this lesson so later exercises find their files
+        if replay:
+            self.replay_commands(replay)
 
-    def run_lesson(self, lesson: Dict[str, Any]) -> bool:
-        """Run a single lesson"""
         # Clear screen for better focus
         self.clear_screen()
 
-        print(f"📚  LESSON: {lesson['title']}")
-        print("=" * 50)
-        print(f"Description: {lesson['description']}")
-        print(f"Commands you'll learn: {', '.join(lesson['commands'])}")
-        print()
+        with RENDERER.screen():
+            print(f"📚  LESSON: {lesson['title']}")
+            print("=" * 50)
+            print(f"Description: {lesson['description']}")
+            print(f"Commands you'll learn: {', '.join(lesson['commands'])}")
+            print()
 
-        # Show command explanations
-        self.explain_commands(lesson['commands'], lesson['title'])
+            # Show command explanations
+            self.explain_commands(lesson['commands'], lesson['title'])
 
         # Run exercises
         for i, exercise in enumerate(lesson['exercises'], 1):
+            if i <= start_exercise:
+                continue
+            self.current_exercise = i - 1
             print(f"\n🔧 Exercise {i}:")
             if not self.run_exercise(exercise):
                 return False
@@ -909,107 +1719,120 @@ class LinuxTutorial:
         print("=" * 50)
         return True
 
+    def replay_commands(self, commands: List[str]):
+        """Silently re-run previously accepted commands in the sandbox shell"""
+        session = self.get_shell_session()
+        for command in commands:
+            try:
+                result = session.run(command, timeout=10)
+            except Exception:
+                continue
+            if result.cwd and os.path.isdir(result.cwd):
+                os.chdir(result.cwd)
+
     def explain_commands(self, commands: List[str], lesson_title: str = ""):
         """Explain what each command does"""
-        explanations = {
-            "pwd": "pwd - Print Working Directory (shows current location)",
-            "ls": "ls - List directory contents (basic view)",
-            "ls -l": "ls -l - List files with detailed information (permissions, owner, size, date)",
-            "ls -a": "ls -a - List all files including hidden files (starting with .)",
-            "ls -la": "ls -la - Combination: all files with detailed information",
-            "ls -h": "ls -h - Human readable file sizes (use with -l)",
-            "ls -t": "ls -t - Sort by modification time (newest first)",
-            "ls -r": "ls -r - Reverse the order of the sort",
-            "cd": "cd - Change Directory (navigate to different folders)",
-            "touch": "touch - Create empty files or update timestamps",
-            "cp": "cp - Copy files or directories",
-            "mv": "mv - Move/rename files or directories",
-            "rm": "rm - Remove/delete files or directories",
-            "cat": "cat - Display file contents",
-            "grep": "grep - Search for patterns in files",
-            "head": "head - Display first lines of a file",
-            "tail": "tail - Display last lines of a file",
-            "echo": "echo - Display text or write text to files",
-            "wc": "wc - Word, line, character, and byte count",
-            "chmod": "chmod - Change file permissions",
-            "chown": "chown - Change file ownership",
-            "mkdir": "mkdir - Create directories",
-            "stat": "stat - Display detailed file information"
-        }
-
-        print("📖  Command Reference:")
-        for cmd in commands:
-            if cmd in explanations:
-                print(f"  • {explanations[cmd]}")
-
-        # Add special explanation for ls commands (only for Basic Navigation lesson)
-        if lesson_title == "Basic Navigation" and any(cmd.startswith('ls') for cmd in commands):
-            print("\n📋  Understanding ls -l output:")
-            print("  Example: -rw-r--r-- 1 user group 1024 Jan 15 10:30 filename.txt")
-            print("           │││││││││ │ │    │     │    │        │")
-            print("           │││││││││ │ │    │     │    │        └── filename")
-            print("           │││││││││ │ │    │     │    └─────────── date/time")
-            print("           │││││││││ │ │    │     └───────────────── size (bytes)")
-            print("           │││││││││ └─────────────────────────────── group")
-            print("           ││││││││└───────────────────────────────── owner")
-            print("           │││││└──────────────────────────────────── link count")
-            print("           └┴┴┴┴┴┴┴┴───────────────────────────────── permissions")
-            print("            │ │ │ │")
-            print("            │ │ │ └── other permissions (r=read, w=write, x=execute)")
-            print("            │ │ └──── group permissions")
-            print("            │ └────── owner permissions")
-            print("            └──────── file type (- = file, d = directory, l = link)")
-            print()
+        # Compose the whole reference screen and send it in one write
+        with RENDERER.screen():
+            explanations = {
+                "pwd": "pwd - Print Working Directory (shows current location)",
+                "ls": "ls - List directory contents (basic view)",
+                "ls -l": "ls -l - List files with detailed information (permissions, owner, size, date)",
+                "ls -a": "ls -a - List all files including hidden files (starting with .)",
+                "ls -la": "ls -la - Combination: all files with detailed information",
+                "ls -h": "ls -h - Human readable file sizes (use with -l)",
+                "ls -t": "ls -t - Sort by modification time (newest first)",
+                "ls -r": "ls -r - Reverse the order of the sort",
+                "cd": "cd - Change Directory (navigate to different folders)",
+                "touch": "touch - Create empty files or update timestamps",
+                "cp": "cp - Copy files or directories",
+                "mv": "mv - Move/rename files or directories",
+                "rm": "rm - Remove/delete files or directories",
+                "cat": "cat - Display file contents",
+                "grep": "grep - Search for patterns in files",
+                "head": "head - Display first lines of a file",
+                "tail": "tail - Display last lines of a file",
+                "echo": "echo - Display text or write text to files",
+                "wc": "wc - Word, line, character, and byte count",
+                "chmod": "chmod - Change file permissions",
+                "chown": "chown - Change file ownership",
+                "mkdir": "mkdir - Create directories",
+                "stat": "stat - Display detailed file information"
+            }
 
-            print("🔍  Common ls options:")
-            print("  • ls -l    : Long format (detailed info)")
-            print("  • ls -a    : Show hidden files (.filename)")
-            print("  • ls -h    : Human readable sizes (KB, MB, GB)")
-            print("  • ls -t    : Sort by time (newest first)")
-            print("  • ls -r    : Reverse order")
-            print("  • ls -S    : Sort by file size")
-            print("  • ls -R    : Recursive (show subdirectories)")
-            print("  • ls *.txt : List only .txt files (wildcards)")
-
-        # Add help for echo commands
-        if any('echo' in cmd for cmd in commands):
-            print("\n📝  Echo command tips:")
-            print("  • echo 'text' > file   : Write text to file (overwrites)")
-            print("  • echo 'text' >> file  : Append text to file")
-            print("  • echo $USER           : Display environment variables")
-            print("  • echo 'Hello World'   : Display text to screen")
-
-        # Add help for chmod commands
-        if any('chmod' in cmd for cmd in commands):
-            print("\n🔐  File Permission Basics:")
-            print("  • r (read)    = 4")
-            print("  • w (write)   = 2")
-            print("  • x (execute) = 1")
+            print("📖  Command Reference:")
+            for cmd in commands:
+                if cmd in explanations:
+                    print(f"  • {explanations[cmd]}")
+
+            # Add special explanation for ls commands (only for Basic Navigation lesson)
+            if lesson_title == "Basic Navigation" and any(cmd.startswith('ls') for cmd in commands):
+                print("\n📋  Understanding ls -l output:")
+                print("  Example: -rw-r--r-- 1 user group 1024 Jan 15 10:30 filename.txt")
+                print("           │││││││││ │ │    │     │    │        │")
+                print("           │││││││││ │ │    │     │    │        └── filename")
+                print("           │││││││││ │ │    │     │    └─────────── date/time")
+                print("           │││││││││ │ │    │     └───────────────── size (bytes)")
+                print("           │││││││││ └─────────────────────────────── group")
+                print("           ││││││││└───────────────────────────────── owner")
+                print("           │││││└──────────────────────────────────── link count")
+                print("           └┴┴┴┴┴┴┴┴───────────────────────────────── permissions")
+                print("            │ │ │ │")
+                print("            │ │ │ └── other permissions (r=read, w=write, x=execute)")
+                print("            │ │ └──── group permissions")
+                print("            │ └────── owner permissions")
+                print("            └──────── file type (- = file, d = directory, l = link)")
+                print()
+
+                print("🔍  Common ls options:")
+                print("  • ls -l    : Long format (detailed info)")
+                print("  • ls -a    : Show hidden files (.filename)")
+                print("  • ls -h    : Human readable sizes (KB, MB, GB)")
+                print("  • ls -t    : Sort by time (newest first)")
+                print("  • ls -r    : Reverse order")
+                print("  • ls -S    : Sort by file size")
+                print("  • ls -R    : Recursive (show subdirectories)")
+                print("  • ls *.txt : List only .txt files (wildcards)")
+
+            # Add help for echo commands
+            if any('echo' in cmd for cmd in commands):
+                print("\n📝  Echo command tips:")
+                print("  • echo 'text' > file   : Write text to file (overwrites)")
+                print("  • echo 'text' >> file  : Append text to file")
+                print("  • echo $USER           : Display environment variables")
+                print("  • echo 'Hello World'   : Display text to screen")
+
+            # Add help for chmod commands
+            if any('chmod' in cmd for cmd in commands):
+                print("\n🔐  File Permission Basics:")
+                print("  • r (read)    = 4")
+                print("  • w (write)   = 2")
+                print("  • x (execute) = 1")
+                print()
+                print("  Permission Examples:")
+                print("  • 755 = rwxr-xr-x (owner: rwx, group: r-x, others: r-x)")
+                print("  • 644 = rw-r--r-- (owner: rw-, group: r--, others: r--)")
+                print("  • 600 = rw------- (owner: rw-, group: ---, others: ---)")
+                print()
+                print("  Common chmod commands:")
+                print("  • chmod u+x file    : Add execute permission for owner")
+                print("  • chmod g-w file    : Remove write permission for group")
+                print("  • chmod o+r file    : Add read permission for others")
+                print("  • chmod 755 file    : Set specific permissions with numbers")
+
+            # Add help for text processing commands
+            if any(cmd in ['cat', 'grep', 'head', 'tail', 'wc'] for cmd in commands):
+                print("\n📄  Text Processing Tips:")
+                print("  • cat file.txt        : Display entire file")
+                print("  • head -n 5 file.txt  : Show first 5 lines")
+                print("  • tail -n 3 file.txt  : Show last 3 lines")
+                print("  • grep 'word' file.txt: Search for 'word' in file")
+                print("  • grep -i 'word' file : Case-insensitive search")
+                print("  • grep -n 'word' file : Show line numbers with matches")
+                print("  • wc -l file.txt      : Count lines in file")
+                print("  • wc -w file.txt      : Count words in file")
+                print("  • wc -c file.txt      : Count characters in file")
             print()
-            print("  Permission Examples:")
-            print("  • 755 = rwxr-xr-x (owner: rwx, group: r-x, others: r-x)")
-            print("  • 644 = rw-r--r-- (owner: rw-, group: r--, others: r--)")
-            print("  • 600 = rw------- (owner: rw-, group: ---, others: ---)")
-            print()
-            print("  Common chmod commands:")
-            print("  • chmod u+x file    : Add execute permission for owner")
-            print("  • chmod g-w file    : Remove write permission for group")
-            print("  • chmod o+r file    : Add read permission for others")
-            print("  • chmod 755 file    : Set specific permissions with numbers")
-
-        # Add help for text processing commands
-        if any(cmd in ['cat', 'grep', 'head', 'tail', 'wc'] for cmd in commands):
-            print("\n📄  Text Processing Tips:")
-            print("  • cat file.txt        : Display entire file")
-            print("  • head -n 5 file.txt  : Show first 5 lines")
-            print("  • tail -n 3 file.txt  : Show last 3 lines")
-            print("  • grep 'word' file.txt: Search for 'word' in file")
-            print("  • grep -i 'word' file : Case-insensitive search")
-            print("  • grep -n 'word' file : Show line numbers with matches")
-            print("  • wc -l file.txt      : Count lines in file")
-            print("  • wc -w file.txt      : Count words in file")
-            print("  • wc -c file.txt      : Count characters in file")
-        print()
 
     def read_student_list(self, filename: str) -> List[str]:
         """Read student list from file (one email per line)"""
@@ -1032,19 +1855,8 @@ class LinuxTutorial:
         if not students:
             return
 
-        # Organize students by group
-        groups = {f'Group {chr(65 + i)}': [] for i in range(self.num_groups)}
-        student_to_group = {}
-
-        for student in students:
-            group_num = self.get_student_group(student)
-            group_name = f'Group {chr(65 + group_num - 1)}'
-            groups[group_name].append(student)
-            student_to_group[student] = group_name
-
-        # Store in instance variables for later use
-        self.loaded_students = groups
-        self.student_groups = student_to_group
+        # Organize students by group and store them for later use
+        groups = self.group_loaded_students(students, self.user_progress['assignment_key'])
 
         # Find the maximum number of students in any group (for CSV columns)
         max_students = max(len(group_students) for group_students in groups.values()) if groups else 0
@@ -1082,6 +1894,69 @@ class LinuxTutorial:
         print(f"Total: {len(students)} students")
         print("\n✅  Students loaded into memory for answer key generation")
 
+    def group_loaded_students(self, students: List[str], assignment_key: Optional[str]) -> Dict[str, List[str]]:
+        """Group a roster in one pass and store it as the loaded students"""
+        from group_hash import assign_groups
+        groups = {f'Group {chr(65 + i)}': [] for i in range(self.num_groups)}
+        student_to_group = {}
+
+        for student, group_num in assign_groups(students, assignment_key, self.num_groups, self.group_mode).items():
+            group_name = f'Group {chr(65 + group_num - 1)}'
+            groups[group_name].append(student)
+            student_to_group[student] = group_name
+
+        self.loaded_students = groups
+        self.student_groups = student_to_group
+        return groups
+
+    @staticmethod
+    def grouping_from_environment() -> tuple:
+        """
+        Group count and mode from TUTORIAL_NUM_GROUPS and TUTORIAL_GROUP_MODE.
+        Invalid values are reported and replaced by the defaults (5, modulo)
+        so a typo in the VM image cannot stop the tutorial from starting.
+        """
+        num_groups, group_mode = 5, 'modulo'
+        value = os.environ.get('TUTORIAL_NUM_GROUPS', '').strip()
+        if value:
+            if value.isdigit() and 2 <= int(value) <= 26:
+                num_groups = int(value)
+            else:
+                print(f"⚠️  Ignoring TUTORIAL_NUM_GROUPS={value!r} (must be 2-26); using {num_groups} groups")
+        value = os.environ.get('TUTORIAL_GROUP_MODE', '').strip()
+        if value:
+            if value in ('modulo', 'jump'):
+                group_mode = value
+            else:
+                print(f"⚠️  Ignoring TUTORIAL_GROUP_MODE={value!r} (must be modulo or jump); using {group_mode}")
+        return num_groups, group_mode
+
+    def set_groups(self, num_groups: int, group_mode: str):
+        """Change the group count/mode, regrouping loaded students and reporting who moved"""
+        from group_hash import moved_students
+        students = list(self.student_groups)
+        if students:
+            # Loaded groups may be keyed on another assignment (generate_keys):
+            # compare against the old grouping under the key used below
+            self.group_loaded_students(students, self.user_progress['assignment_key'])
+        before = {student: ord(group_name.split()[1]) - 64 for student, group_name in self.student_groups.items()}
+        self.num_groups = num_groups
+        self.group_mode = group_mode
+        print(f"✅  Set to {num_groups} groups ({group_mode} hashing)")
+        if not before:
+            return
+
+        # Regroup the loaded roster instead of discarding it
+        self.group_loaded_students(students, self.user_progress['assignment_key'])
+        after = {student: ord(group_name.split()[1]) - 64 for student, group_name in self.student_groups.items()}
+        moved = moved_students(before, after)
+        print(f"🔀  {len(moved)} of {len(after)} loaded students moved to a different group "
+              f"({len(moved) / len(after):.0%})")
+        sizes = [len(self.loaded_students[group_name]) for group_name in sorted(self.loaded_students)]
+        print(f"📊  Group sizes: {', '.join(map(str, sizes))}")
+        if moved and group_mode == 'modulo':
+            print("💡  'set_groups <number> jump' moves only about 1/N of students when groups are added")
+
     def generate_answer_keys_for_loaded_students(self, assignment_key: str, max_exercises: int = 20) -> None:
         """Generate answer keys for previously loaded students"""
         if not self.loaded_students:
@@ -1090,6 +1965,10 @@ class LinuxTutorial:
 
         import csv
         import os
+        from group_hash import code_table
+
+        # Groups are keyed on the assignment, so regroup the roster for this key
+        self.group_loaded_students(list(self.student_groups), assignment_key)
 
         checkpoints = list(range(self.progress_checkpoint, max_exercises + 1, self.progress_checkpoint))
         if max_exercises not in checkpoints:
@@ -1112,13 +1991,10 @@ class LinuxTutorial:
             writer.writerow(header)
 
             # Data rows
+            table = code_table(assignment_key)
             for i, group_name in enumerate(sorted(self.loaded_students.keys()), 1):
                 if self.loaded_students[group_name]:  # Only include groups that have students
-                    row = [group_name]
-                    for checkpoint in checkpoints:
-                        code = self.generate_progress_code_for_group(i, checkpoint, assignment_key)
-                        row.append(code)
-                    writer.writerow(row)
+                    writer.writerow([group_name] + table.row(i, checkpoints))
 
         print(f"📁  Group answer key generated: {group_filename}")
 
@@ -1155,9 +2031,8 @@ class LinuxTutorial:
                     # Progress codes header
                     writer.writerow(['Exercise Count', 'Progress Code', 'Code Type'])
 
-                    # Generate codes for each checkpoint
-                    for checkpoint in checkpoints:
-                        code = self.generate_progress_code_for_group(group_num, checkpoint, assignment_key)
+                    # Look up codes for each checkpoint
+                    for checkpoint, code in zip(checkpoints, table.row(group_num, checkpoints)):
                         code_type = "FINAL COMPLETION" if checkpoint == max_exercises else "CHECKPOINT"
                         writer.writerow([checkpoint, code, code_type])
 
@@ -1166,20 +2041,8 @@ class LinuxTutorial:
 
     def generate_progress_code_for_group(self, group_number: int, exercise_count: int, assignment_key: str) -> str:
         """Generate a 5-character progress code for a specific group and assignment"""
-        # Create a seed based on assignment key, group number and exercise count
-        seed_string = f"ASSIGNMENT-{assignment_key}-GROUP{group_number}-{exercise_count}"
-
-        # Convert string to numeric seed
-        seed_value = hash(seed_string) % (2**32)
-
-        # Seed the random number generator
-        random.seed(seed_value)
-
-        # Generate 5-character alphanumeric code
-        characters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
-        progress_code = ''.join(random.choices(characters, k=5))
-
-        return progress_code
+        from group_hash import code_table
+        return code_table(assignment_key).code(group_number, exercise_count)
 
     def show_loaded_students(self):
         """Display currently loaded students"""
@@ -1229,23 +2092,25 @@ class LinuxTutorial:
 
         elif parts[0] == 'set_groups':
             if len(parts) < 2:
-                print("Usage: set_groups <number>")
+                print("Usage: set_groups <number> [modulo|jump]")
                 return True
 
             try:
                 num_groups = int(parts[1])
-                if 2 <= num_groups <= 26:
-                    self.num_groups = num_groups
-                    print(f"✅  Set to {num_groups} groups")
-                    # Clear loaded students since group structure changed
-                    if self.loaded_students:
-                        print("⚠️  Cleared previously loaded students due to group structure change")
-                        self.loaded_students = {}
-                        self.student_groups = {}
-                else:
-                    print("❌  Number of groups must be between 2 and 26")
             except ValueError:
                 print("❌  Please enter a valid number")
+                return True
+            group_mode = parts[2] if len(parts) > 2 else self.group_mode
+            if not 2 <= num_groups <= 26:
+                print("❌  Number of groups must be between 2 and 26")
+            elif group_mode not in ('modulo', 'jump'):
+                print("❌  Group mode must be 'modulo' or 'jump'")
+            else:
+                self.set_groups(num_groups, group_mode)
+            return True
+
+        elif parts[0] == 'setup_report':
+            self.show_provision_report()
             return True
 
         elif parts[0] == 'admin_help':
@@ -1256,14 +2121,16 @@ class LinuxTutorial:
 
     def show_admin_help(self):
         """Show help for administrative commands"""
-        print("\n🔧 ADMINISTRATIVE COMMANDS:")
-        print("=" * 40)
-        print("load_students <file>     - Load students from file and generate groups")
-        print("show_students           - Display currently loaded students")
-        print("generate_keys <key> [n] - Generate answer keys for loaded students")
-        print("set_groups <number>     - Set number of groups (2-26)")
-        print("admin_help              - Show this help")
-        print("=" * 40)
+        with RENDERER.screen():
+            print("\n🔧 ADMINISTRATIVE COMMANDS:")
+            print("=" * 40)
+            print("load_students <file>     - Load students from file and generate groups")
+            print("show_students           - Display currently loaded students")
+            print("generate_keys <key> [n] - Generate answer keys for loaded students")
+            print("set_groups <n> [mode]   - Set groups (2-26), mode modulo|jump; regroups loaded students")
+            print("setup_report            - Show sandbox provisioning time and bytes")
+            print("admin_help              - Show this help")
+            print("=" * 40)
 
     def validate_command_input(self, user_input: str) -> tuple[bool, str]:
         """Validate user input to prevent shell hanging issues"""
@@ -1314,6 +2181,7 @@ class LinuxTutorial:
 
     def execute_and_verify(self, user_input: str, exercise: Dict[str, Any]) -> bool:
         """Execute user command and verify it matches the exercise requirements"""
+        import subprocess
         # First validate the input to prevent shell hanging
         is_valid, error_message = self.validate_command_input(user_input)
         if not is_valid:
@@ -1321,30 +2189,34 @@ class LinuxTutorial:
             print("💡 Tip: Make sure your command is complete and doesn't end with operators like |, >, or unclosed quotes.")
             return False
 
+        # Reject attempts that can never match before paying for a shell round trip
+        expected_command = exercise.get('command', '')
+        if not self.commands_match(user_input, expected_command):
+            print("❌  That command doesn't match this exercise, so it was not run.")
+            return False
+
+        check = exercise.get('check') or compile_verification(exercise.get('verification'))
+
         try:
-            # Execute the command
-            result = subprocess.run(user_input, shell=True, capture_output=True, text=True, timeout=10)
-
-            # Show the command output to the user
-            if result.stdout:
-                print(result.stdout.strip())
-            if result.stderr:
-                print(f"Error: {result.stderr.strip()}")
-
-            # Verify the command based on the verification method
-            verification = exercise.get('verification', '')
-            expected_command = exercise.get('command', '')
-
-            # Check if the user input matches the expected command (basic check)
-            if self.commands_match(user_input, expected_command):
-                # Run specific verification if provided
-                if verification:
-                    return self.run_verification(verification, user_input, result)
-                else:
-                    # If no specific verification, just check if command succeeded
-                    return result.returncode == 0
-            else:
-                return False
+            # Execute the command in the persistent shell (keeps cd/export state),
+            # streaming its output and matching the check's patterns as it arrives
+            result = self.get_shell_session().run(
+                user_input,
+                timeout=10,
+                stdout_capture=OutputCapture(check.output_patterns(user_input), echo=sys.stdout),
+                stderr_capture=OutputCapture(echo=sys.stderr)
+            )
+
+            # Follow the shell's working directory so file checks resolve the same way
+            if result.cwd and result.cwd != os.getcwd() and os.path.isdir(result.cwd):
+                os.chdir(result.cwd)
+
+            # Keep the prompt on its own line if the output did not end with one
+            if result.stdout and not result.stdout.endswith('\n'):
+                print()
+
+            # Verify the command with the check compiled at lesson load
+            return self.run_verification(check, user_input, result)
 
         except subprocess.TimeoutExpired:
             print("Command timed out!")
@@ -1355,150 +2227,135 @@ class LinuxTutorial:
 
     def commands_match(self, user_input: str, expected: str) -> bool:
         """Check if user input matches expected command (allowing for minor variations)"""
-        # Normalize whitespace and compare
-        user_normalized = ' '.join(user_input.split())
-        expected_normalized = ' '.join(expected.split())
-
-        return user_normalized.lower() == expected_normalized.lower()
-
-    def run_verification(self, verification: str, user_input: str, result: subprocess.CompletedProcess) -> bool:
-        """Run specific verification checks"""
-        if verification == "check_pwd":
-            return self.verify_pwd(user_input, result)
-        elif verification == "check_ls":
-            return self.verify_ls(user_input, result)
-        elif verification.startswith("check_file_exists:"):
-            filename = verification.split(":", 1)[1]
-            return self.verify_file_exists(filename)
-        elif verification.startswith("check_file_not_exists:"):
-            filename = verification.split(":", 1)[1]
-            return self.verify_file_not_exists(filename)
-        elif verification.startswith("check_file_moved:"):
-            parts = verification.split(":", 2)
-            old_filename = parts[1]
-            new_filename = parts[2]
-            return self.verify_file_moved(old_filename, new_filename)
-        elif verification.startswith("check_ls_specific:"):
-            filename = verification.split(":", 1)[1]
-            return self.verify_ls_specific(filename, user_input, result)
-        elif verification.startswith("check_cat_output:"):
-            filename = verification.split(":", 1)[1]
-            return self.verify_cat_output(filename, user_input, result)
-        elif verification.startswith("check_grep_output:"):
-            parts = verification.split(":", 2)
-            search_term = parts[1]
-            filename = parts[2]
-            return self.verify_grep_output(search_term, filename, user_input, result)
-        elif verification.startswith("check_head_output:"):
-            filename = verification.split(":", 1)[1]
-            return self.verify_head_output(filename, user_input, result)
-        elif verification.startswith("check_tail_output:"):
-            filename = verification.split(":", 1)[1]
-            return self.verify_tail_output(filename, user_input, result)
-        elif verification == "check_command_success":
-            return self.verify_command_success(user_input, result)
-        elif verification.startswith("check_dir_exists:"):
-            dirname = verification.split(":", 1)[1]
-            return self.verify_dir_exists(dirname)
-        elif verification.startswith("check_files_not_exist:"):
-            filenames = verification.split(":", 1)[1]
-            return self.verify_files_not_exist(filenames)
-        else:
-            # Default: command succeeded
-            return result.returncode == 0
-
-    def verify_pwd(self, user_input: str, result: subprocess.CompletedProcess) -> bool:
-        """Verify pwd command execution"""
-        # Check if command succeeded and produced output
-        if result.returncode == 0 and result.stdout.strip():
-            # pwd should output a directory path
-            output = result.stdout.strip()
-            if output.startswith('/') or (os.name == 'nt' and ':' in output):
-                return True
-        return False
-
-    def verify_ls(self, user_input: str, result: subprocess.CompletedProcess) -> bool:
-        """Verify ls command execution"""
-        # ls command should succeed (return code 0)
-        # Output can be empty (empty directory) or contain files/directories
-        return result.returncode == 0
-
-    def verify_file_exists(self, filename: str) -> bool:
-        """Verify that a file exists"""
-        return os.path.exists(filename)
-
-    def verify_file_not_exists(self, filename: str) -> bool:
-        """Verify that a file does not exist"""
-        return not os.path.exists(filename)
-
-    def verify_file_moved(self, old_filename: str, new_filename: str) -> bool:
-        """Verify that a file was moved (old file gone, new file exists)"""
-        return not os.path.exists(old_filename) and os.path.exists(new_filename)
-
-    def verify_ls_specific(self, filename: str, user_input: str, result: subprocess.CompletedProcess) -> bool:
-        """Verify ls command for a specific file"""
-        if result.returncode == 0:
-            # Check if the filename appears in the output
-            return filename in result.stdout
-        return False
-
-    def verify_cat_output(self, filename: str, user_input: str, result: subprocess.CompletedProcess) -> bool:
-        """Verify cat command produces output"""
-        return result.returncode == 0 and len(result.stdout.strip()) > 0
-
-    def verify_grep_output(self, search_term: str, filename: str, user_input: str, result: subprocess.CompletedProcess) -> bool:
-        """Verify grep command finds the search term"""
-        if result.returncode == 0:
-            # Check if the search term appears in output (case-insensitive if -i flag used)
-            if '-i' in user_input.lower():
-                return search_term.lower() in result.stdout.lower()
+        if expected not in self.normalized_commands:
+            self.normalized_commands[expected] = self.normalize_command(expected)
+        expected_normalized = self.normalized_commands[expected]
+        user_normalized = self.normalize_command(user_input)
+
+        if expected_normalized is None or user_normalized is None:
+            # Unparseable input: fall back to whitespace-insensitive comparison
+            return ' '.join(user_input.split()).lower() == ' '.join(expected.split()).lower()
+
+        return user_normalized == expected_normalized
+
+    # Commands whose short options follow getopt: '-la' is '-l -a' and the
+    # listed letters take an argument, attached ('-n5') or as the next word ('-n 5')
+    GETOPT_OPTION_ARGUMENTS = {
+        'ls': 'IT', 'cat': '', 'rm': '', 'cp': 'St', 'mv': 'St', 'mkdir': 'm', 'rmdir': '',
+        'touch': 'drt', 'ln': 'St', 'chmod': '', 'chown': '', 'wc': '', 'du': 'dBt', 'df': 'BtX',
+        'head': 'cn', 'tail': 'cns', 'grep': 'ABCefmd', 'egrep': 'ABCefmd', 'sort': 'ktToS',
+        'uniq': 'fsw', 'cut': 'bcdf', 'tr': '', 'nl': 'bsvwn', 'tar': 'fCT', 'ps': 'opuUgG',
+        'diff': 'UC', 'less': 'xy', 'uname': '', 'free': 's', 'kill': 'sn', 'xargs': 'InLPd',
+        'stat': 'c', 'id': '', 'whoami': '', 'pwd': '', 'echo': '', 'history': '', 'which': '',
+    }
+
+    def normalize_command(self, command: str) -> Optional[tuple]:
+        """
+        Parse a command line into a comparable form.
+
+        Each simple command becomes (name, flags, option arguments, operands).
+        For getopt-style commands flag clusters are split into a set, so
+        'ls -la', 'ls -al' and 'ls -a -l' compare equal, and options that take
+        an argument are kept as (letter, argument) pairs ('-n5' and '-n 5' both
+        give ('n', '5')). Other commands (find, ...) keep their words in order.
+        Operands are path-normalized so './test.txt' matches 'test.txt'.
+        Pipes, redirections and separators are kept in place. Returns None if
+        the command cannot be tokenized.
+        """
+        import shlex
+        try:
+            lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+            lexer.whitespace_split = True
+            tokens = list(lexer)
+        except ValueError:
+            return None
+
+        normalized = []
+        segment = []
+        flags = set()
+        option_arguments = set()
+        takes_argument = None   # Option letters with an argument, None if not a getopt command
+        pending_option = None   # Option letter waiting for its argument in the next word
+        end_of_options = False
+
+        def close_segment():
+            if segment or flags or option_arguments:
+                name = segment[0] if segment else ''
+                normalized.append((name, frozenset(flags), frozenset(option_arguments), tuple(segment[1:])))
+
+        def operand(token):
+            token = posixpath.normpath(token) if '/' in token or token.startswith('.') else token
+            return token.lower()
+
+        for token in tokens:
+            if token and all(char in '|&;<>()' for char in token):
+                # Operator: finish the current simple command
+                close_segment()
+                normalized.append(token)
+                segment, flags, option_arguments = [], set(), set()
+                takes_argument, pending_option, end_of_options = None, None, False
+            elif not segment:
+                segment.append(token.lower())
+                takes_argument = self.GETOPT_OPTION_ARGUMENTS.get(posixpath.basename(token.lower()))
+            elif pending_option is not None:
+                option_arguments.add((pending_option, token))
+                pending_option = None
+            elif takes_argument is None or end_of_options:
+                segment.append(operand(token))
+            elif token == '--':
+                end_of_options = True
+            elif token.startswith('--'):
+                flags.add(token)
+            elif token.startswith('-') and len(token) > 1:
+                # Short option cluster, e.g. -la, -n5 or -rn
+                for position, letter in enumerate(token[1:], 1):
+                    if letter in takes_argument:
+                        argument = token[position + 1:]
+                        if argument:
+                            option_arguments.add((letter, argument))
+                        else:
+                            pending_option = letter
+                        break
+                    if letter.isdigit():
+                        # Old-style count, e.g. head -5
+                        option_arguments.add(('n', token[position:]))
+                        break
+                    flags.add(letter)
             else:
-                return search_term in result.stdout
-        return False
+                segment.append(operand(token))
+        if pending_option is not None:
+            flags.add(pending_option)  # Option missing its argument: still compare the flag
+        close_segment()
 
-    def verify_head_output(self, filename: str, user_input: str, result: subprocess.CompletedProcess) -> bool:
-        """Verify head command produces output"""
-        return result.returncode == 0 and len(result.stdout.strip()) > 0
+        return tuple(normalized)
 
-    def verify_tail_output(self, filename: str, user_input: str, result: subprocess.CompletedProcess) -> bool:
-        """Verify tail command produces output"""
-        return result.returncode == 0 and len(result.stdout.strip()) > 0
-
-    def verify_command_success(self, user_input: str, result: subprocess.CompletedProcess) -> bool:
-        """Verify command executed successfully (return code 0)"""
-        return result.returncode == 0
-
-    def verify_dir_exists(self, dirname: str) -> bool:
-        """Verify that a directory exists"""
-        return os.path.exists(dirname) and os.path.isdir(dirname)
-
-    def verify_files_not_exist(self, filenames: str) -> bool:
-        """Verify that multiple files do not exist (comma-separated list)"""
-        files = [f.strip() for f in filenames.split(',')]
-        for filename in files:
-            if os.path.exists(filename):
-                return False
-        return True
+    def run_verification(self, check: Check, user_input: str, result: ShellResult) -> bool:
+        """Run a compiled verification check (strings are compiled on the fly)"""
+        return compile_verification(check)(user_input, result)
 
     def show_current_progress(self):
         """Display current progress to student"""
-        print("\n📈  YOUR PROGRESS")
-        print("=" * 30)
-        print(f"Student ID: {self.user_progress.get('student_id', 'Not set')}")
-        print(f"Assignment: {self.user_progress.get('assignment_key', 'Not set')}")
-        if self.user_progress.get('student_id'):
-            print(f"Group: {self.get_student_group(self.user_progress['student_id'])}")
-        print(f"Exercises completed: {self.exercise_counter}/{self.user_progress['total_exercises']}")
-        print(f"Current lesson: {self.current_lesson + 1}/{len(self.lessons)}")
-        print(f"Progress codes generated: {len(self.user_progress['completion_codes'])}")
-
-        if self.user_progress['completion_codes']:
-            print("\n🎯 Your progress codes:")
-            for code_entry in self.user_progress['completion_codes']:
-                print(f"  • {code_entry['code']} (after {code_entry['exercise_count']} exercises)")
-
-        print("=" * 30)
-        print()
+        with RENDERER.screen():
+            print("\n📈  YOUR PROGRESS")
+            print("=" * 30)
+            print(f"Student ID: {self.user_progress.get('student_id', 'Not set')}")
+            print(f"Assignment: {self.user_progress.get('assignment_key', 'Not set')}")
+            if self.user_progress.get('student_id'):
+                print(f"Group: {self.get_student_group(self.user_progress['student_id'])}")
+            print(f"Exercises completed: {self.exercise_counter}/{self.user_progress['total_exercises']}")
+            print(f"Current lesson: {self.current_lesson + 1}/{len(self.lessons)}")
+            print(f"Progress codes generated: {len(self.user_progress['completion_codes'])}")
+            if self.shell_session and self.shell_session.timings:
+                print(f"Last command time: {self.shell_session.timings[-1] * 1000:.0f} ms "
+                      f"(average {self.shell_session.average_time() * 1000:.0f} ms)")
+
+            if self.user_progress['completion_codes']:
+                print("\n🎯 Your progress codes:")
+                for code_entry in self.user_progress['completion_codes']:
+                    print(f"  • {code_entry['code']} (after {code_entry['exercise_count']} exercises)")
+
+            print("=" * 30)
+            print()
 
     def display_completion(self):
         """Display tutorial completion message with final code"""
@@ -1509,41 +2366,45 @@ class LinuxTutorial:
             'exercise_count': self.exercise_counter,
             'assignment_key': self.user_progress['assignment_key'],
             'group_number': self.get_student_group(self.user_progress['student_id']),
-            'timestamp': datetime.datetime.now().isoformat(),
+            'timestamp': timestamp(),
             'lesson_progress': 'COMPLETED',
             'type': 'FINAL_COMPLETION'
         }
         self.user_progress['completion_codes'].append(final_code_entry)
+        self.journal.append('code', entry=final_code_entry)
+        self.journal.append('run_end')
+
+        with RENDERER.screen():
+            print("\n" + "=" * 60)
+            print("🎉  CONGRATULATIONS! 🎉")
+            print("=" * 60)
+            print("You have completed the Linux Command Tutorial!")
+            print()
+            print("📊  FINAL PROGRESS SUMMARY:")
+            print(f"  • Student ID: {self.user_progress['student_id']}")
+            print(f"  • Assignment: {self.user_progress['assignment_key']}")
+            print(f"  • Group: {self.get_student_group(self.user_progress['student_id'])}")
+            print(f"  • Total exercises completed: {self.exercise_counter}")
+            print(f"  • All {len(self.lessons)} lessons finished")
+            print()
+            print("🏆  FINAL COMPLETION CODE:")
+            print("=" * 40)
+            print(f"         {final_code}")
+            print("=" * 40)
+            print("⚠️   Enter this FINAL code in your LMS to mark completion!")
+            print()
 
-        print("\n" + "=" * 60)
-        print("🎉  CONGRATULATIONS! 🎉")
-        print("=" * 60)
-        print("You have completed the Linux Command Tutorial!")
-        print()
-        print("📊  FINAL PROGRESS SUMMARY:")
-        print(f"  • Student ID: {self.user_progress['student_id']}")
-        print(f"  • Assignment: {self.user_progress['assignment_key']}")
-        print(f"  • Group: {self.get_student_group(self.user_progress['student_id'])}")
-        print(f"  • Total exercises completed: {self.exercise_counter}")
-        print(f"  • All {len(self.lessons)} lessons finished")
-        print()
-        print("🏆  FINAL COMPLETION CODE:")
-        print("=" * 40)
-        print(f"         {final_code}")
-        print("=" * 40)
-        print("⚠️   Enter this FINAL code in your LMS to mark completion!")
-        print()
-
-        # Show all progress codes
-        print("📝  All your progress codes:")
-        for i, code_entry in enumerate(self.user_progress['completion_codes'], 1):
-            code_type = "CHECKPOINT" if code_entry.get('type') != 'FINAL_COMPLETION' else "FINAL"
-            print(f"  {i}. {code_entry['code']} - {code_type} ({code_entry['exercise_count']} exercises)")
+            # Show all progress codes
+            print("📝  All your progress codes:")
+            for i, code_entry in enumerate(self.user_progress['completion_codes'], 1):
+                code_type = "CHECKPOINT" if code_entry.get('type') != 'FINAL_COMPLETION' else "FINAL"
+                print(f"  {i}. {code_entry['code']} - {code_type} ({code_entry['exercise_count']} exercises)")
 
-        print("\n" + "=" * 60)
+            print("\n" + "=" * 60)
 
     def calculate_session_duration(self):
         """Calculate how long the session has been running"""
+        import datetime
         start_time = datetime.datetime.fromisoformat(self.user_progress['start_time'])
         duration = datetime.datetime.now() - start_time
 
@@ -1574,11 +2435,12 @@ class LinuxTutorial:
                 continue
             elif user_input.lower() == 'skip':
                 print("⏭️   Skipping exercise...")
+                self.journal.append('exercise', lesson=self.current_lesson, exercise=self.current_exercise)
                 return True
             elif user_input.lower() == 'progress':
                 self.show_current_progress()
                 continue
-            elif user_input.startswith('admin:') or user_input in ['load_students', 'show_students', 'generate_keys', 'set_groups', 'admin_help']:
+            elif user_input.startswith('admin:') or user_input in ['load_students', 'show_students', 'generate_keys', 'set_groups', 'setup_report', 'admin_help']:
                 # Handle admin commands
                 admin_command = user_input.replace('admin:', '') if user_input.startswith('admin:') else user_input
                 if self.handle_admin_commands(admin_command):
@@ -1597,9 +2459,11 @@ class LinuxTutorial:
                     'exercise': exercise['instruction'],
                     'command': exercise['command'],
                     'user_input': user_input,
-                    'timestamp': datetime.datetime.now().isoformat()
+                    'timestamp': timestamp()
                 }
                 self.user_progress['completed_exercises'].append(exercise_record)
+                self.journal.append('exercise', lesson=self.current_lesson, exercise=self.current_exercise,
+                                    record=exercise_record)
 
                 # Check for progress checkpoint
                 self.check_progress_checkpoint()
@@ -1616,10 +2480,85 @@ class LinuxTutorial:
                 print_white_bg("💡  Type 'admin_help' for administrative commands.")
 
     def end_tutorial(self):
+        self.journal.close()
+        if self.shell_session:
+            self.shell_session.close()
         self.cleanup_tutorial_environment()
         
+class FirstPrompt(Exception):
+    """Raised by the startup report's stand-in for input() when the first prompt is reached"""
+
+
+def run_to_first_prompt(tutorial: LinuxTutorial) -> float:
+    """Seconds start_tutorial() takes to reach its first input() (journal, lessons, screens)"""
+    import builtins
+    import io
+
+    def first_prompt(prompt=''):
+        raise FirstPrompt
+
+    original_input, original_stdout = builtins.input, sys.stdout
+    builtins.input, sys.stdout = first_prompt, io.StringIO()  # The screens drawn so far are discarded
+    start = time.perf_counter()
+    try:
+        tutorial.start_tutorial()
+    except FirstPrompt:
+        pass
+    finally:
+        builtins.input, sys.stdout = original_input, original_stdout
+    return time.perf_counter() - start
+
+
+def print_startup_report():
+    """Time startup up to the first prompt and print per-import costs"""
+    module_seconds = time.perf_counter() - IMPORT_TIMER.started
+    start = time.perf_counter()
+    tutorial = LinuxTutorial()
+    init_seconds = time.perf_counter() - start
+    prompt_seconds = run_to_first_prompt(tutorial)
+    IMPORT_TIMER.uninstall()
+    tutorial.end_tutorial()
+
+    rows = list(IMPORT_TIMER.rows())
+    summary = {
+        'module_ms': round(module_seconds * 1000, 3),
+        'init_ms': round(init_seconds * 1000, 3),
+        'until_prompt_ms': round(prompt_seconds * 1000, 3),
+        'first_prompt_ms': round((module_seconds + init_seconds + prompt_seconds) * 1000, 3),
+        'spawns': SPAWN_COUNTER.total,
+        'imports': [
+            {'module': name, 'depth': depth, 'self_ms': round(self_ms, 3), 'cumulative_ms': round(cumulative_ms, 3)}
+            for name, depth, self_ms, cumulative_ms in rows
+        ],
+    }
+    if '--json' in sys.argv:
+        import json
+        print(json.dumps(summary, indent=2))
+        return
+
+    print("⏱️  STARTUP REPORT (time to first prompt)")
+    print("=" * 50)
+    print(f"{'self [ms]':>10} | {'cumulative':>10} | imported module")
+    for name, depth, self_ms, cumulative_ms in rows:
+        print(f"{self_ms:>10.2f} | {cumulative_ms:>10.2f} | {'  ' * depth}{name}")
+    print("-" * 50)
+    print(f"Module load (incl. imports): {summary['module_ms']:.1f} ms")
+    print(f"LinuxTutorial() setup:       {summary['init_ms']:.1f} ms")
+    print(f"start_tutorial() to input(): {summary['until_prompt_ms']:.1f} ms")
+    print(f"Total to first prompt:       {summary['first_prompt_ms']:.1f} ms")
+    print(f"Processes spawned:           {summary['spawns']}")
+    print("=" * 50)
+
+
 def main():
     """Main entry point"""
+    if len(sys.argv) > 2 and sys.argv[1] == '--build-fixture-template':
+        build_fixture_template(sys.argv[2])
+        return
+    if IMPORT_TIMER is not None:
+        print_startup_report()
+        return
+
     try:
         tutorial = LinuxTutorial()
         tutorial.start_tutorial()
@@ -1636,6 +2575,7 @@ def main():
         print_black_bg("..Exiting tutorial...")
 
         tutorial.end_tutorial()
+        report_spawns(print_black_bg)
 
 if __name__ == "__main__":
     main()